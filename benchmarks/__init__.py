@@ -0,0 +1 @@
+"""基于本地模拟OJ服务器的性能基准脚本"""
@@ -0,0 +1,65 @@
+"""比较多线程与asyncio两种获取作业/题目详情的方式
+
+用法: python -m benchmarks.bench_fetch [--latency 0.05] [--problems 30] [--homeworks 12] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_oj_server import MockOJServer
+from services import OJRequester
+from services.data_service import (fetch_and_process_homeworks, fetch_and_process_problems,
+                                   fetch_and_process_homeworks_async, fetch_and_process_problems_async)
+
+
+def make_requester(server):
+    """创建指向模拟服务器的请求实例"""
+    requester = OJRequester()
+    requester.base_url = server.url
+    requester.csrf_token = 'mock-csrf-token'
+    return requester
+
+
+def timed(label, func, server):
+    server.reset_counts()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"\n{label:<28} {elapsed * 1000:8.1f} ms  ({server.total_requests()} 请求)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.05, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--homeworks', type=int, default=12)
+    parser.add_argument('--problems', type=int, default=30)
+    parser.add_argument('--concurrency', type=int, default=16, help='asyncio路径的并发上限')
+    args = parser.parse_args()
+
+    with MockOJServer(latency=args.latency, homeworks=args.homeworks, problems=args.problems) as server:
+        requester = make_requester(server)
+        unit_test_base_url = f"{server.url}/junittest"  # 不访问真实的单元测试服务器
+
+        results = {
+            'threaded homeworks': timed('threaded homeworks', lambda: fetch_and_process_homeworks(requester, 'CS109-25S'), server),
+            'async homeworks': timed('async homeworks', lambda: asyncio.run(
+                fetch_and_process_homeworks_async(requester, 'CS109-25S', args.concurrency)), server),
+            'threaded problems': timed('threaded problems', lambda: fetch_and_process_problems(
+                requester, 1, 'CS109-25S', unit_test_base_url), server),
+            'async problems': timed('async problems', lambda: asyncio.run(
+                fetch_and_process_problems_async(requester, 1, 'CS109-25S', args.concurrency,
+                                                 unit_test_base_url=unit_test_base_url)), server),
+        }
+
+    print(f"\n作业列表加速比: {results['threaded homeworks'] / results['async homeworks']:.2f}x")
+    print(f"题目列表加速比: {results['threaded problems'] / results['async problems']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
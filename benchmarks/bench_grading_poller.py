@@ -0,0 +1,89 @@
+"""模拟不同批改耗时分布，比较固定退避轮询与基于历史耗时的自适应轮询
+
+对每个分布先用一批样本训练JudgeLatencyModel，再用新的样本统计：
+- 平均多等待时间：批改完成到被轮询发现之间的时间
+- 平均轮询次数
+- 放弃率：超过截止时间（或旧策略10次尝试）仍未发现结果的比例
+
+用法: python -m benchmarks.bench_grading_poller [--samples 2000] [--deadline 60] [--time-limit 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.grading_poller import JudgeLatencyModel
+
+
+DISTRIBUTIONS = {
+    '快速判题 (lognormal, 中位数0.8s)': lambda rng: rng.lognormvariate(-0.2, 0.35),
+    '常规负载 (lognormal, 中位数3s)': lambda rng: rng.lognormvariate(1.1, 0.4),
+    '截止前高峰 (lognormal, 中位数15s)': lambda rng: rng.lognormvariate(2.7, 0.5),
+    '双峰 (80% 1s / 20% 20s)': lambda rng: rng.gauss(1.0, 0.2) if rng.random() < 0.8 else rng.gauss(20, 4),
+}
+
+
+def legacy_offsets(time_limit_ms):
+    """原实现的轮询时间：先等待时间限制，之后按1.5倍递增、最长5秒，最多10次"""
+    offsets = []
+    wait_time = time_limit_ms / 1000
+    elapsed = 0.0
+    for _ in range(10):
+        elapsed += wait_time
+        offsets.append(elapsed)
+        wait_time = min(wait_time * 1.5, 5)
+    return offsets
+
+
+def simulate(offsets, latency):
+    """返回(多等待时间, 轮询次数)，未发现结果时多等待时间为None"""
+    for count, offset in enumerate(offsets, start=1):
+        if offset >= latency:
+            return offset - latency, count
+    return None, len(offsets)
+
+
+def evaluate(offsets_for, latencies):
+    waits, polls, gave_up = [], [], 0
+    for latency in latencies:
+        wasted, count = simulate(offsets_for(), latency)
+        polls.append(count)
+        if wasted is None:
+            gave_up += 1
+        else:
+            waits.append(wasted)
+    mean_wait = sum(waits) / len(waits) if waits else float('nan')
+    return mean_wait, sum(polls) / len(polls), gave_up / len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--deadline', type=float, default=60)
+    parser.add_argument('--time-limit', type=int, default=2000, help='题目时间限制（毫秒）')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'分布':<34} {'策略':<8} {'多等待(s)':>10} {'轮询次数':>8} {'放弃率':>8}")
+
+    for name, sample in DISTRIBUTIONS.items():
+        model = JudgeLatencyModel(path=None)
+        for _ in range(model.max_samples):
+            # 训练时的记录值与真实轮询一致：取区间中点，这里直接用真实耗时近似
+            model.record(1, 1, max(0.05, sample(rng)))
+
+        latencies = [max(0.05, sample(rng)) for _ in range(args.samples)]
+        rows = {
+            '旧策略': evaluate(lambda: legacy_offsets(args.time_limit), latencies),
+            '自适应': evaluate(lambda: model.poll_offsets(1, 1, args.time_limit, args.deadline), latencies),
+        }
+        for strategy, (mean_wait, mean_polls, give_up) in rows.items():
+            print(f"{name:<34} {strategy:<8} {mean_wait:>10.2f} {mean_polls:>8.1f} {give_up:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
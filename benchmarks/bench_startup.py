@@ -0,0 +1,67 @@
+"""冷启动耗时预算检查
+
+在全新的解释器进程中导入main、解析参数，并导入交互模式在第一个输入提示前需要的全部模块
+（不含网络请求），重复多次取中位数。超过预算时以非零状态码退出，可用于CI中的回归检查。
+
+用法: python -m benchmarks.bench_startup [--budget-ms 300] [--runs 7]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 子进程中执行：记录从解释器开始执行脚本到各阶段完成的时间
+PROBE = r"""
+import time
+start = time.perf_counter()
+import json, sys
+sys.path.insert(0, {root!r})
+import main
+main.parse_args([])
+parsed = time.perf_counter()
+import services.requester, services.auth_service, services.data_service, services.response_cache
+import ui.display, ui.interaction
+ready = time.perf_counter()
+print(json.dumps({{'parse': (parsed - start) * 1000, 'ready': (ready - start) * 1000}}))
+"""
+
+
+def measure_once():
+    """返回(进程总耗时ms, 参数解析完成ms, 交互所需模块加载完成ms)"""
+    import time
+
+    began = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', PROBE.format(root=ROOT)], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    wall = (time.perf_counter() - began) * 1000
+    data = json.loads(output.strip().splitlines()[-1])
+    return wall, data['parse'], data['ready']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget-ms', type=float, default=300, help='进程总耗时中位数的预算（毫秒）')
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+
+    measure_once()  # 预热文件系统缓存与字节码缓存
+    samples = [measure_once() for _ in range(args.runs)]
+    wall, parse, ready = (statistics.median(column) for column in zip(*samples))
+
+    print(f"参数解析完成:       {parse:7.1f} ms")
+    print(f"交互所需模块加载:   {ready:7.1f} ms")
+    print(f"进程总耗时:         {wall:7.1f} ms  (预算 {args.budget_ms:.0f} ms)")
+
+    if wall > args.budget_ms:
+        print(f"[\x1b[0;31mx\x1b[0m] 冷启动超出预算 {wall - args.budget_ms:.1f} ms")
+        sys.exit(1)
+    print("[\x1b[0;32m+\x1b[0m] 冷启动在预算之内")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""比较启动到显示作业列表的耗时：顺序流程 vs 流水线流程
+
+顺序流程: 加载cookies -> 验证(课程列表) -> 再次获取课程列表 -> 获取作业列表与详情
+流水线流程: 加载cookies -> 同时验证(复用为课程列表)与预取上次课程的作业列表
+
+用法: python -m benchmarks.bench_startup_pipeline [--latency 0.08] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from benchmarks.mock_oj_server import MockOJServer
+from services import OJRequester, handle_login, fetch_and_process_homeworks_async
+from services.startup import pipelined_startup, save_course_hint
+from ui.display import display_courses, display_homeworks
+from ui.interaction import select_course
+
+
+def make_requester(server):
+    requester = OJRequester()
+    requester.base_url = server.url
+    return requester
+
+
+def sequential(server):
+    requester = make_requester(server)
+    handle_login(requester)
+    courses = display_courses(requester)
+    course_id = select_course(courses, auto_select_first=True)
+    homeworks = asyncio.run(fetch_and_process_homeworks_async(requester, course_id))
+    display_homeworks(sorted(homeworks, key=lambda x: x['homeworkId']))
+
+
+def pipelined(server):
+    requester = make_requester(server)
+    courses, speculative = pipelined_startup(requester, auto_select_course=True)
+    courses = display_courses(requester, courses)
+    course_id = select_course(courses, auto_select_first=True)
+    if speculative and speculative[0] == course_id:
+        homeworks = speculative[1]
+    else:
+        homeworks = asyncio.run(fetch_and_process_homeworks_async(requester, course_id))
+    display_homeworks(sorted(homeworks, key=lambda x: x['homeworkId']))
+
+
+def measure(func, server, runs):
+    samples, counts = [], []
+    for _ in range(runs):
+        server.reset_counts()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(server)
+        samples.append((time.perf_counter() - start) * 1000)
+        counts.append(server.total_requests())
+    return statistics.median(samples), statistics.median(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.08, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--homeworks', type=int, default=12)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir, \
+            MockOJServer(latency=args.latency, homeworks=args.homeworks) as server:
+        os.chdir(workdir)
+        config.STARTUP_STATE_FILE = os.path.join(workdir, 'oj_startup.json')
+
+        # 准备有效的本地cookies与上次选择的课程
+        seed = make_requester(server)
+        seed.csrf_token = 'mock-csrf-token'
+        seed.session.cookies.set('JCoderID', 'mock-session')
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed.save_cookies()
+        save_course_hint('CS109-25S')
+
+        before = measure(sequential, server, args.runs)
+        after = measure(pipelined, server, args.runs)
+
+    print(f"{'流程':<10} {'到作业列表(ms)':>14} {'请求数':>8}")
+    print(f"{'顺序':<10} {before[0]:>14.1f} {before[1]:>8.0f}")
+    print(f"{'流水线':<10} {after[0]:>14.1f} {after[1]:>8.0f}")
+    print(f"\n加速比: {before[0] / after[0]:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""测量批量下载一份作业的单元测试：首次下载、缓存有效期内重复下载、缓存过期后条件请求，
+以及服务器提供单元测试清单时缓存过期后的重复下载
+
+用法: python -m benchmarks.bench_unit_tests [--latency 0.05] [--problems 30]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_oj_server import MockOJServer
+from services.unit_tests import UnitTestCache, UnitTestDownloader
+
+
+def run(server, cache_dir, dest_root, problems, max_age):
+    # 用本地模拟服务器代替OSS
+    downloader = UnitTestDownloader(UnitTestCache(cache_dir, max_age), max_workers=16,
+                                    base_url=f"{server.url}/junittest")
+    server.reset_counts()
+    start = time.perf_counter()
+    results = downloader.download_homework('CS109-25S', 1, problems, dest_root)
+    elapsed = (time.perf_counter() - start) * 1000
+    statuses = {}
+    for _, status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return elapsed, server.total_requests(), statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.05, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--problems', type=int, default=30)
+    args = parser.parse_args()
+
+    problems = [{'problemId': pid, 'problemName': f'Problem {pid}'} for pid in range(1, args.problems + 1)]
+    print(f"{'场景':<20} {'耗时(ms)':>9} {'请求数':>6}  结果")
+    for manifest in (False, True):
+        with tempfile.TemporaryDirectory() as workdir, \
+                MockOJServer(latency=args.latency, problems=args.problems, unit_test_manifest=manifest) as server:
+            cache_dir = os.path.join(workdir, 'cache')
+            dest_root = os.path.join(workdir, 'tests')
+            scenarios = (('首次下载', 3600), ('缓存有效期内', 3600), ('缓存过期', 0))
+            for label, max_age in scenarios:
+                elapsed, count, statuses = run(server, cache_dir, dest_root, problems, max_age)
+                label = f"{label}{'(有清单)' if manifest else ''}"
+                print(f"{label:<20} {elapsed:>9.1f} {count:>6}  {statuses}")
+
+
+if __name__ == '__main__':
+    main()
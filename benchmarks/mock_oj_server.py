@@ -0,0 +1,193 @@
+"""本地模拟OJ服务器，用于在不访问真实平台的情况下测量请求开销"""
+
+import hashlib
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Server(ThreadingHTTPServer):
+    # 默认的监听队列只有5，大量并发新连接时会被丢弃并在1秒后重传，扭曲测量结果
+    request_queue_size = 128
+
+
+class MockOJServer:
+    """提供与OJ平台相同端点的本地HTTP服务器
+
+    Args:
+        latency: 每个请求的人为延迟（秒）
+        homeworks: 模拟课程中的作业数量
+        problems: 每份作业中的题目数量
+        courses: 课程数量，第一门课程的ID为CS109-25S
+        unit_test_manifest: 模拟的单元测试服务器是否为每份作业提供manifest.json
+    """
+
+    def __init__(self, latency=0.05, homeworks=12, problems=30, courses=1, unit_test_manifest=False):
+        self.unit_test_manifest = unit_test_manifest
+        self.latency = latency
+        self.homeworks = homeworks
+        self.problems = problems
+        self.courses = courses
+        self.request_counts = Counter()
+        self._record_ids = itertools.count(100000)
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def total_requests(self):
+        with self._lock:
+            return sum(self.request_counts.values())
+
+    def reset_counts(self):
+        with self._lock:
+            self.request_counts.clear()
+
+    def _record(self, path):
+        with self._lock:
+            self.request_counts[path] += 1
+
+    @staticmethod
+    def _page(items, form):
+        """按表单中的page/offset（每页条目数）返回一页"""
+        page = int(form.get('page', 1))
+        size = int(form.get('offset', 40))
+        return items[(page - 1) * size:page * size]
+
+    def respond(self, path, form):
+        """根据端点与表单参数构造响应，返回(状态码, JSON对象)"""
+        if path == '/api/cors/':
+            return 200, {}
+        if path == '/api/union/my_courses_list/':
+            courses = [{'course_id': 'CS109-25S' if i == 0 else f'CS{200 + i}-25S',
+                        'course_name': f'Mock Course {i + 1}', 'description': 'mock'}
+                       for i in range(self.courses)]
+            return 200, {'list': self._page(courses, form)}
+        if path == '/api/course/homeworks/list/':
+            homeworks = [{'homeworkId': hw_id, 'homeworkName': f'Homework {hw_id}',
+                          'nextDate': f'2025-{(hw_id % 12) + 1:02d}-01 23:59:59',
+                          'problemsCount': self.problems, 'state': 2}
+                         for hw_id in range(1, self.homeworks + 1)]
+            return 200, {'list': self._page(homeworks, form)}
+        if path == '/api/homework/general/':
+            return 200, {'currentScore': 0, 'totalScore': 100.0, 'attemptRate': 0}
+        if path == '/api/homework/problems/list/':
+            return 200, {'list': [{'problemId': pid, 'problemName': f'Problem {pid}'}
+                                  for pid in range(1, self.problems + 1)]}
+        if path == '/api/homework/problems/info/':
+            return 200, {'problemType': 'Programming', 'timeLimit': {'Java': 1000},
+                         'memoryLimit': {'Java': 256}, 'ioMode': 0, 'difficulty': 2,
+                         'publicTags': [], 'content': 'mock content ' * 50}
+        if path == '/api/homework/submit/recent_records/':
+            return 200, {'list': [{'recordId': int(form.get('problemId', 0)) * 100 + i,
+                                   'resultState': 'WA', 'score': 50,
+                                   'submissionTime': '2025-01-01 12:00:00',
+                                   'code': {'Main.java': 'public class Main {}'}}
+                                  for i in range(3)]}
+        if path == '/api/homework/submit/objective/':
+            return 200, {'recordId': next(self._record_ids)}
+        if path == '/api/record/result/':
+            return 200, {'resultState': 'AC', 'score': 100, 'problemName': 'Mock',
+                         'submissionTime': '2025-01-01 12:00:00',
+                         'resultList': [{'state': 'AC', 'title': 'case 1', 'time': 10,
+                                         'memory': 20, 'message': ''}]}
+        return 404, {'error': 'not found'}
+
+    def respond_unit_test(self, path, headers):
+        """模拟存放单元测试的OSS：ID为偶数的题目有测试，支持ETag条件请求；
+        ID为3的倍数的奇数题目返回200与XML错误，其余返回404
+
+        Returns:
+            (状态码, 内容, 响应头)
+        """
+        parts = path.split('/')  # /junittest/{课程}/{作业}/{problemId}_{name}/MainTest.java
+        if path.endswith('/manifest.json'):
+            if not self.unit_test_manifest:
+                return 404, b'', {}
+            tests = {f"{pid}_Problem {pid}": hashlib.sha256(self._unit_test_content(pid)).hexdigest()
+                     for pid in range(2, self.problems + 1, 2)}
+            body = json.dumps({'version': 1, 'tests': tests}).encode('utf-8')
+            return self._conditional(body, headers, 'application/json')
+
+        problem_id = int(parts[4].split('_', 1)[0]) if len(parts) > 4 else 0
+        if problem_id % 2:
+            if problem_id % 3 == 0:
+                body = (f'<?xml version="1.0"?><Error><Code>NoSuchKey</Code>'
+                        f'<Message>The specified key does not exist.</Message><Key>{path}</Key></Error>')
+                return 200, body.encode('utf-8'), {'Content-Type': 'application/xml'}
+            return 404, b'', {}
+
+        return self._conditional(self._unit_test_content(problem_id), headers, 'text/plain')
+
+    @staticmethod
+    def _unit_test_content(problem_id):
+        return f"public class MainTest {{ /* tests for problem {problem_id} */ }}\n".encode('utf-8')
+
+    @staticmethod
+    def _conditional(content, headers, content_type):
+        """带ETag的响应，If-None-Match匹配时返回304"""
+        etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        if headers.get('If-None-Match') == etag:
+            return 304, b'', {'ETag': etag}
+        return 200, content, {'Content-Type': content_type, 'ETag': etag}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode('utf-8') if length else ''
+                form = {k: v[0] for k, v in parse_qs(body).items()}
+
+                server._record(parsed.path)
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if parsed.path.startswith('/junittest/'):
+                    status, data, headers = server.respond_unit_test(parsed.path, self.headers)
+                else:
+                    status, payload = server.respond(parsed.path, form)
+                    data = json.dumps(payload).encode('utf-8')
+                    headers = {'Content-Type': 'application/json'}
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _handle
+            do_POST = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
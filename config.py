@@ -2,8 +2,37 @@
 """一些配置与设置"""
 USERNAME = "12412832"
 PASSWORD = "Ymxnkd*2673"
-COOKIES_FILE = 'oj_cookies.pkl'
+COOKIES_FILE = 'oj_session.json'  # 登录凭证文件，多个同时运行的oja进程共享
 WORK_DIRECTORY = r"C:\Users\93879\Documents\JavaPractice"  # 你的Java作业所在的目录
 AUTO_SELECT_COURSE = True
 AUTO_SELECT_HOMEWORK = True
 MAX_RECORDS_TO_SHOW = 3
+MAX_CONCURRENT_REQUESTS = 16  # 并发获取作业/题目详情时的最大同时请求数
+CACHE_FILE = 'oj_cache.sqlite3'  # 作业/题目元数据的本地缓存文件
+CACHE_TTLS = {  # 各端点缓存的有效期（秒）
+    '/api/homework/general/': 600,
+    '/api/homework/problems/list/': 86400,
+    '/api/homework/problems/info/': 7 * 86400,
+}
+CACHE_MAX_ENTRIES = 2000  # 缓存最多保留的条目数，超出后淘汰最久未使用的条目（离线模式的列表快照不计入）
+INITIAL_CONCURRENT_REQUESTS = 4  # 自适应并发控制的初始并发数，会根据延迟与错误在1到MAX_CONCURRENT_REQUESTS之间调整
+REQUEST_TIMEOUT = 15  # 单个API请求的超时时间（秒）
+PAGE_SIZE = 40  # 分页获取课程/作业列表时每页的条目数
+JUDGE_HISTORY_FILE = 'oj_judge_history.json'  # 记录各题目批改耗时的文件，用于安排查询批改结果的时间
+GRADING_DEADLINE = 60  # 等待批改结果的最长时间（秒）
+CODE_STORE_DIR = 'oj_code_store'  # 提交记录代码的本地存储目录（按内容SHA-256保存，并索引各提交记录的文件）
+WATCH_DEBOUNCE = 0.5  # 监视模式下文件最后一次变化后等待多久（秒）才提交，避免保存过程中提交
+WATCH_POLL_INTERVAL = 1.0  # 无法使用inotify时轮询文件的间隔（秒）
+WORKSPACE_IGNORE = ['.*', 'out', 'target', 'build', 'bin', 'node_modules', '__pycache__']  # 扫描工作目录时忽略的目录/文件（通配符，也可匹配相对路径）
+WORKSPACE_INDEX_FILE = 'oj_workspace_index.json'  # 工作目录Java文件索引（按目录修改时间增量更新）
+FILE_HASH_CACHE = 'oj_file_hashes.json'  # 提交文件的哈希缓存（按路径、大小与修改时间），未修改的文件无需重新计算
+STARTUP_STATE_FILE = 'oj_startup.json'  # 记录上次自动选择的课程，启动时据此预取作业列表
+SESSION_REFRESH_INTERVAL = 900  # 会话闲置超过该时间（秒）后在后台主动刷新，设为0则不启动后台刷新
+DAEMON_STATE_FILE = 'oja_daemon.json'  # 本地守护进程的地址与访问令牌
+DAEMON_SOCKET = 'oja_daemon.sock'  # 守护进程的Unix域套接字路径（不支持的平台改用127.0.0.1上的随机端口）
+DAEMON_IDLE_TIMEOUT = 1800  # 守护进程空闲超过该时间（秒）后自动退出
+SYNC_DIRECTORY = 'oj_mirror'  # oja sync 镜像课程内容的目录
+OFFLINE_QUEUE_FILE = 'oj_offline_queue.json'  # 离线模式下排队等待提交的作业，恢复连接后提交
+UNIT_TEST_BASE_URL = "https://hexo-blog-netlify.oss-cn-shenzhen.aliyuncs.com/junittest"  # 单元测试文件所在的服务器
+UNIT_TEST_CACHE_DIR = 'oj_unit_tests'  # 单元测试文件的本地缓存目录（按内容SHA-256保存）
+UNIT_TEST_MAX_AGE = 3600  # 距上次检查不超过该时间（秒）的单元测试直接使用缓存，超过后发送条件请求确认
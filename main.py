@@ -1,22 +1,160 @@
-from services import OJRequester, handle_login, fetch_and_process_homeworks, fetch_and_process_problems
-from ui import display_courses, display_homeworks, select_course, select_homework, interact_with_problems
+import time
+
+_PROCESS_START = time.perf_counter()  # 用于--startup-profile的起点
+
+import argparse
+
 from config import AUTO_SELECT_COURSE
 
-# 禁用SSL警告
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# 其余模块（requests、asyncio、UI等）在main()中按需导入，使参数解析与--help几乎无需等待
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="SustechJcoder平台助手")
+    parser.add_argument('--no-cache', action='store_true', help='不读取也不写入本地响应缓存')
+    parser.add_argument('--refresh', action='store_true', help='忽略本地缓存，从服务器重新获取并更新缓存')
+    parser.add_argument('--diagnostics', action='store_true', help='加载数据后显示并发控制与缓存的诊断信息')
+    parser.add_argument('--startup-profile', action='store_true', help='在第一个输入提示前输出启动与模块导入耗时')
+    parser.add_argument('--daemon', action='store_true', help='子命令交给已启动的本地守护进程执行（见 oja daemon start）')
+    parser.add_argument('--offline', action='store_true',
+                        help='不连接OJ，浏览本地缓存与oja sync镜像中的数据，提交在恢复连接后进行')
+
+    # 子命令：不经过菜单直接执行操作，未指定子命令时进入交互模式
+    from ui.commands import add_command_parsers
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    add_command_parsers(subparsers)
+    return parser.parse_args(argv)
+
+def _preload_modules(names):
+    """在后台线程中预先导入模块，使导入耗时与登录时的网络等待重叠"""
+    from importlib import import_module
+
+    for name in names:
+        try:
+            import_module(name)
+        except ImportError:
+            pass
+
+def _start_session_keeper(requester):
+    """登录成功后启动后台会话刷新"""
+    from config import SESSION_REFRESH_INTERVAL
+
+    if SESSION_REFRESH_INTERVAL > 0:
+        requester.start_session_keeper(SESSION_REFRESH_INTERVAL)
+
+def _login_or_offline(args, requester, login):
+    """登录；指定--offline、无法连接OJ或登录失败而本地有数据时改为离线模式
+
+    Args:
+        login: 登录函数，接受requester，失败时返回假值
+
+    Returns:
+        (requester, 登录函数的返回值)：离线时为OfflineRequester与None，无法继续时为 (None, None)
+    """
+    import requests
+    from services import open_offline_requester
+
+    if not args.offline:
+        try:
+            result = login(requester)
+            if result:
+                return requester, result
+        except requests.exceptions.RequestException as e:
+            print(f"\n[\x1b[0;31mx\x1b[0m] 无法连接到OJ: {e.__class__.__name__}")
+
+    offline = open_offline_requester(requester.cache, requester.code_store)
+    if not offline.check_cookies_status():
+        if args.offline:
+            print("[\x1b[0;31mx\x1b[0m] 本地没有可浏览的数据，请在联网时运行一次oja或oja sync")
+        return None, None
+    if not args.offline:
+        print("[\x1b[0;33m!\x1b[0m] 使用本地数据进入离线模式（下次可用--offline直接进入）")
+    print("[\x1b[0;33m!\x1b[0m] 离线模式：显示本地保存的数据，行尾标记数据获取于多久之前；提交将在恢复连接后进行")
+    return offline, None
+
+def _submit_queued(requester):
+    """登录成功后提交离线时排队的作业"""
+    from services import open_submission_queue
+
+    queue = open_submission_queue()
+    if len(queue):
+        from ui.submission import submit_queued_submissions
+        submit_queued_submissions(requester, queue)
 
 # 主函数
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.startup_profile:
+        from utils.startup_profile import StartupProfiler
+        StartupProfiler(_PROCESS_START).install()
+
+    # 守护进程管理，以及交给守护进程执行的子命令，都不需要在本进程中登录
+    if args.command == 'daemon':
+        from services.daemon import command_daemon
+        command_daemon(args)
+        return
+    if args.command == 'watch' and args.daemon:
+        print("[\x1b[0;33m!\x1b[0m] watch需要在前台持续运行，不交给守护进程执行")
+    elif args.command and args.daemon and not args.offline:
+        from services.daemon import run_via_daemon
+        if run_via_daemon(args) is not None:
+            return
+        print("[\x1b[0;33m!\x1b[0m] 守护进程未运行，直接执行命令")
+
+    # 交互模式在登录后才需要数据处理与界面模块，登录期间在后台提前导入
+    if not args.command:
+        import threading
+        threading.Thread(target=_preload_modules, daemon=True, args=(
+            ['asyncio', 'services.data_service', 'ui.display', 'ui.interaction', 'ui.submission'],)).start()
+
+    from services import OJRequester, open_response_cache, open_code_store
+    from ui import display_diagnostics
+
     # 创建一个OJ请求实例
-    requester = OJRequester()
+    cache = None if args.no_cache else open_response_cache(refresh=args.refresh)
+    requester = OJRequester(cache=cache, code_store=open_code_store())
+
+    # 非交互模式：直接执行子命令
+    if args.command:
+        from services import handle_login
+        from ui.commands import run_command
 
-    # 处理登录
-    if not handle_login(requester):
-        return  # 如果登录失败，退出程序
+        requester, _ = _login_or_offline(args, requester, handle_login)
+        if requester is None:
+            return  # 如果登录失败且没有本地数据，退出程序
+        if requester.offline:
+            if args.command in ('watch', 'sync', 'test-download'):
+                print(f"[\x1b[0;31mx\x1b[0m] {args.command} 需要连接OJ，离线模式下不可用")
+                return
+        else:
+            _start_session_keeper(requester)
+            _submit_queued(requester)
+        run_command(args, requester)
+        if args.diagnostics:
+            display_diagnostics(requester)
+        return
 
-    # 获取并显示课程列表
-    courses = display_courses(requester)
+    import asyncio
+    from services import fetch_and_process_homeworks_async, fetch_and_process_problems_async
+    from services.startup import pipelined_startup, save_course_hint
+    from ui import display_courses, display_homeworks, select_course, select_homework, interact_with_problems
+
+    # 处理登录：验证cookies得到的课程列表直接复用，同时预取上次课程的作业列表
+    # 无法连接OJ时使用本地数据进入离线模式
+    requester, startup = _login_or_offline(
+        args, requester, lambda r: pipelined_startup(r, auto_select_course=AUTO_SELECT_COURSE))
+    if requester is None:
+        return  # 如果登录失败且没有本地数据，退出程序
+    if requester.offline:
+        courses, speculative = requester.courses, None
+    else:
+        courses, speculative = startup
+        _start_session_keeper(requester)
+        _submit_queued(requester)
+
+    # 显示课程列表
+    courses = display_courses(requester, courses)
     if not courses:
         return  # 如果无法获取课程列表，退出程序
 
@@ -25,32 +163,60 @@ def main():
     if not selected_course:
         return  # 如果无法选择课程，退出程序
 
+    # 预取的作业列表只有在课程一致时才使用，否则记录新的课程供下次预取
+    prefetched_homeworks = None
+    if speculative and speculative[0] == selected_course:
+        prefetched_homeworks = speculative[1]
+    else:
+        save_course_hint(selected_course)
+
     from config import AUTO_SELECT_HOMEWORK
+    from services.prefetch import Prefetcher
     auto_select_homework = AUTO_SELECT_HOMEWORK
+    prefetcher = Prefetcher()  # 停留在输入提示时预取下一步可能需要的数据
 
     while True:
         # 获取作业列表并处理
-        enriched_homeworks = sorted(fetch_and_process_homeworks(requester, selected_course), key=lambda x: x['homeworkId'])
+        if prefetched_homeworks:
+            enriched_homeworks, prefetched_homeworks = prefetched_homeworks, None
+        else:
+            enriched_homeworks = asyncio.run(fetch_and_process_homeworks_async(requester, selected_course))
         if not enriched_homeworks:
             return  # 如果无法获取作业列表，退出程序
+        enriched_homeworks = sorted(enriched_homeworks, key=lambda x: x['homeworkId'])
 
         # 显示作业列表
         if not display_homeworks(enriched_homeworks):
             return  # 如果无法显示作业列表，退出程序
 
-        # 用户选择作业
+        # 用户选择作业，等待输入时预取默认选项（最近的作业）的题目
+        if not auto_select_homework:
+            default_homework = enriched_homeworks[-1]['homeworkId']
+            prefetcher.speculate(('problems', selected_course, default_homework), fetch_and_process_problems_async,
+                                 requester, default_homework, selected_course, verbose=False)
 
         selected_homework = select_homework(enriched_homeworks, auto_select_first=auto_select_homework)
+        if requester.keeper is not None:
+            requester.keeper.report_failures()  # 等待输入期间后台刷新会话失败时在此告知
         if not selected_homework:
             return  # 如果用户没有选择有效的作业，退出程序
 
-        # 获取问题列表并处理，包括获取提交记录
-        enriched_problems = fetch_and_process_problems(requester, selected_homework, selected_course)
+        # 获取问题列表并处理，包括获取提交记录；选择了其他作业时取消预取
+        enriched_problems = prefetcher.claim(('problems', selected_course, selected_homework))
+        prefetcher.cancel_all()
+        if enriched_problems is None:
+            enriched_problems = asyncio.run(fetch_and_process_problems_async(requester, selected_homework,
+                                                                             selected_course))
         if not enriched_problems:
             return  # 如果无法获取问题列表，退出程序
+        if args.diagnostics:
+            display_diagnostics(requester)
+            print(prefetcher.describe())
+        elif requester.cache is not None:
+            print(f"[\x1b[0;36m!\x1b[0m] {requester.cache.summary()}")
 
         # 处理与问题的交互（查看详情和提交作业）
-        if interact_with_problems(enriched_problems, selected_course, selected_homework, requester):
+        if interact_with_problems(enriched_problems, selected_course, selected_homework, requester, prefetcher):
             return  # 正常退出
         # 如果返回False，则继续外层循环，即返回到作业列表
 
@@ -1,12 +1,57 @@
-"""服务层模块，提供认证、数据获取处理和API通信服务。"""
+"""服务层模块，提供认证、数据获取处理和API通信服务。
 
-from .requester import OJRequester
-from .auth_service import handle_login
-from .data_service import fetch_and_process_homeworks, fetch_and_process_problems, download_unit_test_file
+子模块在首次访问对应名称时才导入，避免启动时加载requests、asyncio、sqlite3等较重的依赖。
+"""
+
+from importlib import import_module
+
+# 公开名称 -> 所在子模块
+_EXPORTS = {
+    'OJRequester': '.requester',
+    'AsyncOJRequester': '.async_requester',
+    'ResponseCache': '.response_cache',
+    'open_response_cache': '.response_cache',
+    'CodeStore': '.code_store',
+    'open_code_store': '.code_store',
+    'SessionManager': '.session_manager',
+    'handle_login': '.auth_service',
+    'fetch_and_process_homeworks': '.data_service',
+    'fetch_and_process_problems': '.data_service',
+    'fetch_and_process_homeworks_async': '.data_service',
+    'fetch_and_process_problems_async': '.data_service',
+    'refresh_problem_records': '.data_service',
+    'download_unit_test_file': '.data_service',
+    'download_homework_unit_tests': '.data_service',
+    'CourseSync': '.course_sync',
+    'OfflineRequester': '.offline',
+    'open_offline_requester': '.offline',
+    'open_submission_queue': '.offline',
+    'submit_batch': '.batch_service',
+    'poll_batch_results': '.batch_service',
+}
 
 __all__ = [
     'OJRequester',
+    'AsyncOJRequester',
+    'ResponseCache',
+    'open_response_cache',
+    'CodeStore',
+    'open_code_store',
+    'SessionManager',
     'handle_login',
     'fetch_and_process_homeworks',
-    'fetch_and_process_problems'
-]
\ No newline at end of file
+    'fetch_and_process_problems',
+    'fetch_and_process_homeworks_async',
+    'fetch_and_process_problems_async',
+    'refresh_problem_records',
+    'submit_batch',
+    'poll_batch_results'
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value  # 之后的访问不再经过__getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class AsyncOJRequester:
+    """OJRequester的asyncio包装
+
+    复用同一个OJRequester的会话、端点与CSRF/Referer请求头，
+    每个请求在线程池中执行，并由信号量限制同时进行的请求数；
+    信号量之内，实际并发数再由requester.concurrency动态调整。
+
+    Args:
+        requester: OJRequester实例
+        max_concurrency: 同时进行的最大请求数，默认使用并发控制器的上限
+        reauth: 为False时请求被拒绝不重新登录（只影响本实例的线程池中的请求）
+    """
+
+    def __init__(self, requester, max_concurrency=None, reauth=True):
+        if max_concurrency is None:
+            max_concurrency = requester.concurrency.max_limit
+
+        self.requester = requester
+        self.reauth = reauth
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """关闭内部线程池"""
+        self._executor.shutdown(wait=False)
+
+    async def _call(self, func, *args):
+        """在线程池中执行一个阻塞请求，受并发上限约束"""
+        # 信号量需要在事件循环中创建
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, partial(self._run, func, *args))
+
+    def _run(self, func, *args):
+        if self.reauth:
+            return func(*args)
+        with self.requester.without_reauth():
+            return func(*args)
+
+    async def get_my_courses(self):
+        return await self._call(self.requester.get_my_courses)
+
+    async def get_homeworks_list(self, course_id):
+        return await self._call(self.requester.get_homeworks_list, course_id)
+
+    async def list_homeworks(self, course_id):
+        """获取课程的全部作业（自动翻页）"""
+        return await self._call(lambda: list(self.requester.iter_homeworks(course_id)))
+
+    async def get_homework_info(self, homework_id, course_id):
+        return await self._call(self.requester.get_homework_info, homework_id, course_id)
+
+    async def get_homework_problems(self, homework_id, course_id):
+        return await self._call(self.requester.get_homework_problems, homework_id, course_id)
+
+    async def get_problem_info(self, problem_id, homework_id, course_id):
+        return await self._call(self.requester.get_problem_info, problem_id, homework_id, course_id)
+
+    async def get_problem_submission_records(self, problem_id, homework_id, course_id):
+        return await self._call(self.requester.get_problem_submission_records, problem_id, homework_id, course_id)
+
+    async def get_submission_result(self, record_id, course_id, homework_id):
+        return await self._call(self.requester.get_submission_result, record_id, course_id, homework_id)
@@ -14,17 +14,20 @@ def handle_login(requester):
 
     # 如果cookies无效或未找到，执行新的登录
     if not login_successful:
+        return cas_relogin(requester)
 
-        username = config.USERNAME
-        password = config.PASSWORD
+    return login_successful
 
-        if requester.cas_login(username, password):
-            print("[\x1b[0;32m+\x1b[0m] CAS 登录成功")
-            # 保存新的cookies
-            requester.save_cookies()
-            return True
-        else:
-            print("[\x1b[0;31mx\x1b[0m] CAS 登录失败")
-            return False
 
-    return login_successful
\ No newline at end of file
+def cas_relogin(requester):
+    """执行CAS登录并保存新的cookies"""
+    username = config.USERNAME
+    password = config.PASSWORD
+
+    # 在凭证文件的锁内登录并保存新的cookies，其他进程已登录时直接复用
+    if requester.login_shared(username, password):
+        print("[\x1b[0;32m+\x1b[0m] CAS 登录成功")
+        return True
+    else:
+        print("[\x1b[0;31mx\x1b[0m] CAS 登录失败")
+        return False
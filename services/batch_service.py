@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+
+from .grading_poller import GradingScheduler, open_judge_latency_model
+
+
+def submit_batch(requester, course_id, homework_id, assignments):
+    """并发提交多道题目
+
+    Args:
+        requester: OJRequester实例
+        course_id: 课程ID
+        homework_id: 作业ID
+        assignments: [(problem, file_paths), ...]，每道题目及其要提交的Java文件（路径列表或FileBundle）
+
+    Returns:
+        list: 与assignments顺序一致的 [(problem, record_id, submitted_at), ...]，
+              提交失败的题目record_id为None
+    """
+    if not assignments:
+        return []
+
+    def submit_one(problem, file_paths):
+        result = requester.submit_homework(homework_id, problem['problemId'], course_id, file_paths)
+        record_id = result.get('recordId') if result else None
+        return problem, record_id, time.monotonic()
+
+    submissions = [None] * len(assignments)
+    max_workers = max(1, min(requester.concurrency.max_limit, len(assignments)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(submit_one, problem, file_paths): i
+                   for i, (problem, file_paths) in enumerate(assignments)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                submissions[index] = future.result()
+            except Exception as exc:
+                problem = assignments[index][0]
+                print(f"\n[\x1b[0;31mx\x1b[0m] 提交题目 {problem.get('problemId', 'Unknown')} 时出错: {exc}")
+                submissions[index] = (problem, None, time.monotonic())
+
+    return submissions
+
+
+def poll_batch_results(requester, course_id, homework_id, submissions, on_done, deadline=None):
+    """用一个调度器轮询所有已提交记录的批改结果
+
+    Args:
+        requester: OJRequester实例
+        course_id: 课程ID
+        homework_id: 作业ID
+        submissions: submit_batch的返回值
+        on_done: 每条记录结束时调用，参数为(problem, record_id, result)，
+                 result为批改结果、False（获取失败）或None（超时）
+        deadline: 每条记录的最长等待时间（秒），默认使用config.GRADING_DEADLINE
+    """
+    if deadline is None:
+        from config import GRADING_DEADLINE
+        deadline = GRADING_DEADLINE
+
+    scheduler = GradingScheduler(requester, open_judge_latency_model(), deadline)
+    for problem, record_id, submitted_at in submissions:
+        if record_id is not None:
+            scheduler.add(record_id, course_id, homework_id, problem, submitted_at=submitted_at)
+
+    scheduler.run(lambda entry, result: on_done(entry['problem'], entry['record_id'], result))
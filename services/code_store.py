@@ -0,0 +1,245 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+
+
+class LazyCode(Mapping):
+    """提交记录中代码的引用，只保存 {文件名: SHA-256}，读取内容时才从CodeStore加载
+
+    可以像原来的 {文件名: 代码} 字典一样使用（items()、遍历、取值）。
+    """
+
+    __slots__ = ('refs', '_store')
+
+    def __init__(self, refs, store):
+        self.refs = refs
+        self._store = store
+
+    def __getitem__(self, file_name):
+        content = self._store.get(self.refs[file_name])
+        return content if content is not None else ''  # 代码文件已从本地存储中删除
+
+    def __iter__(self):
+        return iter(self.refs)
+
+    def __len__(self):
+        return len(self.refs)
+
+    def hashes(self):
+        """返回 {文件名: SHA-256}，无需读取代码内容"""
+        return dict(self.refs)
+
+    def __repr__(self):
+        return f"LazyCode({self.refs!r})"
+
+# 已有的提交再次出现时更新结果（可能从批改中变为已完成），但不覆盖已知结果为空值
+_UPSERT_SUBMISSION = (
+    "INSERT INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT(record_id) DO UPDATE SET fileset=excluded.fileset,"
+    " result_state=COALESCE(excluded.result_state, result_state),"
+    " score=COALESCE(excluded.score, score),"
+    " submission_time=COALESCE(excluded.submission_time, submission_time)"
+)
+
+
+def fileset_hash(files_hashes):
+    """由 {文件名: SHA-256} 计算整次提交的哈希，与文件顺序无关"""
+    digest = hashlib.sha256()
+    for file_name, sha256 in sorted(files_hashes.items()):
+        digest.update(f"{file_name}\0{sha256}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CodeStore:
+    """按内容SHA-256保存提交记录中的代码文件，并在SQLite中索引 recordId -> 各文件的哈希
+
+    相同内容的文件只保存一份；已索引的记录再次出现时直接使用索引，不再计算哈希或写入文件。
+    哈希与ui.submission.get_file_hash一致（UTF-8编码后的SHA-256），可直接与本地文件比较。
+    另外按题目记录每次提交的文件集合哈希与结果，用于在提交前查找历史上内容完全相同的提交。
+
+    Args:
+        root: 存储目录，代码文件保存在 root/blobs/ 下，索引为 root/index.sqlite3
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite3'), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS record_files ("
+            " record_id TEXT NOT NULL,"
+            " file_name TEXT NOT NULL,"
+            " sha256 TEXT NOT NULL,"
+            " course_id TEXT NOT NULL,"
+            " homework_id TEXT NOT NULL,"
+            " problem_id TEXT NOT NULL,"
+            " PRIMARY KEY (record_id, file_name))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sha256 ON record_files (sha256)")
+        # 每次提交的文件集合哈希与结果，按题目+文件集合哈希查找历史上相同的提交
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS submissions ("
+            " record_id TEXT PRIMARY KEY,"
+            " course_id TEXT NOT NULL,"
+            " homework_id TEXT NOT NULL,"
+            " problem_id TEXT NOT NULL,"
+            " fileset TEXT NOT NULL,"
+            " result_state TEXT,"
+            " score REAL,"
+            " submission_time TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_fileset ON submissions (course_id, homework_id, problem_id, fileset)")
+        self._conn.commit()
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.blob_dir, sha256[:2], sha256)
+
+    def put(self, content):
+        """保存代码内容，返回其SHA-256"""
+        data = content.encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return sha256
+
+    def get(self, sha256):
+        """读取代码内容，不存在时返回None"""
+        try:
+            with open(self._blob_path(sha256), 'rb') as f:
+                return f.read().decode('utf-8')
+        except OSError:
+            return None
+
+    def record_hashes(self, record_id):
+        """返回已索引记录的 {文件名: SHA-256}，未索引时返回空字典"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_name, sha256 FROM record_files WHERE record_id=?", (str(record_id),)
+            ).fetchall()
+        return dict(rows)
+
+    def externalize(self, records, course_id, homework_id, problem_id):
+        """将记录中的代码保存到存储中，并把record['code']替换为LazyCode引用
+
+        Args:
+            records: 提交记录列表（原地修改）
+            course_id: 课程ID
+            homework_id: 作业ID
+            problem_id: 题目ID
+        """
+        new_rows = []
+        submissions = []
+        for record in records:
+            code = record.get('code')
+            if isinstance(code, LazyCode):
+                refs = code.refs
+            elif isinstance(code, dict) and code:
+                record_id = record.get('recordId')
+                refs = self.record_hashes(record_id) if record_id is not None else {}
+                if set(refs) != set(code):
+                    refs = {file_name: self.put(content or '') for file_name, content in code.items()}
+                    if record_id is not None:
+                        new_rows.extend((str(record_id), file_name, sha256, str(course_id), str(homework_id),
+                                         str(problem_id)) for file_name, sha256 in refs.items())
+                record['code'] = LazyCode(refs, self)
+            else:
+                continue
+
+            if record.get('recordId') is not None:
+                submissions.append((str(record['recordId']), str(course_id), str(homework_id), str(problem_id),
+                                    fileset_hash(refs), record.get('resultState'), record.get('score'),
+                                    record.get('submissionTime')))
+
+        if new_rows or submissions:
+            with self._lock:
+                self._conn.executemany("INSERT OR REPLACE INTO record_files VALUES (?, ?, ?, ?, ?, ?)", new_rows)
+                self._conn.executemany(_UPSERT_SUBMISSION, submissions)
+                self._conn.commit()
+        return records
+
+    def record_submission(self, record_id, course_id, homework_id, problem_id, files):
+        """记录一次刚完成的提交（结果未知），使之后的重复检查无需重新获取提交记录
+
+        Args:
+            record_id: 提交返回的记录ID
+            course_id: 课程ID
+            homework_id: 作业ID
+            problem_id: 题目ID
+            files: 提交的 {文件名: 代码}
+        """
+        refs = {file_name: self.put(content) for file_name, content in files.items()}
+        row = (str(record_id), str(course_id), str(homework_id), str(problem_id), fileset_hash(refs),
+               None, None, time.strftime('%Y-%m-%d %H:%M:%S'))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO record_files VALUES (?, ?, ?, ?, ?, ?)",
+                                   [(str(record_id), file_name, sha256, str(course_id), str(homework_id),
+                                     str(problem_id)) for file_name, sha256 in refs.items()])
+            self._conn.execute(_UPSERT_SUBMISSION, row)
+            self._conn.commit()
+
+    def update_result(self, record_id, result_state, score):
+        """批改完成后更新提交的结果"""
+        with self._lock:
+            self._conn.execute("UPDATE submissions SET result_state=?, score=? WHERE record_id=?",
+                               (result_state, score, str(record_id)))
+            self._conn.commit()
+
+    def find_submission(self, course_id, homework_id, problem_id, files_hashes):
+        """查找该题目历史上文件内容完全相同的提交
+
+        Args:
+            files_hashes: {文件名: SHA-256}，即FileBundle.hashes()的返回值
+
+        Returns:
+            最近一次相同提交的 {recordId, resultState, score, submissionTime}，没有则返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record_id, result_state, score, submission_time FROM submissions"
+                " WHERE course_id=? AND homework_id=? AND problem_id=? AND fileset=?"
+                " ORDER BY submission_time DESC LIMIT 1",
+                (str(course_id), str(homework_id), str(problem_id), fileset_hash(files_hashes))).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('recordId', 'resultState', 'score', 'submissionTime'), row))
+
+    def problem_records(self, course_id, homework_id, problem_id):
+        """离线时由索引重建题目的提交记录（最近的在前），代码按需从存储中读取"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_id, result_state, score, submission_time FROM submissions"
+                " WHERE course_id=? AND homework_id=? AND problem_id=? ORDER BY submission_time DESC",
+                (str(course_id), str(homework_id), str(problem_id))).fetchall()
+        return [{'recordId': record_id, 'resultState': result_state or 'Unknown', 'score': score,
+                 'submissionTime': submission_time, 'code': LazyCode(self.record_hashes(record_id), self)}
+                for record_id, result_state, score, submission_time in rows]
+
+    def summary(self):
+        """返回已索引记录数与代码文件数的文本"""
+        with self._lock:
+            records, blobs = self._conn.execute(
+                "SELECT COUNT(DISTINCT record_id), COUNT(DISTINCT sha256) FROM record_files").fetchone()
+            filesets = self._conn.execute("SELECT COUNT(DISTINCT fileset) FROM submissions").fetchone()[0]
+        return f"代码存储: 已索引 {records} 条提交记录（{filesets} 种不同的提交内容），{blobs} 个不同的代码文件"
+
+
+def open_code_store():
+    """根据config中的设置创建代码存储，打开失败时返回None（记录中保留原始代码）"""
+    from config import CODE_STORE_DIR
+
+    try:
+        return CodeStore(CODE_STORE_DIR)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[\x1b[0;33m!\x1b[0m] 无法打开代码存储，提交记录的代码将保留在内存中: {e}")
+        return None
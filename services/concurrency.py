@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class ConcurrencyController:
+    """根据观测到的延迟与错误自适应调整同时进行的请求数
+
+    采用加性增、乘性减（AIMD）策略：
+    - 一轮（约等于当前上限个）请求都正常且延迟未明显升高时，上限加1
+    - 延迟超过基线的latency_tolerance倍时，上限减1
+    - 收到429/5xx或请求超时时，上限减半
+    两次降低之间至少间隔cooldown秒，避免一批慢请求把上限一次压到底。
+
+    Args:
+        initial: 初始并发上限
+        min_limit: 并发上限的最小值
+        max_limit: 并发上限的最大值
+        latency_tolerance: 判定延迟升高的倍数阈值
+        cooldown: 两次降低上限之间的最短间隔（秒）
+        baseline_window: 基线取最近多少个正常响应的最低延迟
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=16, latency_tolerance=2.0, cooldown=1.0,
+                 baseline_window=50):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+
+        self._limit = min(max(initial, self.min_limit), self.max_limit)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._successes = 0
+        self._baseline = None  # 最近若干个响应中的最低延迟（秒），作为无拥塞时的基线
+        self._recent = deque(maxlen=max(1, baseline_window))  # 最近正常响应的延迟，偶然的极快响应会逐渐移出
+        self._last_decrease = 0.0
+
+        self.decisions = deque(maxlen=50)  # (时间戳, 旧上限, 新上限, 原因)
+        self.stats = {'requests': 0, 'throttled': 0, 'server_errors': 0, 'timeouts': 0, 'waits': 0}
+
+    @property
+    def limit(self):
+        return self._limit
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self):
+        """等待直到有空闲的并发名额"""
+        with self._cond:
+            if self._in_flight >= self._limit:
+                self.stats['waits'] += 1
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """在with块内占用一个并发名额"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _set_limit(self, new_limit, reason):
+        """修改上限并记录决策，调用方需持有锁"""
+        new_limit = min(max(new_limit, self.min_limit), self.max_limit)
+        if new_limit != self._limit:
+            self.decisions.append((time.time(), self._limit, new_limit, reason))
+            self._limit = new_limit
+            self._successes = 0
+            self._cond.notify_all()
+
+    def _decrease(self, new_limit, reason):
+        """降低上限，冷却期内只生效一次，调用方需持有锁"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._set_limit(new_limit, reason)
+
+    def record_response(self, status_code, elapsed):
+        """记录一次已完成的请求
+
+        Args:
+            status_code: HTTP状态码
+            elapsed: 请求耗时（秒）
+        """
+        with self._cond:
+            self.stats['requests'] += 1
+
+            if status_code == 429:
+                self.stats['throttled'] += 1
+                self._decrease(self._limit // 2, "HTTP 429")
+                return
+            if status_code >= 500:
+                self.stats['server_errors'] += 1
+                self._decrease(self._limit // 2, f"HTTP {status_code}")
+                return
+
+            self._recent.append(elapsed)
+            self._baseline = min(self._recent)
+
+            if elapsed > self._baseline * self.latency_tolerance and elapsed - self._baseline > 0.05:
+                self._decrease(self._limit - 1,
+                               f"延迟 {elapsed * 1000:.0f}ms 超过基线 {self._baseline * 1000:.0f}ms")
+                return
+
+            self._successes += 1
+            if self._successes >= self._limit:
+                self._set_limit(self._limit + 1, f"{self._successes} 个请求正常完成")
+
+    def record_timeout(self):
+        """记录一次请求超时"""
+        with self._cond:
+            self.stats['requests'] += 1
+            self.stats['timeouts'] += 1
+            self._decrease(self._limit // 2, "请求超时")
+
+    def describe(self):
+        """返回当前上限、统计与最近决策的文本，用于诊断输出"""
+        lines = [
+            f"并发上限: {self._limit} (范围 {self.min_limit}-{self.max_limit})，进行中: {self._in_flight}",
+            "请求: {requests}，429: {throttled}，5xx: {server_errors}，超时: {timeouts}，排队等待: {waits}".format(**self.stats),
+        ]
+        if self._baseline is not None:
+            lines.append(f"基线延迟: {self._baseline * 1000:.0f}ms")
+        for timestamp, old, new, reason in list(self.decisions)[-10:]:
+            moment = time.strftime('%H:%M:%S', time.localtime(timestamp))
+            lines.append(f"  {moment} {old} -> {new}: {reason}")
+        return "\n".join(lines)
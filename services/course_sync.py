@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+
+STATE_FILE = 'sync_state.json'
+CLOSED_STATES = (3, 4)  # 已截止/已完成的作业视为不再变化
+
+
+def content_hash(data):
+    """JSON内容的SHA-256，键的顺序不影响结果"""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def safe_name(name):
+    """与单元测试目录一致的文件名替换规则"""
+    return re.sub(r'[\\/:*?"<>|]', '-', str(name))
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _records_for_hash(records):
+    """计算哈希用的提交记录：代码已在CodeStore中时使用其哈希，无需读取内容"""
+    result = []
+    for record in records:
+        code = record.get('code')
+        if hasattr(code, 'hashes'):
+            record = dict(record, code=code.hashes())
+        result.append(record)
+    return result
+
+
+def _plain_records(records):
+    """写入文件用的提交记录：把LazyCode展开为 {文件名: 代码}"""
+    return [dict(record, code=dict(record['code'].items())) if record.get('code') else dict(record)
+            for record in records]
+
+
+class CourseSync:
+    """将一门课程的作业、题目详情、提交记录与单元测试镜像到本地目录
+
+    目录结构:
+        {root}/{课程ID}/sync_state.json
+        {root}/{课程ID}/{作业ID}_{作业名}/homework.json
+        {root}/{课程ID}/{作业ID}_{作业名}/{题目ID}_{题目名}/problem.json、records.json、README.md、MainTest.java
+
+    sync_state.json记录课程信息以及每份作业与每道题目内容的哈希，只有哈希变化的题目才重新写入；
+    已截止/已完成的作业在同步完成后不再请求。每完成一份作业就保存一次状态，
+    中断后再次运行会跳过上次已同步的作业继续。
+
+    Args:
+        requester: 已登录的OJRequester
+        course_id: 课程ID
+        root: 镜像根目录
+        downloader: 可选的UnitTestDownloader，为None时不下载单元测试
+        full: 为True时忽略已有状态，重新请求并写入所有内容
+    """
+
+    def __init__(self, requester, course_id, root, downloader=None, full=False):
+        self.requester = requester
+        self.course_id = course_id
+        self.course_dir = os.path.join(root, safe_name(course_id))
+        self.state_path = os.path.join(self.course_dir, STATE_FILE)
+        self.downloader = downloader
+        self.full = full
+        self.state = {'homeworks': {}} if full else self._load_state()
+        self.summary = {
+            'homeworks': {'new': 0, 'changed': 0, 'unchanged': 0, 'skipped': 0, 'resumed': 0, 'failed': 0},
+            'problems': {'new': 0, 'changed': 0, 'unchanged': 0},
+            'unit_tests': {'downloaded': 0, 'unchanged': 0, 'missing': 0, 'error': 0},
+            'changes': [],  # [(作业ID, 题目ID或None, 'new'/'changed'), ...]
+            'interrupted': False,
+            'directory': self.course_dir,
+        }
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state, dict) and isinstance(state.get('homeworks'), dict):
+                return state
+        except (OSError, ValueError):
+            pass
+        return {'homeworks': {}}
+
+    def _save_state(self):
+        try:
+            _write_json(self.state_path, self.state)
+        except OSError as e:
+            print(f"[\x1b[0;33m!\x1b[0m] 保存同步状态失败: {e}")
+
+    def run(self):
+        """执行同步，中断（Ctrl+C）时保存进度后返回
+
+        Returns:
+            同步摘要字典，获取作业列表失败时返回None
+        """
+        homeworks = list(self.requester.iter_homeworks(self.course_id))
+        if not homeworks:
+            print("[\x1b[0;31mx\x1b[0m] 无法获取作业列表或列表为空")
+            return None
+
+        # 记录课程信息，离线模式据此在课程列表中显示课程名
+        courses = (self.requester.courses or {}).get('list') or []
+        course = next((c for c in courses if str(c.get('course_id')) == str(self.course_id)), None)
+        if course is not None:
+            self.state['course'] = course
+
+        # 上次同步未完成时，跳过其中已同步的作业
+        last_run = self.state.get('last_run') or {}
+        resume = set() if last_run.get('finished', True) else set(last_run.get('done', []))
+        if resume:
+            print(f"[\x1b[0;36m!\x1b[0m] 继续上次中断的同步，跳过已同步的 {len(resume)} 份作业")
+        else:
+            self.state['last_run'] = {'started_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'finished': False, 'done': []}
+
+        try:
+            for index, homework in enumerate(homeworks, 1):
+                homework_id = str(homework.get('homeworkId'))
+                print(f"\r[\x1b[0;36m!\x1b[0m] 同步作业 {index}/{len(homeworks)}: {homework_id}" + " " * 10, end='')
+                if homework_id in resume:
+                    self.summary['homeworks']['resumed'] += 1
+                    continue
+                if self._sync_homework(homework):
+                    self.state['last_run']['done'].append(homework_id)
+                    self._save_state()
+            self.state['last_run']['finished'] = True
+        except KeyboardInterrupt:
+            self.summary['interrupted'] = True
+        finally:
+            print("\r" + " " * 60 + "\r", end="")
+            self._save_state()
+            if self.downloader is not None:
+                self.downloader.cache.save()
+        return self.summary
+
+    def _is_immutable(self, homework, entry):
+        """已截止/已完成且在该状态下完整同步过的作业不再请求"""
+        return (not self.full and entry is not None and entry.get('complete')
+                and entry.get('state') in CLOSED_STATES and homework.get('state') in CLOSED_STATES)
+
+    def _sync_homework(self, homework):
+        """同步一份作业，返回是否完整同步"""
+        from .data_service import fetch_and_process_problems_async
+
+        homework_id = homework.get('homeworkId')
+        key = str(homework_id)
+        entry = self.state['homeworks'].get(key)
+        if self._is_immutable(homework, entry):
+            self.summary['homeworks']['skipped'] += 1
+            return True
+
+        info = self.requester.get_homework_info(homework_id, self.course_id)
+        problems = asyncio.run(fetch_and_process_problems_async(self.requester, homework_id, self.course_id,
+                                                                verbose=False))
+        if not info or problems is None:
+            self.summary['homeworks']['failed'] += 1
+            return False
+
+        homework_dir = os.path.join(self.course_dir, f"{homework_id}_{safe_name(homework.get('homeworkName', ''))}")
+        old_problems = (entry or {}).get('problems', {})
+        problem_hashes = {}
+        for problem in problems:
+            problem_hashes[str(problem.get('problemId'))] = self._sync_problem(homework_id, homework_dir, problem,
+                                                                               old_problems)
+
+        if self.downloader is not None:
+            for _, status, _ in self.downloader.download_homework(self.course_id, homework_id, problems, homework_dir):
+                self.summary['unit_tests'][status] += 1
+
+        homework_hash = content_hash({'homework': homework, 'info': info, 'problems': problem_hashes})
+        if entry is None or entry.get('hash') != homework_hash or not os.path.isdir(homework_dir):
+            _write_json(os.path.join(homework_dir, 'homework.json'), {'homework': homework, 'info': info})
+            change = 'new' if entry is None else 'changed'
+            self.summary['homeworks'][change] += 1
+            self.summary['changes'].append((homework_id, None, change))
+        else:
+            self.summary['homeworks']['unchanged'] += 1
+
+        self.state['homeworks'][key] = {
+            'hash': homework_hash,
+            'state': homework.get('state'),
+            'complete': True,
+            'problems': problem_hashes,
+            'synced_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        return True
+
+    def _sync_problem(self, homework_id, homework_dir, problem, old_problems):
+        """题目内容的哈希与上次不同时写入文件，返回新的哈希"""
+        from utils.file_handlers import render_problem_markdown
+
+        problem_id = problem.get('problemId')
+        records = problem.get('submission_records') or []
+        listing = {k: v for k, v in problem.items() if k not in ('details', 'submission_records')}
+        problem_hash = content_hash({'problem': listing, 'details': problem.get('details'),
+                                     'records': _records_for_hash(records)})
+
+        problem_dir = os.path.join(homework_dir, f"{problem_id}_{safe_name(problem.get('problemName', ''))}")
+        old_hash = old_problems.get(str(problem_id))
+        if old_hash == problem_hash and os.path.isdir(problem_dir):
+            self.summary['problems']['unchanged'] += 1
+            return problem_hash
+
+        _write_json(os.path.join(problem_dir, 'problem.json'), dict(listing, details=problem.get('details')))
+        _write_json(os.path.join(problem_dir, 'records.json'), _plain_records(records))
+        with open(os.path.join(problem_dir, 'README.md'), 'w', encoding='utf-8') as f:
+            f.write(render_problem_markdown(problem, self.course_id, homework_id))
+
+        change = 'new' if old_hash is None else 'changed'
+        self.summary['problems'][change] += 1
+        self.summary['changes'].append((homework_id, problem_id, change))
+        return problem_hash
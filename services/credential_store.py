@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(lock_path):
+    """在with块内持有lock_path上的跨进程排他锁"""
+    with open(lock_path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # 内部会重试约10秒
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class CredentialStore:
+    """以JSON保存登录凭证（cookies与CSRF令牌），可被多个同时运行的进程共享
+
+    只保存每个cookie的必要字段及其过期时间；写入时先写临时文件再原子替换，
+    并通过旁边的.lock文件加排他锁，因此并发写入不会损坏文件，读取总能得到完整的内容。
+    每次保存generation加1，进程据此判断凭证是否已被其他进程更新。
+
+    Args:
+        path: 凭证文件路径
+    """
+
+    VERSION = 1
+    COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'expires', 'secure')
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def lock(self):
+        """在with块内持有跨进程的排他锁"""
+        return file_lock(self.lock_path)
+
+    def load(self):
+        """读取凭证，丢弃已过期的cookie
+
+        Returns:
+            dict: 包含generation、saved_at、csrf_token与cookies列表；
+                  文件不存在、格式或版本不符时返回None
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            return None
+
+        now = time.time()
+        data['cookies'] = [cookie for cookie in data.get('cookies', [])
+                           if not cookie.get('expires') or cookie['expires'] > now]
+        return data
+
+    def write(self, cookie_jar, csrf_token):
+        """写入凭证，调用方需持有lock()
+
+        Returns:
+            int: 本次写入的generation
+        """
+        previous = self.load()
+        generation = (previous.get('generation', 0) if previous else 0) + 1
+        data = {
+            'version': self.VERSION,
+            'generation': generation,
+            'saved_at': time.time(),
+            'csrf_token': csrf_token,
+            'cookies': [{field: getattr(cookie, field) for field in self.COOKIE_FIELDS}
+                        for cookie in cookie_jar],
+        }
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        # Windows上目标文件正被读取时替换可能短暂失败，稍后重试
+        for attempt in range(5):
+            try:
+                os.replace(tmp_path, self.path)
+                break
+            except PermissionError:
+                if attempt == 4:
+                    os.remove(tmp_path)
+                    raise
+                time.sleep(0.05)
+        return generation
+
+    def save(self, cookie_jar, csrf_token):
+        """加锁后写入凭证，返回本次写入的generation"""
+        with self.lock():
+            return self.write(cookie_jar, csrf_token)
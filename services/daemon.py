@@ -0,0 +1,386 @@
+"""可选的本地守护进程：常驻持有已登录的OJRequester、连接池与缓存，子命令通过本地套接字交给它执行
+
+客户端只需要导入本模块（不导入requests等依赖），因此通过守护进程执行的子命令
+可以复用已建立的TLS连接与已获取的课程数据，几乎没有启动开销。
+"""
+
+import argparse
+import io
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+# oja所在目录（main.py所在目录），config中的相对路径以此为基准
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# config中表示本地数据文件/目录的设置
+PATH_SETTINGS = (
+    'COOKIES_FILE', 'CACHE_FILE', 'JUDGE_HISTORY_FILE', 'CODE_STORE_DIR', 'WORKSPACE_INDEX_FILE',
+    'FILE_HASH_CACHE', 'STARTUP_STATE_FILE', 'DAEMON_STATE_FILE', 'DAEMON_SOCKET', 'SYNC_DIRECTORY',
+    'OFFLINE_QUEUE_FILE', 'UNIT_TEST_CACHE_DIR',
+)
+
+
+def config_path(name):
+    """返回config中某个路径设置的绝对路径，相对路径以APP_DIRECTORY为基准"""
+    import config
+
+    return os.path.join(APP_DIRECTORY, getattr(config, name))
+
+
+def anchor_config_paths():
+    """将config中所有数据路径改为绝对路径
+
+    守护进程服务于从任意目录运行的客户端，数据文件必须固定在同一位置，
+    不能随进程的工作目录变化。
+    """
+    import config
+
+    for name in PATH_SETTINGS:
+        setattr(config, name, config_path(name))
+
+
+def _read_state():
+    """读取守护进程的地址与令牌，不存在时返回None"""
+    DAEMON_STATE_FILE = config_path('DAEMON_STATE_FILE')
+
+    try:
+        with open(DAEMON_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _connect(state, timeout):
+    if state.get('family') == 'unix':
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = state['address']
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = tuple(state['address'])
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def send_request(request, out=None, timeout=5.0):
+    """向守护进程发送请求，并把其输出写到out
+
+    Args:
+        request: 请求对象，action为run/status/stop
+        out: 输出目标，默认为sys.stdout
+        timeout: 连接超时（秒）；连接后等待结果不设超时（提交可能需要等待批改）
+
+    Returns:
+        dict: 守护进程最后返回的结果；守护进程未运行时返回None
+    """
+    state = _read_state()
+    if not state:
+        return None
+    try:
+        sock = _connect(state, timeout)
+    except OSError:
+        return None
+
+    out = out or sys.stdout
+    with sock:
+        sock.settimeout(None)
+        sock.sendall((json.dumps(dict(request, token=state.get('token'))) + '\n').encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as reader:
+            for line in reader:
+                message = json.loads(line)
+                if 'output' in message:
+                    out.write(message['output'])
+                    out.flush()
+                else:
+                    return message
+    return None
+
+
+def run_via_daemon(args):
+    """通过守护进程执行子命令
+
+    Returns:
+        守护进程返回的命令结果（bool）；守护进程未运行时返回None
+    """
+    arguments = dict(vars(args), cwd=os.getcwd())  # 守护进程据此解析命令中的相对路径
+    if getattr(args, 'output', None):
+        arguments['output'] = os.path.abspath(args.output)
+    response = send_request({'action': 'run', 'args': arguments})
+    return None if response is None else response.get('success', False)
+
+
+def start_daemon(wait=30.0):
+    """在后台启动守护进程，并等待其完成登录开始监听
+
+    Returns:
+        bool: 守护进程是否已就绪
+    """
+    if send_request({'action': 'status'}, out=io.StringIO()) is not None:
+        print("[\x1b[0;33m!\x1b[0m] 守护进程已在运行")
+        return True
+
+    main_path = os.path.join(APP_DIRECTORY, 'main.py')
+    options = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL,
+               'cwd': APP_DIRECTORY}
+    if os.name == 'nt':
+        options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options['start_new_session'] = True
+    process = subprocess.Popen([sys.executable, main_path, 'daemon', 'serve'], **options)
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            print("[\x1b[0;31mx\x1b[0m] 守护进程启动失败（登录失败？可先直接运行一次oja检查）")
+            return False
+        if send_request({'action': 'status'}, out=io.StringIO()) is not None:
+            print(f"[\x1b[0;32m+\x1b[0m] 守护进程已启动 (PID {process.pid})")
+            return True
+        time.sleep(0.2)
+
+    print("[\x1b[0;31mx\x1b[0m] 等待守护进程就绪超时")
+    return False
+
+
+class _SocketWriter:
+    """将print输出逐段转发给客户端"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def write(self, text):
+        if text:
+            try:
+                self.conn.sendall((json.dumps({'output': text}) + '\n').encode('utf-8'))
+            except OSError:
+                pass  # 客户端已断开，命令继续执行
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class _CommandStdout:
+    """按线程分发命令执行期间的输出
+
+    redirect_stdout替换的是整个进程的sys.stdout；命令开始前已存在的线程（会话保活、预取等常驻后台线程）
+    仍写到原输出，只有执行命令的线程及其新建的工作线程的输出转发给客户端。
+    """
+
+    def __init__(self, writer, original):
+        self.writer = writer
+        self.original = original
+        current = threading.current_thread()
+        self._background = {thread for thread in threading.enumerate() if thread is not current}
+
+    def write(self, text):
+        target = self.original if threading.current_thread() in self._background else self.writer
+        return target.write(text)
+
+    def flush(self):
+        self.original.flush()
+
+
+class OJDaemon:
+    """监听本地套接字并依次执行客户端发来的子命令
+
+    优先使用Unix域套接字；平台不支持时改用仅监听127.0.0.1的TCP端口。
+    地址与随机令牌写入DAEMON_STATE_FILE（仅当前用户可读），请求需携带该令牌。
+    连续idle_timeout秒没有请求时自动退出。
+
+    Args:
+        requester: 已登录的OJRequester实例
+        idle_timeout: 空闲多少秒后退出
+    """
+
+    def __init__(self, requester, idle_timeout):
+        self.requester = requester
+        self.idle_timeout = idle_timeout
+        self.token = secrets.token_hex(16)
+        self.started_at = time.time()
+        self.last_activity = time.monotonic()
+        self.commands_served = 0
+        self._stopping = threading.Event()
+        self._listener = None
+        self._state = None
+
+    def _listen(self):
+        DAEMON_SOCKET = config_path('DAEMON_SOCKET')
+
+        if hasattr(socket, 'AF_UNIX'):
+            if os.path.exists(DAEMON_SOCKET):
+                os.remove(DAEMON_SOCKET)  # 上一次异常退出留下的套接字文件
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(DAEMON_SOCKET)
+            os.chmod(DAEMON_SOCKET, 0o600)
+            state = {'family': 'unix', 'address': DAEMON_SOCKET}
+        else:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.bind(('127.0.0.1', 0))
+            state = {'family': 'tcp', 'address': list(listener.getsockname())}
+        listener.listen(8)
+        listener.settimeout(1.0)
+        return listener, state
+
+    def _write_state(self):
+        DAEMON_STATE_FILE = config_path('DAEMON_STATE_FILE')
+
+        state = dict(self._state, token=self.token, pid=os.getpid(), started_at=self.started_at)
+        tmp_path = f"{DAEMON_STATE_FILE}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, DAEMON_STATE_FILE)
+
+    def _cleanup(self):
+        DAEMON_STATE_FILE, DAEMON_SOCKET = config_path('DAEMON_STATE_FILE'), config_path('DAEMON_SOCKET')
+
+        self._listener.close()
+        state = _read_state()
+        if state and state.get('pid') == os.getpid():
+            os.remove(DAEMON_STATE_FILE)
+        if self._state.get('family') == 'unix' and os.path.exists(DAEMON_SOCKET):
+            os.remove(DAEMON_SOCKET)
+
+    def serve(self):
+        """监听并处理请求，直到收到stop或空闲超时"""
+        self._listener, self._state = self._listen()
+        self._write_state()
+        try:
+            while not self._stopping.is_set():
+                if time.monotonic() - self.last_activity > self.idle_timeout:
+                    break
+                try:
+                    conn, _ = self._listener.accept()
+                except socket.timeout:
+                    continue
+                with conn:
+                    self._handle(conn)
+                self.last_activity = time.monotonic()
+        finally:
+            self._cleanup()
+
+    def _handle(self, conn):
+        conn.settimeout(None)
+        try:
+            with conn.makefile('r', encoding='utf-8') as reader:
+                request = json.loads(reader.readline() or '{}')
+        except (OSError, ValueError):
+            return
+        if not secrets.compare_digest(str(request.get('token', '')), self.token):
+            return
+
+        action = request.get('action')
+        if action == 'status':
+            response = {'success': True, 'status': self.status()}
+        elif action == 'stop':
+            self._stopping.set()
+            response = {'success': True}
+        elif action == 'run':
+            response = {'success': self._run_command(conn, request.get('args') or {})}
+        else:
+            response = {'success': False}
+
+        try:
+            conn.sendall((json.dumps(response) + '\n').encode('utf-8'))
+        except OSError:
+            pass
+
+    def _run_command(self, conn, arguments):
+        """执行子命令，并按客户端的--no-cache/--refresh临时调整响应缓存
+
+        不切换守护进程的工作目录：命令中的文件参数按arguments中客户端的cwd解析。
+
+        Args:
+            conn: 客户端连接，命令输出转发到这里
+            arguments: 客户端解析得到的命令行参数
+
+        Returns:
+            bool: 命令是否执行成功
+        """
+        from ui.commands import run_command
+        from ui.display import display_diagnostics
+
+        args = argparse.Namespace(**arguments)
+        self.commands_served += 1
+        cache = self.requester.cache
+        refresh = cache.refresh if cache is not None else False
+        with redirect_stdout(_CommandStdout(_SocketWriter(conn), sys.stdout)):
+            try:
+                if getattr(args, 'no_cache', False):
+                    self.requester.cache = None
+                elif getattr(args, 'refresh', False) and cache is not None:
+                    cache.refresh = True
+                success = run_command(args, self.requester)
+                if getattr(args, 'diagnostics', False):
+                    display_diagnostics(self.requester)
+            except Exception as e:
+                print(f"[\x1b[0;31mx\x1b[0m] 守护进程执行命令时出错: {e}")
+                success = False
+            finally:
+                self.requester.cache = cache
+                if cache is not None:
+                    cache.refresh = refresh
+        return bool(success)
+
+    def status(self):
+        """返回守护进程状态的文本"""
+        uptime = time.time() - self.started_at
+        idle = time.monotonic() - self.last_activity
+        lines = [
+            f"PID: {os.getpid()}，地址: {self._state['address']}，已运行: {uptime:.0f}s",
+            f"已执行命令: {self.commands_served} 个，空闲 {idle:.0f}s（超过 {self.idle_timeout:.0f}s 后退出）",
+        ]
+        if self.requester.keeper is not None:
+            lines.append(self.requester.keeper.describe())
+        if self.requester.cache is not None:
+            lines.append(self.requester.cache.summary())
+        return "\n".join(lines)
+
+
+def command_daemon(args):
+    """oja daemon start|stop|status|serve"""
+    if args.action == 'start':
+        return start_daemon()
+
+    if args.action == 'status':
+        response = send_request({'action': 'status'})
+        if response is None:
+            print("[\x1b[0;33m!\x1b[0m] 守护进程未运行")
+            return False
+        print(response['status'])
+        return True
+
+    if args.action == 'stop':
+        if send_request({'action': 'stop'}) is None:
+            print("[\x1b[0;33m!\x1b[0m] 守护进程未运行")
+            return False
+        print("[\x1b[0;32m+\x1b[0m] 守护进程已停止")
+        return True
+
+    # serve: 在前台运行守护进程（由start在后台调用）
+    anchor_config_paths()
+    from config import DAEMON_IDLE_TIMEOUT, SESSION_REFRESH_INTERVAL
+    from .auth_service import handle_login
+    from .requester import OJRequester
+    from .response_cache import open_response_cache
+    from .code_store import open_code_store
+
+    requester = OJRequester(cache=open_response_cache(), code_store=open_code_store())
+    if not handle_login(requester):
+        return False
+    if SESSION_REFRESH_INTERVAL > 0:
+        requester.start_session_keeper(SESSION_REFRESH_INTERVAL)
+    OJDaemon(requester, DAEMON_IDLE_TIMEOUT).serve()
+    return True
@@ -1,8 +1,13 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 import os
-import re
-import requests
-from urllib.parse import quote
+
+from .async_requester import AsyncOJRequester
+
+
+def _quiet(*args, **kwargs):
+    """后台预取时代替print，不输出任何内容"""
+
 
 def fetch_and_process_homeworks(requester, course_id):
     """获取、排序和丰富作业数据
@@ -14,13 +19,13 @@ def fetch_and_process_homeworks(requester, course_id):
     Returns:
         enriched_homeworks: 包含详细信息的作业列表，如果获取失败则返回None
     """
-    homeworks = requester.get_homeworks_list(course_id)
-    if not homeworks or 'list' not in homeworks or not homeworks['list']:
+    homeworks = list(requester.iter_homeworks(course_id))
+    if not homeworks:
         print("[\x1b[0;31mx\x1b[0m] 无法获取作业列表或列表为空")
         return None
 
     # 按截止日期排序作业列表
-    sorted_homeworks = sorted(homeworks['list'],
+    sorted_homeworks = sorted(homeworks,
                               key=lambda hw: hw.get('nextDate', '9999-12-31 23:59:59'))
 
     # 定义一个工作函数来获取作业详情
@@ -38,7 +43,8 @@ def fetch_and_process_homeworks(requester, course_id):
 
     # 使用多线程获取每个作业的详细信息
     enriched_homeworks = []
-    max_workers = min(5, len(sorted_homeworks))  # 最多5个线程，或作业数量（取较小值）
+    # 线程数取并发控制器的上限，实际同时进行的请求数由控制器动态调整
+    max_workers = max(1, min(requester.concurrency.max_limit, len(sorted_homeworks)))
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 提交所有作业的详情请求到线程池
@@ -57,18 +63,20 @@ def fetch_and_process_homeworks(requester, course_id):
 
     return enriched_homeworks
 
-def fetch_and_process_problems(requester, homework_id, course_id):
+def fetch_and_process_problems(requester, homework_id, course_id, unit_test_base_url=None):
     """获取并丰富问题数据，包括提交记录
 
     Args:
         requester: OJRequester实例
         homework_id: 作业ID
         course_id: 课程ID
+        unit_test_base_url: 单元测试服务器地址，默认使用config.UNIT_TEST_BASE_URL
 
     Returns:
         enriched_problems: 包含详细信息的问题列表，如果获取失败则返回None
     """
     print(f"\n[\x1b[0;36m!\x1b[0m] 获取作业ID{homework_id}的题目列表...")
+
     problems_list = requester.get_homework_problems(homework_id, course_id)
 
     if not problems_list or 'list' not in problems_list or not problems_list['list']:
@@ -100,7 +108,8 @@ def fetch_and_process_problems(requester, homework_id, course_id):
     original_problems = problems_list['list']
     problem_results = {}  # 使用字典存储结果，以保持顺序
 
-    max_workers = min(5, len(original_problems))  # 最多5个线程
+    # 线程数取并发控制器的上限，实际同时进行的请求数由控制器动态调整
+    max_workers = max(1, min(requester.concurrency.max_limit, len(original_problems)))
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # 提交所有问题的详情请求到线程池，并记录原始索引
@@ -132,14 +141,172 @@ def fetch_and_process_problems(requester, homework_id, course_id):
 
     # 按原始顺序重建问题列表
     enriched_problems = [problem_results[i] for i in range(len(original_problems))]
+    annotate_unit_test_availability(enriched_problems, _cached_manifest(requester, course_id, homework_id,
+                                                                        unit_test_base_url))
     print("\r" + " " * 50 + "\r", end="")  # 清除进度显示
 
     return enriched_problems
 
 
+def refresh_problem_records(requester, problem, homework_id, course_id, grading_result=None):
+    """提交后只刷新单个题目的提交记录，并原地更新problem
+
+    Args:
+        requester: OJRequester实例
+        problem: enriched_problems中的题目对象，会被原地修改
+        homework_id: 作业ID
+        course_id: 课程ID
+        grading_result: wait_and_show_grading_result已获取的批改结果（可选）
+
+    Returns:
+        bool: 是否成功获取到最新的提交记录
+    """
+    problem_id = problem.get('problemId', 'Unknown')
+    submission_records = requester.get_problem_submission_records(problem_id, homework_id, course_id)
+
+    fetched = bool(submission_records and 'list' in submission_records)
+    records = list(submission_records['list']) if fetched else list(problem.get('submission_records', []))
+
+    # 将已知的批改结果合并进记录，避免服务器记录尚未更新时显示旧状态
+    if grading_result and 'recordId' in grading_result:
+        record_id = grading_result['recordId']
+        merged = {
+            'recordId': record_id,
+            'resultState': grading_result.get('resultState', 'Unknown'),
+            'score': grading_result.get('score', 0),
+            'submissionTime': grading_result.get('submissionTime', 'Unknown')
+        }
+        for record in records:
+            if record.get('recordId') == record_id:
+                record.update(merged)
+                break
+        else:
+            records.insert(0, merged)
+
+    problem['submission_records'] = records
+    return fetched
+
+
+async def fetch_and_process_homeworks_async(requester, course_id, max_concurrency=None, reauth=True):
+    """fetch_and_process_homeworks的异步版本，所有作业详情请求同时发出
+
+    Args:
+        requester: OJRequester实例
+        course_id: 课程ID
+        max_concurrency: 同时进行的最大请求数，默认使用并发控制器的上限
+        reauth: 为False时请求被拒绝不重新登录（启动时预取，由调用方统一重新登录）
+
+    Returns:
+        enriched_homeworks: 包含详细信息的作业列表，如果获取失败则返回None
+    """
+    async with AsyncOJRequester(requester, max_concurrency, reauth=reauth) as async_requester:
+        homeworks = await async_requester.list_homeworks(course_id)
+        if not homeworks:
+            print("[\x1b[0;31mx\x1b[0m] 无法获取作业列表或列表为空")
+            return None
+
+        # 按截止日期排序作业列表
+        sorted_homeworks = sorted(homeworks,
+                                  key=lambda hw: hw.get('nextDate', '9999-12-31 23:59:59'))
+
+        async def fetch_homework_detail(hw):
+            """为单个作业获取详细信息的协程"""
+            hw_details = await async_requester.get_homework_info(hw['homeworkId'], course_id)
+            hw['details'] = hw_details if hw_details else {}
+            return hw
+
+        results = await asyncio.gather(*(fetch_homework_detail(hw) for hw in sorted_homeworks),
+                                       return_exceptions=True)
+
+    enriched_homeworks = []
+    for hw, result in zip(sorted_homeworks, results):
+        if isinstance(result, Exception):
+            print(f"\n[\x1b[0;31mx\x1b[0m] 获取作业 {hw.get('homeworkId', 'Unknown')} 详情时出错: {result}")
+            # 保留原始信息
+            enriched_homeworks.append(hw)
+        else:
+            enriched_homeworks.append(result)
+
+    return enriched_homeworks
+
+
+async def fetch_and_process_problems_async(requester, homework_id, course_id, max_concurrency=None, verbose=True,
+                                           unit_test_base_url=None):
+    """fetch_and_process_problems的异步版本
+
+    每道题目的详情与提交记录请求同时发出，总并发数受max_concurrency限制。
+
+    Args:
+        requester: OJRequester实例
+        homework_id: 作业ID
+        course_id: 课程ID
+        max_concurrency: 同时进行的最大请求数，默认使用并发控制器的上限
+        verbose: 是否输出进度与错误信息（后台预取时为False，避免打乱输入提示）
+        unit_test_base_url: 单元测试服务器地址，默认使用config.UNIT_TEST_BASE_URL
+
+    Returns:
+        enriched_problems: 包含详细信息的问题列表，如果获取失败则返回None
+    """
+    log = print if verbose else _quiet
+
+    log(f"\n[\x1b[0;36m!\x1b[0m] 获取作业ID{homework_id}的题目列表...")
+
+    async with AsyncOJRequester(requester, max_concurrency) as async_requester:
+        problems_list = await async_requester.get_homework_problems(homework_id, course_id)
+
+        if not problems_list or 'list' not in problems_list or not problems_list['list']:
+            log("[\x1b[0;31mx\x1b[0m] 获取问题列表失败或列表为空")
+            return None
+
+        original_problems = problems_list['list']
+        total = len(original_problems)
+        completed = 0
+
+        async def fetch_problem_detail(problem):
+            """为单个问题同时获取详细信息和提交记录的协程"""
+            nonlocal completed
+            problem_id = problem.get('problemId', 'Unknown')
+
+            problem_info, submission_records = await asyncio.gather(
+                async_requester.get_problem_info(problem_id, homework_id, course_id),
+                async_requester.get_problem_submission_records(problem_id, homework_id, course_id)
+            )
+
+            problem['details'] = problem_info if problem_info else {}
+            if submission_records and 'list' in submission_records and len(submission_records['list']) > 0:
+                problem['submission_records'] = submission_records['list']
+            else:
+                problem['submission_records'] = []
+
+            completed += 1
+            log(f"\r[\x1b[0;36m!\x1b[0m] 获取题目详情进度: {completed}/{total}", end="")
+            return problem
+
+        results = await asyncio.gather(*(fetch_problem_detail(problem) for problem in original_problems),
+                                       return_exceptions=True)
+
+    # gather保持原始顺序
+    enriched_problems = []
+    for problem, result in zip(original_problems, results):
+        if isinstance(result, Exception):
+            log(f"\n[\x1b[0;31mx\x1b[0m] 获取题目 {problem.get('problemId', 'Unknown')} 详情时出错: {result}")
+            # 保留原始信息但添加空的details字典
+            problem['details'] = {}
+            problem['submission_records'] = []
+            enriched_problems.append(problem)
+        else:
+            enriched_problems.append(result)
+
+    annotate_unit_test_availability(enriched_problems, _cached_manifest(requester, course_id, homework_id,
+                                                                        unit_test_base_url))
+    log("\r" + " " * 50 + "\r", end="")  # 清除进度显示
+
+    return enriched_problems
+
+
 def download_unit_test_file(course_code, problem_id, homework_id, problem_name):
     """
-    下载单元测试文件
+    下载单元测试文件到WORK_DIRECTORY/MainTest.java，内容未变化时不重新下载
 
     Args:
         course_code: 课程代码，如 'CS109-25S'
@@ -150,48 +317,104 @@ def download_unit_test_file(course_code, problem_id, homework_id, problem_name):
     Returns:
         (bool, str): 第一个元素表示是否成功，第二个元素为文件路径或错误消息
     """
-    # 基础URL，作者把单元测试文件放在了自费的阿里云OSS上
-    base_url = "https://hexo-blog-netlify.oss-cn-shenzhen.aliyuncs.com/junittest"
+    from config import WORK_DIRECTORY
+    from .unit_tests import TEST_FILE_NAME, open_unit_test_downloader, write_if_changed
+
+    downloader = open_unit_test_downloader()
+    try:
+        status, value = downloader.fetch_problem(course_code, homework_id, problem_id, problem_name)
+    finally:
+        downloader.cache.save()
+
+    if status == 'missing':
+        return False, f"{value}，你可以通过Pull Requests贡献单元测试到Github中，谢谢合作"
+    if status == 'error':
+        return False, f"[\x1b[0;33m!\x1b[0m]{value}"
+
+    save_path = os.path.join(WORK_DIRECTORY, TEST_FILE_NAME)
+    write_if_changed(save_path, value)
+    return True, save_path
+
+
+def prefetch_unit_test_file(course_code, problem_id, homework_id, problem_name):
+    """在后台获取单元测试文件到本地缓存（不写入工作目录、不输出内容），之后download_unit_test_file无需再请求
+
+    Returns:
+        fetch_problem返回的状态
+    """
+    from .unit_tests import open_unit_test_downloader
+
+    downloader = open_unit_test_downloader()
+    try:
+        return downloader.fetch_problem(course_code, homework_id, problem_id, problem_name)[0]
+    finally:
+        downloader.cache.save()
 
-    # 构造文件名，格式: "{problem_id}_{problem_name}.java"
-    file_name = f"MainTest.java"
 
-    # 构造URL
-    url = f"{base_url}/{course_code}/{homework_id}/{problem_id}_{quote(problem_name)}/MainTest.java"
+def download_homework_unit_tests(course_code, homework_id, problems):
+    """并发下载作业中所有题目的单元测试到 WORK_DIRECTORY/unit_tests/{作业ID}/{题目}/MainTest.java
 
+    Args:
+        course_code: 课程代码
+        homework_id: 作业ID
+        problems: 题目列表
 
-    # 保存路径
+    Returns:
+        (results, requests_sent): [(problem, status, 文件路径或说明), ...] 与实际发送的请求数
+    """
     from config import WORK_DIRECTORY
-    save_path = os.path.join(WORK_DIRECTORY, file_name)
+    from .unit_tests import open_unit_test_downloader
+
+    downloader = open_unit_test_downloader()
+    dest_root = os.path.join(WORK_DIRECTORY, 'unit_tests', str(homework_id))
+    results = downloader.download_homework(course_code, homework_id, problems, dest_root)
+    return results, downloader.requests_sent
 
-    # 下载文件
+
+def load_unit_test_manifest(course_code, homework_id, cached_only=False, base_url=None):
+    """获取作业的单元测试清单，经过本地缓存，有效期内不发送请求
+
+    Args:
+        cached_only: 为True时只读取本地缓存（不论是否过期），不发送请求
+        base_url: 单元测试服务器地址，默认使用config.UNIT_TEST_BASE_URL
+
+    Returns:
+        UnitTestManifest实例；服务器没有清单或获取失败时返回None
+    """
+    from .unit_tests import open_unit_test_downloader
+
+    downloader = open_unit_test_downloader(base_url)
+    if cached_only:
+        return downloader.cached_manifest(course_code, homework_id)
     try:
-        response = requests.get(url, verify=False, timeout=10)
-
-        if response.status_code == 200:
-            # 检查是否为XML错误响应
-            if response.text.strip().startswith('<?xml') and '<Error>' in response.text:
-                print(f"[\x1b[0;33m!\x1b[0m] 服务器返回错误:")
-                if '<Message>' in response.text:
-                    message = re.search(r'<Message>(.*?)</Message>', response.text)
-                    if message:
-                        print(f"[\x1b[0;33m!\x1b[0m] {message.group(1)}")
-
-                if '<Key>' in response.text:
-                    key = re.search(r'<Key>(.*?)</Key>', response.text)
-                    if key:
-                        print(f"[\x1b[0;33m!\x1b[0m] 请求的文件: {key.group(1)}")
-
-                return False, "[\x1b[0;33m!\x1b[0m]该题目暂无单元测试文件"
-
-            # 正常响应，保存文件
-            with open(save_path, 'wb') as file:
-                file.write(response.content)
-            return True, save_path
-        elif response.status_code == 404:
-            return False, "该题目暂无单元测试文件，你可以通过Pull Requests贡献单元测试到Github中，谢谢合作"
-        else:
-            return False, f"HTTP状态码: {response.status_code}"
+        return downloader.load_manifest(course_code, homework_id)
+    except Exception:
+        return None
+    finally:
+        downloader.cache.save()
+
+
+def _cached_manifest(requester, course_code, homework_id, base_url=None):
+    """获取题目列表时只使用本地缓存的清单，不等待单元测试服务器；离线模式下不读取"""
+    if requester.offline:
+        return None
+    return load_unit_test_manifest(course_code, homework_id, cached_only=True, base_url=base_url)
+
+
+def refresh_unit_test_availability(problems, course_code, homework_id):
+    """显示题目列表后在后台获取最新的清单，并原地更新各题目的unit_test标记
+
+    Returns:
+        获取到的UnitTestManifest，没有清单或获取失败时返回None
+    """
+    manifest = load_unit_test_manifest(course_code, homework_id)
+    annotate_unit_test_availability(problems, manifest)
+    return manifest
+
 
-    except Exception as e:
-        return False, f"[\x1b[0;33m!\x1b[0m]下载异常: {str(e)}"
\ No newline at end of file
+def annotate_unit_test_availability(problems, manifest):
+    """根据清单为每道题目设置problem['unit_test']（True/False），没有清单时不设置"""
+    if manifest is None:
+        return
+    for problem in problems:
+        problem['unit_test'] = manifest.has_test(problem.get('problemId'))
@@ -0,0 +1,165 @@
+import os
+import select
+import struct
+import sys
+import time
+
+# inotify常量（见 <sys/inotify.h>）
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class _InotifyBackend:
+    """Linux上通过inotify监视文件所在的目录（编辑器常以“写临时文件再重命名”的方式保存）"""
+
+    name = 'inotify'
+
+    def __init__(self, paths):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1失败")
+
+        self._watched = {}  # 监视描述符 -> {文件名(bytes): 文件路径}
+        directories = {}
+        for path in paths:
+            directories.setdefault(os.path.dirname(path), {})[os.fsencode(os.path.basename(path))] = path
+        try:
+            for directory, names in directories.items():
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"无法监视目录: {directory}")
+                self._watched[wd] = names
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def wait(self, timeout):
+        """等待事件，返回发生变化的文件路径集合，超时时返回空集合"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return set()
+            changed = self._read_events()
+            if changed:
+                return changed  # 同目录中其他文件的事件不算变化，继续等待
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            path = self._watched.get(wd, {}).get(name)
+            if path:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    """定期比较文件的修改时间与大小"""
+
+    name = '轮询'
+
+    def __init__(self, paths, interval):
+        self.paths = paths
+        self.interval = interval
+        self._snapshot = self._stat_all()
+
+    def _stat_all(self):
+        snapshot = {}
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+
+    def wait(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining > 0:
+                time.sleep(remaining)
+            snapshot = self._stat_all()
+            changed = {path for path in self.paths if snapshot[path] != self._snapshot[path]}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """监视一组文件的变化，Linux上使用inotify，其他平台或inotify不可用时改为轮询
+
+    两次wait_for_change之间发生的变化不会丢失，会在下一次调用时立即返回（多次保存合并为一次）。
+
+    Args:
+        paths: 要监视的文件路径列表
+        debounce: 最后一次变化后等待多久（秒）没有新的变化才认为保存完成
+        poll_interval: 轮询模式下检查文件的间隔（秒）
+    """
+
+    def __init__(self, paths, debounce=0.5, poll_interval=1.0):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.debounce = debounce
+        self._backend = None
+        if sys.platform.startswith('linux'):
+            try:
+                self._backend = _InotifyBackend(self.paths)
+            except (OSError, AttributeError):
+                self._backend = None
+        if self._backend is None:
+            self._backend = _PollingBackend(self.paths, poll_interval)
+
+    @property
+    def backend(self):
+        return self._backend.name
+
+    def wait_for_change(self):
+        """阻塞直到被监视的文件发生变化并在debounce秒内不再变化
+
+        Returns:
+            发生变化的文件路径集合
+        """
+        changed = set()
+        while not changed:
+            changed = self._backend.wait(None)
+        while True:
+            more = self._backend.wait(self.debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        self._backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
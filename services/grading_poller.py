@@ -0,0 +1,252 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+
+
+class JudgeLatencyModel:
+    """记录每道题目/每份作业实际处于JG（批改中）状态的时长，并据此安排轮询时间
+
+    历史数据保存在本地JSON文件中，每个键最多保留max_samples条。
+    安排轮询时优先使用该题目的历史，其次使用同一作业的历史，都不足时退回到按时间限制估计。
+
+    Args:
+        path: 历史数据文件路径
+        max_samples: 每道题目/作业保留的样本数
+        min_samples: 使用历史数据所需的最少样本数
+    """
+
+    QUANTILES = (0.3, 0.5, 0.7, 0.85, 0.95)  # 有历史数据时依次在这些分位点轮询
+    MIN_FIRST_POLL = 0.5  # 第一次轮询的最早时间（秒）
+    MIN_GAP = 0.3  # 两次轮询之间的最短间隔（秒）
+    MAX_INTERVAL = 5.0  # 两次轮询之间的最长间隔（秒）
+    GAP_RATIO = 0.3  # 分位点之间补充轮询的间隔占已等待时间的比例
+
+    def __init__(self, path, max_samples=30, min_samples=3):
+        self.path = path
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._history = self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._history, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[\x1b[0;33m!\x1b[0m] 保存批改耗时记录失败: {e}")
+
+    @staticmethod
+    def _problem_key(problem_id, homework_id):
+        return f"problem:{homework_id}:{problem_id}"
+
+    @staticmethod
+    def _homework_key(homework_id):
+        return f"homework:{homework_id}"
+
+    def record(self, problem_id, homework_id, seconds):
+        """记录一次批改耗时（秒）"""
+        with self._lock:
+            for key in (self._problem_key(problem_id, homework_id), self._homework_key(homework_id)):
+                samples = self._history.setdefault(key, [])
+                samples.append(round(seconds, 3))
+                del samples[:-self.max_samples]
+            self._save()
+
+    def samples(self, problem_id, homework_id):
+        """返回用于估计的样本，题目历史不足时使用作业历史"""
+        with self._lock:
+            for key in (self._problem_key(problem_id, homework_id), self._homework_key(homework_id)):
+                samples = self._history.get(key, [])
+                if len(samples) >= self.min_samples:
+                    return sorted(samples)
+        return []
+
+    def _max_gap(self, elapsed):
+        return min(max(elapsed * self.GAP_RATIO, self.MIN_GAP), self.MAX_INTERVAL)
+
+    def poll_offsets(self, problem_id, homework_id, time_limit_ms, deadline):
+        """计算从提交时刻起的各次轮询时间（秒）
+
+        Args:
+            problem_id: 题目ID
+            homework_id: 作业ID
+            time_limit_ms: 题目的时间限制（毫秒），没有历史数据时用于估计
+            deadline: 最长等待时间（秒）
+
+        Returns:
+            list: 递增的轮询时间点，最后一个不超过deadline
+        """
+        samples = self.samples(problem_id, homework_id)
+        offsets = []
+
+        if samples:
+            for q in self.QUANTILES:
+                value = samples[min(len(samples) - 1, int(q * len(samples)))]
+                offsets.append(value)
+            interval = max(self.MIN_GAP, samples[-1] - samples[len(samples) // 2])
+        else:
+            offsets.append(time_limit_ms / 1000)
+            interval = time_limit_ms / 1000
+
+        # 去掉过密的轮询点；相邻分位点相距过远时，按已等待时间的GAP_RATIO倍补充轮询
+        planned = []
+        for offset in offsets:
+            offset = max(offset, self.MIN_FIRST_POLL)
+            while planned and offset - planned[-1] > self._max_gap(planned[-1]):
+                planned.append(planned[-1] + self._max_gap(planned[-1]))
+            if not planned or offset - planned[-1] >= self.MIN_GAP:
+                planned.append(offset)
+
+        # 超出历史范围后按1.5倍递增间隔继续轮询，直到截止时间
+        while planned[-1] < deadline:
+            interval = min(max(interval * 1.5, self.MIN_GAP), self.MAX_INTERVAL)
+            planned.append(min(planned[-1] + interval, deadline))
+
+        return [offset for offset in planned if offset <= deadline]
+
+
+class GradingScheduler:
+    """在一个循环中轮询多条提交记录的批改结果
+
+    每条记录按JudgeLatencyModel安排的时间点轮询，所有记录的下一次轮询放在同一个
+    按到期时间排序的堆中，因此任意多条记录只需一个循环，且不会有多余的等待。
+
+    Args:
+        requester: OJRequester实例
+        model: JudgeLatencyModel实例
+        deadline: 每条记录的最长等待时间（秒）
+    """
+
+    def __init__(self, requester, model, deadline):
+        self.requester = requester
+        self.model = model
+        self.deadline = deadline
+        self._heap = []
+        self._seq = itertools.count()
+
+    def add(self, record_id, course_id, homework_id, problem, submitted_at=None):
+        """加入一条待轮询的提交记录
+
+        Args:
+            submitted_at: 提交完成时的time.monotonic()值，默认取调用时间
+        """
+        problem_id = problem.get('problemId', 'Unknown')
+        offsets = self.model.poll_offsets(problem_id, homework_id, get_time_limit_ms(problem), self.deadline)
+        entry = {
+            'record_id': record_id,
+            'course_id': course_id,
+            'homework_id': homework_id,
+            'problem': problem,
+            'offsets': offsets,
+            'attempt': 0,
+            'submitted_at': submitted_at if submitted_at is not None else time.monotonic(),
+            'last_pending': 0.0
+        }
+        self._push(entry)
+        return entry
+
+    def _push(self, entry):
+        """安排下一次轮询，没有剩余轮询点时返回False"""
+        if entry['attempt'] >= len(entry['offsets']):
+            return False
+        due = entry['submitted_at'] + entry['offsets'][entry['attempt']]
+        heapq.heappush(self._heap, (due, next(self._seq), entry))
+        return True
+
+    def pending(self):
+        return len(self._heap)
+
+    def run(self, on_done, on_attempt=None):
+        """轮询直到所有记录完成或超时
+
+        Args:
+            on_done: 记录结束时调用，参数为(entry, result)，result为批改结果、
+                     False（到最后一个轮询点仍获取失败）或None（超时）
+            on_attempt: 每次轮询前调用，参数为(entry, 第几次, 计划总次数)
+        """
+        while self._heap:
+            due, _, entry = heapq.heappop(self._heap)
+            time.sleep(max(0.0, due - time.monotonic()))
+
+            entry['attempt'] += 1
+            if on_attempt:
+                on_attempt(entry, entry['attempt'], len(entry['offsets']))
+
+            result = self.requester.get_submission_result(entry['record_id'], entry['course_id'],
+                                                          entry['homework_id'])
+            if not result:
+                # 获取失败（如网络超时）时在下一个轮询点重试，没有剩余轮询点时才报告失败
+                if not self._push(entry):
+                    on_done(entry, False)
+                continue
+
+            elapsed = time.monotonic() - entry['submitted_at']
+            if result.get('resultState') == 'JG':
+                entry['last_pending'] = elapsed
+                if not self._push(entry):
+                    on_done(entry, None)
+                continue
+
+            # 真实完成时间落在最后一次JG与本次之间，取中点作为估计
+            problem_id = entry['problem'].get('problemId', 'Unknown')
+            self.model.record(problem_id, entry['homework_id'], (entry['last_pending'] + elapsed) / 2)
+            on_done(entry, result)
+
+
+def poll_grading_result(requester, record_id, course_id, homework_id, problem, model, deadline, on_attempt=None):
+    """按JudgeLatencyModel安排的时间轮询单条记录的批改结果，并记录本次批改耗时
+
+    Args:
+        requester: OJRequester实例
+        record_id: 提交记录ID
+        course_id: 课程ID
+        homework_id: 作业ID
+        problem: 问题对象，用于获取题目ID与时间限制
+        model: JudgeLatencyModel实例
+        deadline: 最长等待时间（秒）
+        on_attempt: 每次轮询前调用的回调，参数为(第几次, 计划总次数)
+
+    Returns:
+        批改完成的结果；获取失败返回False；超时返回None
+    """
+    scheduler = GradingScheduler(requester, model, deadline)
+    scheduler.add(record_id, course_id, homework_id, problem)
+
+    outcome = {}
+    scheduler.run(lambda entry, result: outcome.setdefault('result', result),
+                  on_attempt=(lambda entry, attempt, total: on_attempt(attempt, total)) if on_attempt else None)
+    return outcome.get('result')
+
+
+def get_time_limit_ms(problem, default=2000):
+    """从题目详情中读取Java时间限制（毫秒）"""
+    details = problem.get('details', {})
+    if 'timeLimit' in details and isinstance(details['timeLimit'], dict) and 'Java' in details['timeLimit']:
+        try:
+            return int(details['timeLimit']['Java'])
+        except (TypeError, ValueError):
+            pass
+    return default
+
+
+def open_judge_latency_model():
+    """根据config中的设置创建批改耗时模型"""
+    from config import JUDGE_HISTORY_FILE
+    return JudgeLatencyModel(JUDGE_HISTORY_FILE)
@@ -0,0 +1,349 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from .course_sync import STATE_FILE, safe_name
+from .requester import OJRequester
+
+COURSES_ENDPOINT = "/api/union/my_courses_list/"
+HOMEWORKS_ENDPOINT = "/api/course/homeworks/list/"
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _newest(*candidates):
+    """从若干 (数据, 时间戳) 中选出最新的一个，忽略None"""
+    candidates = [c for c in candidates if c is not None and c[0]]
+    return max(candidates, key=lambda c: c[1]) if candidates else None
+
+
+class LocalMirror:
+    """读取oja sync写入的镜像目录（结构见CourseSync）
+
+    Args:
+        root: 镜像根目录
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._dirs = {}  # (目录, ID) -> 以 "{ID}_" 开头的子目录，缓存查找结果
+
+    def _state(self, course_id):
+        state = _read_json(os.path.join(self.root, safe_name(course_id), STATE_FILE))
+        return state if isinstance(state, dict) else {}
+
+    @staticmethod
+    def _timestamp(text):
+        try:
+            return datetime.strptime(text, '%Y-%m-%d %H:%M:%S').timestamp()
+        except (TypeError, ValueError):
+            return 0
+
+    def _child(self, parent, item_id):
+        key = (parent, str(item_id))
+        if key not in self._dirs:
+            prefix = f"{item_id}_"
+            try:
+                names = [name for name in os.listdir(parent) if name.startswith(prefix)]
+            except OSError:
+                names = []
+            self._dirs[key] = os.path.join(parent, names[0]) if names else None
+        return self._dirs[key]
+
+    def _homework_dir(self, course_id, homework_id):
+        return self._child(os.path.join(self.root, safe_name(course_id)), homework_id)
+
+    def courses(self):
+        """已同步的课程，返回 [(课程信息, 最近同步的时间戳), ...]"""
+        try:
+            names = sorted(os.listdir(self.root))
+        except OSError:
+            return []
+        result = []
+        for name in names:
+            state = self._state(name)
+            if not state.get('homeworks'):
+                continue
+            course = state.get('course') or {'course_id': name}  # 同步时未记录课程信息
+            synced = max(self._timestamp(entry.get('synced_at')) for entry in state['homeworks'].values())
+            result.append((course, synced))
+        return result
+
+    def homeworks(self, course_id):
+        """已同步的作业，返回 [(作业列表中的条目, 同步时间戳), ...]"""
+        result = []
+        for homework_id, entry in self._state(course_id).get('homeworks', {}).items():
+            homework_dir = self._homework_dir(course_id, homework_id)
+            data = _read_json(os.path.join(homework_dir, 'homework.json')) if homework_dir else None
+            if data and data.get('homework'):
+                result.append((data['homework'], self._timestamp(entry.get('synced_at'))))
+        return result
+
+    def _synced_at(self, course_id, homework_id):
+        entry = self._state(course_id).get('homeworks', {}).get(str(homework_id)) or {}
+        return self._timestamp(entry.get('synced_at'))
+
+    def homework_info(self, course_id, homework_id):
+        homework_dir = self._homework_dir(course_id, homework_id)
+        data = _read_json(os.path.join(homework_dir, 'homework.json')) if homework_dir else None
+        if not data or not data.get('info'):
+            return None
+        return data['info'], self._synced_at(course_id, homework_id)
+
+    def problems(self, course_id, homework_id):
+        """作业的题目列表，返回 ([题目列表中的条目, ...], 同步时间戳)"""
+        homework_dir = self._homework_dir(course_id, homework_id)
+        if not homework_dir:
+            return None
+        problems = []
+        for name in sorted(os.listdir(homework_dir)):
+            data = _read_json(os.path.join(homework_dir, name, 'problem.json'))
+            if data:
+                problems.append({k: v for k, v in data.items() if k != 'details'})
+        if not problems:
+            return None
+        problems.sort(key=lambda p: p.get('problemId', 0))
+        return problems, self._synced_at(course_id, homework_id)
+
+    def _problem_file(self, course_id, homework_id, problem_id, file_name):
+        homework_dir = self._homework_dir(course_id, homework_id)
+        problem_dir = self._child(homework_dir, problem_id) if homework_dir else None
+        return _read_json(os.path.join(problem_dir, file_name)) if problem_dir else None
+
+    def problem_info(self, course_id, homework_id, problem_id):
+        data = self._problem_file(course_id, homework_id, problem_id, 'problem.json')
+        if not data or not data.get('details'):
+            return None
+        return data['details'], self._synced_at(course_id, homework_id)
+
+    def records(self, course_id, homework_id, problem_id):
+        return self._problem_file(course_id, homework_id, problem_id, 'records.json') or []
+
+
+class SubmissionQueue:
+    """离线时排队的提交，恢复连接后按加入顺序提交
+
+    每项保存加入队列时的文件内容（而不是路径），之后修改文件不影响已排队的提交。
+
+    Args:
+        path: 保存队列的JSON文件
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        items = _read_json(self.path)
+        return items if isinstance(items, list) else []
+
+    def _save(self, items):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def items(self):
+        with self._lock:
+            return self._load()
+
+    def __len__(self):
+        return len(self.items())
+
+    def add(self, course_id, homework_id, problem_id, files):
+        """加入一份提交
+
+        Returns:
+            队列中的提交数；同一题目内容相同的提交已在队列中时不再加入，返回None
+        """
+        key = (str(course_id), str(homework_id), str(problem_id))
+        with self._lock:
+            items = self._load()
+            if any((str(item['course_id']), str(item['homework_id']), str(item['problem_id'])) == key
+                   and item['files'] == files for item in items):
+                return None
+            items.append({
+                'id': f"{time.time_ns():x}",
+                'course_id': course_id,
+                'homework_id': homework_id,
+                'problem_id': problem_id,
+                'files': files,
+                'queued_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            })
+            self._save(items)
+            return len(items)
+
+    def remove(self, item_ids):
+        """移除已提交的项"""
+        item_ids = set(item_ids)
+        with self._lock:
+            self._save([item for item in self._load() if item.get('id') not in item_ids])
+
+
+class OfflineRequester(OJRequester):
+    """离线模式：不发送任何请求，用本地保存的数据回答OJRequester的查询
+
+    数据来源依次为oja sync的镜像目录与响应缓存（不论是否过期，两者都有时使用较新的），
+    提交记录另外合并CodeStore中索引的记录（包括同步之后在本机的提交）。
+    课程/作业/题目列表的条目带有cached_at（数据获取时间的时间戳），界面据此标记数据的新旧。
+    提交保存到SubmissionQueue，恢复连接后再提交。
+
+    Args:
+        cache: 可选的ResponseCache
+        code_store: 可选的CodeStore
+        mirror: 可选的LocalMirror
+        queue: 保存离线提交的SubmissionQueue
+    """
+
+    offline = True
+
+    def __init__(self, cache=None, code_store=None, mirror=None, queue=None):
+        super().__init__(cache=cache, code_store=code_store)
+        self.mirror = mirror
+        self.queue = queue
+
+    def _post(self, url, headers, data):
+        raise requests.exceptions.ConnectionError(f"离线模式下不发送请求: {url}")
+
+    def check_cookies_status(self):
+        self.courses = self.get_my_courses()
+        return bool(self.courses['list'])
+
+    def refresh_session(self, verbose=True):
+        return False
+
+    def start_session_keeper(self, refresh_after):
+        return None
+
+    @staticmethod
+    def _page(items, page, page_size):
+        page_size = page_size or OJRequester._page_size()
+        return {'list': items[(page - 1) * page_size:page * page_size], 'total': len(items)}
+
+    def get_my_courses(self, page=1, page_size=None):
+        courses = {}
+        sources = []
+        if self.cache is not None:
+            sources += [(c, created) for payload, created in self.cache.snapshots(COURSES_ENDPOINT)
+                        for c in payload.get('list') or []]
+        if self.mirror is not None:
+            sources += self.mirror.courses()
+        for course, timestamp in sources:
+            key = str(course.get('course_id'))
+            existing = courses.get(key)
+            if existing is None or existing['cached_at'] < timestamp:
+                courses[key] = dict(existing or {}, **course, cached_at=timestamp)
+        for course in courses.values():
+            course.setdefault('course_name', '(已同步的课程)')
+            course.setdefault('description', '')
+        return self._page(list(courses.values()), page, page_size)
+
+    def get_homeworks_list(self, course_id, page=1, page_size=None):
+        homeworks = {}
+        sources = self.mirror.homeworks(course_id) if self.mirror is not None else []
+        if self.cache is not None:
+            sources += [(hw, created) for payload, created in self.cache.snapshots(HOMEWORKS_ENDPOINT, course_id)
+                        for hw in payload.get('list') or []]
+        for homework, timestamp in sources:
+            key = str(homework.get('homeworkId'))
+            if key not in homeworks or homeworks[key]['cached_at'] < timestamp:
+                homeworks[key] = dict(homework, cached_at=timestamp)
+
+        if page == 1 and not homeworks:
+            print(f"[\x1b[0;33m!\x1b[0m] 本地没有课程{course_id}的作业数据，请在联网时打开一次该课程或运行 oja sync")
+        return self._page(list(homeworks.values()), page, page_size)
+
+    def _stale(self, endpoint, course_id, homework_id, problem_id=None):
+        return self.cache.get_stale(endpoint, course_id, homework_id, problem_id) if self.cache is not None else None
+
+    def get_homework_info(self, homework_id, course_id):
+        mirrored = self.mirror.homework_info(course_id, homework_id) if self.mirror is not None else None
+        newest = _newest(mirrored, self._stale("/api/homework/general/", course_id, homework_id))
+        return newest[0] if newest else False
+
+    def get_homework_problems(self, homework_id, course_id):
+        mirrored = self.mirror.problems(course_id, homework_id) if self.mirror is not None else None
+        cached = self._stale("/api/homework/problems/list/", course_id, homework_id)
+        if cached is not None:
+            cached = (cached[0].get('list'), cached[1])
+        newest = _newest(mirrored, cached)
+        if newest is None:
+            return False
+        problems, timestamp = newest
+        return {'list': [dict(problem, cached_at=timestamp) for problem in problems]}
+
+    def get_problem_info(self, problem_id, homework_id, course_id):
+        mirrored = self.mirror.problem_info(course_id, homework_id, problem_id) if self.mirror is not None else None
+        newest = _newest(mirrored, self._stale("/api/homework/problems/info/", course_id, homework_id, problem_id))
+        return newest[0] if newest else False
+
+    def get_problem_submission_records(self, problem_id, homework_id, course_id):
+        records = {}
+        if self.mirror is not None:
+            for record in self.mirror.records(course_id, homework_id, problem_id):
+                records[str(record.get('recordId'))] = record
+        if self.code_store is not None:
+            # 同步之后在本机提交的记录只在CodeStore中；同步时仍在批改的记录使用CodeStore中更新的结果
+            for record in self.code_store.problem_records(course_id, homework_id, problem_id):
+                existing = records.get(str(record['recordId']))
+                if existing is None:
+                    records[str(record['recordId'])] = record
+                elif existing.get('resultState') in (None, 'JG') and record['resultState'] != 'Unknown':
+                    existing.update(resultState=record['resultState'], score=record['score'])
+        return {'list': sorted(records.values(), key=lambda r: r.get('submissionTime') or '', reverse=True)}
+
+    def submit_homework(self, homework_id, problem_id, course_id, file_paths):
+        """离线时把提交加入队列，恢复连接后启动oja时提交"""
+        from utils.file_bundle import FileBundle
+
+        if not file_paths:
+            print("[\x1b[0;31mx\x1b[0m] 没有提供Java文件路径")
+            return None
+        if isinstance(file_paths, dict):
+            files_dict = file_paths
+        else:
+            bundle = file_paths if isinstance(file_paths, FileBundle) else FileBundle(file_paths)
+            files_dict = bundle.contents()
+        if not files_dict:
+            print("[\x1b[0;31mx\x1b[0m] 无法读取Java文件内容")
+            return None
+        if self.queue is None:
+            print("[\x1b[0;31mx\x1b[0m] 离线模式下无法提交")
+            return None
+
+        try:
+            count = self.queue.add(course_id, homework_id, problem_id, files_dict)
+        except OSError as e:
+            print(f"[\x1b[0;31mx\x1b[0m] 保存离线提交失败: {e}")
+            return None
+        if count is None:
+            print("[\x1b[0;33m!\x1b[0m] 内容相同的提交已在离线队列中，不再重复加入")
+            return None
+        print(f"[\x1b[0;33m!\x1b[0m] 离线模式：提交已加入队列（共 {count} 份），恢复连接后启动oja时提交")
+        return None
+
+    def get_submission_result(self, record_id, course_id, homework_id):
+        return None
+
+
+def open_submission_queue():
+    """返回根据config中的设置创建的SubmissionQueue"""
+    from config import OFFLINE_QUEUE_FILE
+    return SubmissionQueue(OFFLINE_QUEUE_FILE)
+
+
+def open_offline_requester(cache=None, code_store=None):
+    """创建使用config中镜像目录与提交队列的OfflineRequester"""
+    from config import SYNC_DIRECTORY
+    return OfflineRequester(cache=cache, code_store=code_store, mirror=LocalMirror(SYNC_DIRECTORY),
+                            queue=open_submission_queue())
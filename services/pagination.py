@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def iter_pages(fetch_page, page_size, first_page=None, max_pages=100):
+    """逐页获取列表并逐条产出，处理当前页时下一页已在后台请求
+
+    只要某一页是满的（条目数等于page_size）就继续请求下一页；
+    响应中带有total时以其为准。服务器忽略页码、重复返回同一页时停止，避免死循环。
+
+    Args:
+        fetch_page: 接受页码（从1开始）并返回 {'list': [...]} 响应的函数，失败时返回假值
+        page_size: 每页条目数
+        first_page: 已经获取到的第一页响应，提供时不再重复请求第一页
+        max_pages: 最多请求的页数
+
+    Yields:
+        列表中的每个条目
+    """
+    def has_more(response, page, yielded):
+        items = response.get('list') or []
+        total = response.get('total')
+        if isinstance(total, int):
+            return yielded < total and page < max_pages and bool(items)
+        return len(items) >= page_size and page < max_pages
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        response = first_page if first_page is not None else fetch_page(1)
+        page, yielded, previous_first = 1, 0, None
+
+        while response and isinstance(response, dict):
+            items = response.get('list') or []
+            if items and items[0] == previous_first:
+                break  # 服务器不支持分页，返回了与上一页相同的内容
+
+            yielded += len(items)
+            upcoming = executor.submit(fetch_page, page + 1) if has_more(response, page, yielded) else None
+
+            yield from items
+            if upcoming is None:
+                break
+            previous_first = items[0] if items else None
+            page += 1
+            response = upcoming.result()
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError
+from functools import partial
+
+
+class Prefetcher:
+    """在用户停留在输入提示时，于后台预取下一步最可能需要的数据
+
+    任务在一个专用的事件循环线程中执行。协程任务被取消时，尚未发出的请求不会再发送；
+    普通函数在线程池中执行，只能在开始前取消，已开始的会执行完毕但结果被丢弃。
+    预取的任务不应输出内容，以免打乱输入提示。
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+        self._futures = {}  # 预取键 -> concurrent.futures.Future
+        self.stats = {'started': 0, 'hits': 0, 'cancelled': 0}
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, daemon=True, name='prefetcher').start()
+        return self._loop
+
+    def speculate(self, key, func, *args, **kwargs):
+        """开始预取；相同的键已在进行或已完成时不重复开始
+
+        Args:
+            key: 预取键，之后用claim取得结果
+            func: 协程函数或普通函数
+            *args, **kwargs: 调用func的参数
+        """
+        with self._lock:
+            if key in self._futures:
+                return
+            loop = self._ensure_loop()
+            if asyncio.iscoroutinefunction(func):
+                coro = func(*args, **kwargs)
+            else:
+                async def run_in_thread():
+                    return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+                coro = run_in_thread()
+            self._futures[key] = asyncio.run_coroutine_threadsafe(coro, loop)
+            self.stats['started'] += 1
+
+    def claim(self, key):
+        """取得预取结果，仍在进行时等待其完成
+
+        Returns:
+            预取的结果；没有该预取、已被取消或执行出错时返回None
+        """
+        with self._lock:
+            future = self._futures.pop(key, None)
+        if future is None:
+            return None
+        try:
+            result = future.result()
+        except (CancelledError, Exception):
+            return None
+        if result is not None:
+            self.stats['hits'] += 1
+        return result
+
+    def cancel(self, key):
+        """用户做出了其他选择，取消该预取"""
+        with self._lock:
+            future = self._futures.pop(key, None)
+        if future is not None and future.cancel():
+            self.stats['cancelled'] += 1
+
+    def cancel_all(self):
+        with self._lock:
+            futures, self._futures = list(self._futures.values()), {}
+        for future in futures:
+            if future.cancel():
+                self.stats['cancelled'] += 1
+
+    def describe(self):
+        return (f"预取: 开始 {self.stats['started']} 次，命中 {self.stats['hits']} 次，"
+                f"取消 {self.stats['cancelled']} 次")
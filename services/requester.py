@@ -1,50 +1,90 @@
 import requests
-import os
+import urllib3
 import re
 import json
-from datetime import datetime
-from pickle import dump, load
+import threading
+import time
+from contextlib import contextmanager
+
+from .concurrency import ConcurrencyController
+from .credential_store import CredentialStore
+from .pagination import iter_pages
+from .session_manager import SessionManager
+
+# 禁用SSL警告（所有请求均使用verify=False）
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def _quiet(*args, **kwargs):
+    """后台静默刷新会话时代替print，不输出任何内容"""
+
 
 class OJRequester:
-    def __init__(self):
-        self.base_url = "https://oj.cse.sustech.edu.cn"
-        self.session = requests.Session()
+    offline = False  # 离线模式的OfflineRequester中为True
 
-        # 设置通用请求头
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9',
-            'Sec-Ch-Ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"Windows"',
-            'Priority': 'u=1, i'
-        })
+    def __init__(self, cache=None, concurrency=None, code_store=None):
+        self.base_url = "https://oj.cse.sustech.edu.cn"
+        self.cache = cache  # 可选的ResponseCache，用于缓存作业/题目元数据
+        self.code_store = code_store  # 可选的CodeStore，提交记录中的代码只在本地保存一份
+
+        # 所有API请求共享的自适应并发控制器
+        if concurrency is None:
+            from config import MAX_CONCURRENT_REQUESTS, INITIAL_CONCURRENT_REQUESTS
+            concurrency = ConcurrencyController(initial=INITIAL_CONCURRENT_REQUESTS,
+                                                max_limit=MAX_CONCURRENT_REQUESTS)
+        self.concurrency = concurrency
+
+        # 连接池大小与并发上限一致，所有工作线程共享同一个会话
+        self.sessions = SessionManager(pool_size=self.concurrency.max_limit)
+        self.session = self.sessions.new_session()
         self.csrf_token = None
+        self.courses = None  # 最近一次验证登录状态时获取的课程列表
 
-    def cas_login(self, username, password):
-        print("[\x1b[0;36m!\x1b[0m] 测试OAuth授权URL...")
+        # 登录凭证保存在可被多个进程共享的JSON文件中
+        from config import COOKIES_FILE
+        self.credentials = CredentialStore(COOKIES_FILE)
+        self._store_generation = 0  # 最近一次加载或保存的凭证generation
+
+        # 服务器拒绝当前会话时由一个线程重新登录，其余线程等待后重放请求
+        self._auth_lock = threading.Lock()
+        self._auth_generation = 0  # 每次重新登录成功后加1
+        self._reauth_failed = False  # 重新登录失败后不再尝试，避免反复请求CAS
+        self.auth_stats = {'reauths': 0, 'replays': 0}
+
+        self.last_verified = None  # 会话最后一次被服务器确认有效的time.monotonic()值
+        self.keeper = None  # 可选的SessionKeeper，在后台保持会话有效
+        self._local = threading.local()  # 当前线程是否在静默刷新会话（后台线程不应打乱输入提示）、是否跳过重新登录
+
+    def cas_login(self, username, password, verbose=True):
+        """执行CAS登录并获取CSRF令牌，verbose为False时不输出过程（后台刷新会话时）
+
+        登录在一个新的会话上进行，成功后才替换当前的会话与CSRF令牌，
+        登录期间其他线程仍使用原来的会话，而不会遇到没有CSRF令牌的中间状态。
+        """
+        log = print if verbose else _quiet
+        session = self.sessions.new_session()
+        log("[\x1b[0;36m!\x1b[0m] 测试OAuth授权URL...")
 
         # 步骤1: 首先访问OJ主页，获取初始cookie
-        self.session.get(self.base_url, verify=False)
+        session.get(self.base_url, verify=False)
 
         # 步骤2: 直接访问CAS的OAuth授权URL
         cas_authorize_url = "https://cas.sustech.edu.cn/cas/oauth2.0/authorize?response_type=code&client_id=FTdwYshmid34mMtRURbH5Naa6eclg4s6BVP7&redirect_uri=https://oj.cse.sustech.edu.cn/api/login/cas/"
 
-        self.session.headers.update({'Referer': self.base_url})
-        response = self.session.get(cas_authorize_url, allow_redirects=False, verify=False)
+        response = session.get(cas_authorize_url, headers={'Referer': self.base_url},
+                                    allow_redirects=False, verify=False)
 
         if response.status_code != 302 or 'Location' not in response.headers:
-            print("[\x1b[0;31mx\x1b[0m] 授权URL未返回预期的302重定向")
+            log("[\x1b[0;31mx\x1b[0m] 授权URL未返回预期的302重定向")
             return False
 
         # 步骤3: 跟随重定向到CAS登录页面
         login_url = response.headers['Location']
-        print("[\x1b[0;36m!\x1b[0m] CAS登录中...")
-        response = self.session.get(login_url, verify=False)
+        log("[\x1b[0;36m!\x1b[0m] CAS登录中...")
+        response = session.get(login_url, headers={'Referer': self.base_url}, verify=False)
 
         if response.status_code != 200:
-            print("[\x1b[0;31mx\x1b[0m] 访问登录页面失败")
+            log("[\x1b[0;31mx\x1b[0m] 访问登录页面失败")
             return False
 
         # 步骤4: 从登录页面提取execution参数
@@ -54,7 +94,7 @@ class OJRequester:
             execution = match.group(1)
 
         if not execution:
-            print("[\x1b[0;31mx\x1b[0m] 无法从登录页面提取execution参数")
+            log("[\x1b[0;31mx\x1b[0m] 无法从登录页面提取execution参数")
             return False
 
         # 步骤5: 提交登录表单
@@ -65,26 +105,28 @@ class OJRequester:
             '_eventId': 'submit'
         }
 
-        self.session.headers.update({'Referer': login_url})
-        response = self.session.post(login_url, data=login_data, allow_redirects=False, verify=False)
+        # Referer通过每次请求的headers传入，不修改会话共享的请求头
+        login_headers = {'Referer': login_url}
+        response = session.post(login_url, data=login_data, headers=login_headers,
+                                     allow_redirects=False, verify=False)
 
         if response.status_code != 302 or 'Location' not in response.headers:
-            print("[\x1b[0;31mx\x1b[0m] 登录请求失败")
+            log("[\x1b[0;31mx\x1b[0m] 登录请求失败")
             if response.status_code == 401 or response.status_code == 200:
-                print("[\x1b[0;31mx\x1b[0m] 用户名或密码错误")
+                log("[\x1b[0;31mx\x1b[0m] 用户名或密码错误")
             return False
 
         # 步骤6: 跟随登录成功后的所有重定向
         current_url = response.headers['Location']
-        print("[\x1b[0;32m+\x1b[0m] CAS登录成功，开始跟随重定向链...")
+        log("[\x1b[0;32m+\x1b[0m] CAS登录成功，开始跟随重定向链...")
 
         # 手动跟踪所有重定向
         max_redirects = 10
         redirect_count = 0
 
         while redirect_count < max_redirects:
-            print(f"[\x1b[0;36m!\x1b[0m] 跟随重定向{redirect_count + 1}...")
-            response = self.session.get(current_url, allow_redirects=False, verify=False)
+            log(f"[\x1b[0;36m!\x1b[0m] 跟随重定向{redirect_count + 1}...")
+            response = session.get(current_url, headers=login_headers, allow_redirects=False, verify=False)
 
             # 检查是否有更多重定向
             if response.status_code in (301, 302, 303, 307) and 'Location' in response.headers:
@@ -93,20 +135,20 @@ class OJRequester:
 
                 # 如果重定向回到OJ系统，则完成最后跳转
                 if self.base_url in current_url:
-                    print(f"[\x1b[0;36m!\x1b[0m] 跟随重定向{redirect_count + 1}，重定向到OJ系统...")
-                    response = self.session.get(current_url, allow_redirects=True, verify=False)
+                    log(f"[\x1b[0;36m!\x1b[0m] 跟随重定向{redirect_count + 1}，重定向到OJ系统...")
+                    response = session.get(current_url, headers=login_headers, allow_redirects=True, verify=False)
                     break
             else:
                 # 没有更多的重定向
                 break
 
         # 步骤7: 检查是否已经获取JCoderID
-        jcoder_id = self.session.cookies.get('JCoderID')
+        jcoder_id = session.cookies.get('JCoderID')
         if not jcoder_id:
-            print("[\x1b[0;31mx\x1b[0m] 登录过程未获取到JCoderID")
+            log("[\x1b[0;31mx\x1b[0m] 登录过程未获取到JCoderID")
             return False
 
-        print("[\x1b[0;32m+\x1b[0m] 获取到JCoderID")
+        log("[\x1b[0;32m+\x1b[0m] 获取到JCoderID")
 
         # 步骤8: 关键步骤! 调用cors API获取csrftoken
         headers = {
@@ -117,97 +159,261 @@ class OJRequester:
             'Sec-Fetch-Mode': 'cors',
             'Sec-Fetch-Site': 'same-origin'
         }
-        print(f"[\x1b[0;36m!\x1b[0m] 获取CSRF令牌中...")
-        response = self.session.get(f"{self.base_url}/api/cors/", headers=headers, verify=False)
+        log(f"[\x1b[0;36m!\x1b[0m] 获取CSRF令牌中...")
+        response = session.get(f"{self.base_url}/api/cors/", headers=headers, verify=False)
 
         if response.status_code != 200:
-            print("[\x1b[0;31mx\x1b[0m] 访问cors API失败")
+            log("[\x1b[0;31mx\x1b[0m] 访问cors API失败")
             return False
 
         # 检查是否已设置csrftoken
-        csrf_token = self.session.cookies.get('csrftoken')
+        csrf_token = session.cookies.get('csrftoken')
         if not csrf_token:
-            print("[\x1b[0;31mx\x1b[0m] 未能通过cors API获取csrftoken")
+            log("[\x1b[0;31mx\x1b[0m] 未能通过cors API获取csrftoken")
             return False
 
-        self.csrf_token = csrf_token
-        print("[\x1b[0;32m+\x1b[0m] 成功获取csrftoken")
+        log("[\x1b[0;32m+\x1b[0m] 成功获取csrftoken")
 
         # 验证登录状态完整性
         if jcoder_id and csrf_token:
-            print("[\x1b[0;32m+\x1b[0m] cookies获取完整")
+            log("[\x1b[0;32m+\x1b[0m] cookies获取完整")
+            # 其他线程可能仍在使用旧会话发送请求，因此只替换而不关闭
+            self.session = session
+            self.csrf_token = csrf_token
+            self.last_verified = time.monotonic()
             return True
         else:
-            print("[\x1b[0;31mx\x1b[0m] 登录状态不完整")
+            log("[\x1b[0;31mx\x1b[0m] 登录状态不完整")
             return False
 
-    def save_cookies(self, filename="oj_cookies.pkl"):
-        """保存cookies到文件"""
-        # Store cookies and additional info like CSRF token and timestamp
-        data = {
-            'cookies': self.session.cookies,
-            'csrf_token': self.csrf_token,
-            'timestamp': datetime.now().timestamp()
-        }
-
+    def save_cookies(self, quiet=False):
+        """保存cookies到凭证文件，quiet为True时只在失败时输出"""
         try:
-            with open(filename, 'wb') as f:
-                dump(data, f)
-            print(f"[\x1b[0;32m+\x1b[0m] Cookies保存到 {filename}")
+            self._store_generation = self.credentials.save(self.session.cookies, self.csrf_token)
+            if not quiet:
+                print(f"[\x1b[0;32m+\x1b[0m] Cookies保存到 {self.credentials.path}")
             return True
         except Exception as e:
             print(f"[\x1b[0;31mx\x1b[0m] Cookies保存失败·: {e}")
             return False
 
-    def load_cookies(self, filename="oj_cookies.pkl"):
-        """从文件加载cookies"""
-        if not os.path.exists(filename):
+    def load_cookies(self):
+        """从凭证文件加载cookies"""
+        # 不按保存时间判断过期，由服务器拒绝请求时再重新登录（见_post）
+        saved = self.credentials.load()
+        if not saved or not saved.get('cookies') or not saved.get('csrf_token'):
             print(f"[\x1b[0;33m!\x1b[0m] 没有找到保存的Cookies文件")
             return False
 
-        try:
-            with open(filename, 'rb') as f:
-                data = load(f)
+        self._apply_credentials(saved)
+        return True
 
-            # Check if cookies are too old
-            timestamp = data.get('timestamp', 0)
-            if datetime.now().timestamp() - timestamp > 7200:
-                return False
+    def _apply_credentials(self, saved):
+        """用凭证文件中的cookies与CSRF令牌替换当前会话"""
+        # 其他线程可能仍在使用旧会话发送请求，因此只替换而不关闭
+        session = self.sessions.new_session()
+        for cookie in saved['cookies']:
+            session.cookies.set_cookie(requests.cookies.create_cookie(**cookie))
+        self.session = session
+        self.csrf_token = saved.get('csrf_token')
+        self._store_generation = saved.get('generation', 0)
 
-            # Restore session cookies
-            self.session.cookies = data['cookies']
-            self.csrf_token = data.get('csrf_token')
+    def login_shared(self, username, password, verbose=True):
+        """在凭证文件的锁内登录并保存cookies
 
+        如果其他oja进程在本进程加载凭证之后已经登录并保存，则直接使用其凭证，
+        因此同时运行的多个进程只会有一个执行CAS登录。
+
+        Args:
+            verbose: 为False时不输出登录过程
+
+        Returns:
+            bool: 是否登录成功
+        """
+        with self.credentials.lock():
+            saved = self.credentials.load()
+            if (saved and saved.get('generation', 0) > self._store_generation
+                    and saved.get('cookies') and saved.get('csrf_token') != self.csrf_token):
+                self._apply_credentials(saved)
+                if verbose:
+                    print("[\x1b[0;32m+\x1b[0m] 使用其他oja进程刚保存的登录凭证")
+                return True
+
+            if not self.cas_login(username, password, verbose):
+                return False
+            self._store_generation = self.credentials.write(self.session.cookies, self.csrf_token)
+            if verbose:
+                print(f"[\x1b[0;32m+\x1b[0m] Cookies保存到 {self.credentials.path}")
             return True
-        except Exception as e:
-            print(f"[\x1b[0;31mx\x1b[0m] 保存Cookies时出错: {e}")
-            return False
 
-    def check_cookies_status(self):
-        """检查Cookies有效性"""
-        courses = self.get_my_courses()
+    @contextmanager
+    def without_reauth(self):
+        """with块内当前线程的请求被拒绝时不重新登录，直接返回被拒绝的响应（其他线程不受影响）"""
+        previous = getattr(self._local, 'no_reauth', False)
+        self._local.no_reauth = True
+        try:
+            yield
+        finally:
+            self._local.no_reauth = previous
+
+    def check_cookies_status(self, reauth=True):
+        """检查Cookies有效性，有效时保留课程列表响应供后续复用
+
+        Args:
+            reauth: 为False时cookies无效直接返回False，不在请求中重新登录（由调用方统一重新登录）
+        """
+        if reauth:
+            courses = self.get_my_courses()
+        else:
+            with self.without_reauth():
+                courses = self.get_my_courses()
         if courses and isinstance(courses, dict) and 'list' in courses:
+            self.courses = courses
             return True
         return False
 
+    def refresh_session(self, verbose=True):
+        """访问/api/cors/刷新CSRF令牌并验证会话，会话已失效时由_post重新登录
+
+        Args:
+            verbose: 为False时验证与重新登录过程都不输出（后台会话保持线程中）
+
+        Returns:
+            bool: 刷新后会话是否有效
+        """
+        self._local.quiet = not verbose
+        try:
+            return self._refresh_session()
+        finally:
+            self._local.quiet = False
+
+    def _log(self, *args, **kwargs):
+        """输出提示，当前线程正在静默刷新会话时不输出"""
+        if not getattr(self._local, 'quiet', False):
+            print(*args, **kwargs)
+
+    def _refresh_session(self):
+        from config import REQUEST_TIMEOUT
+
+        headers = {
+            'Accept': '*/*',
+            'Referer': f'{self.base_url}/home',
+            'X-Requested-With': 'XMLHttpRequest',
+            'Sec-Fetch-Dest': 'empty',
+            'Sec-Fetch-Mode': 'cors',
+            'Sec-Fetch-Site': 'same-origin'
+        }
+        try:
+            self.session.get(f"{self.base_url}/api/cors/", headers=headers, verify=False, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException:
+            return False
+
+        csrf_token = self.session.cookies.get('csrftoken')
+        if csrf_token and csrf_token != self.csrf_token:
+            self.csrf_token = csrf_token
+            self.save_cookies(quiet=True)
+
+        return self.check_cookies_status()
+
+    def start_session_keeper(self, refresh_after):
+        """启动后台会话保持线程
+
+        Args:
+            refresh_after: 会话闲置多少秒后主动刷新
+        """
+        from .session_keeper import SessionKeeper
+
+        if self.keeper is None:
+            self.keeper = SessionKeeper(self, refresh_after).start()
+        return self.keeper
+
     def clear_session(self):
         """Clear all cookies and session data to start fresh"""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9',
-            'Sec-Ch-Ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"Windows"',
-            'Priority': 'u=1, i'
-        })
+        self.session.close()
+        self.session = self.sessions.new_session()
         self.csrf_token = None
 
-    def get_my_courses(self):
-        """获取用户的课程列表"""
+    @staticmethod
+    def _is_auth_failure(response):
+        """判断响应是否表示会话已被服务器拒绝（未登录或CSRF校验失败）"""
+        return response.status_code in (401, 403)
+
+    def _reauthenticate(self, generation):
+        """会话被拒绝时重新登录，所有线程共享一把锁，只有一个线程执行CAS登录
+
+        Args:
+            generation: 发送失败请求时的登录代数
+
+        Returns:
+            bool: 是否已有可用的新会话（由本线程或其他线程登录）
+        """
+        with self._auth_lock:
+            if self._auth_generation != generation:
+                return True  # 其他线程已经重新登录
+            if self._reauth_failed:
+                return False
+
+            import config
+
+            verbose = not getattr(self._local, 'quiet', False)
+            self._log("\n[\x1b[0;33m!\x1b[0m] 会话已被服务器拒绝，重新登录中...")
+            if not self.login_shared(config.USERNAME, config.PASSWORD, verbose):
+                self._log("[\x1b[0;31mx\x1b[0m] 重新登录失败")
+                self._reauth_failed = True
+                return False
+
+            self._auth_generation += 1
+            self.auth_stats['reauths'] += 1
+            return True
+
+    def _send(self, url, headers, data):
+        """在并发名额内发送一次请求"""
+        from config import REQUEST_TIMEOUT
+
+        with self.concurrency.slot():
+            start = time.monotonic()
+            try:
+                response = self.session.post(url, headers=headers, data=data, verify=False, timeout=REQUEST_TIMEOUT)
+            except requests.exceptions.Timeout:
+                self.concurrency.record_timeout()
+                raise
+            self.concurrency.record_response(response.status_code, time.monotonic() - start)
+        if response.status_code == 200:
+            self.last_verified = time.monotonic()
+        return response
+
+    def _post(self, url, headers, data):
+        """发送API请求，受并发控制器约束并向其反馈延迟与状态码
+
+        服务器以401/403拒绝会话时重新登录一次（多个线程共享同一次登录），
+        然后使用新的CSRF令牌重放该请求；在without_reauth()内时直接返回被拒绝的响应。
+
+        Returns:
+            响应对象；网络错误或超时时打印原因并返回False
+        """
+        try:
+            generation = self._auth_generation
+            response = self._send(url, headers, data)
+            if not self._is_auth_failure(response) or getattr(self._local, 'no_reauth', False) \
+                    or not self._reauthenticate(generation):
+                return response
+
+            self.auth_stats['replays'] += 1
+            headers = dict(headers, **{'X-CSRFToken': self.csrf_token})
+            return self._send(url, headers, data)
+        except requests.exceptions.RequestException as e:
+            self._log(f"\n[\x1b[0;31mx\x1b[0m] 请求失败（{e.__class__.__name__}），请检查网络连接")
+            return False
+
+    def get_my_courses(self, page=1, page_size=None):
+        """获取用户的课程列表（一页）
+
+        Args:
+            page: 页码，从1开始
+            page_size: 每页条目数，默认使用config.PAGE_SIZE
+        """
         if not self.csrf_token:
-            print("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送请求")
+            self._log("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送请求")
             return False
 
         url = f"{self.base_url}/api/union/my_courses_list/"
@@ -225,31 +431,41 @@ class OJRequester:
 
         # 设置请求数据
         data = {
-            'page': '1',
-            'offset': '40',
+            'page': str(page),
+            'offset': str(page_size or self._page_size()),
             'query': '',
             'tags': '[]'
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return False
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                if self.cache is not None and isinstance(result, dict) and 'list' in result:
+                    self.cache.snapshot("/api/union/my_courses_list/", result, page=page)  # 供离线模式使用
                 if 'list' in result and result['list']:
                     return result
                 else:
                     return result
             except json.JSONDecodeError:
-                print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
+                self._log("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
                 return False
         else:
-            print(f"[\x1b[0;31mx\x1b[0m] 请求失败，HTTP状态码: {response.status_code}")
+            self._log(f"[\x1b[0;31mx\x1b[0m] 请求失败，HTTP状态码: {response.status_code}")
             return False
 
-    def get_homeworks_list(self, course_id):
-        """获取指定课程的作业列表"""
+    def get_homeworks_list(self, course_id, page=1, page_size=None):
+        """获取指定课程的作业列表（一页）
+
+        Args:
+            course_id: 课程ID
+            page: 页码，从1开始
+            page_size: 每页条目数，默认使用config.PAGE_SIZE
+        """
         if not self.csrf_token:
             print("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送请求")
             return False
@@ -269,24 +485,30 @@ class OJRequester:
 
         # 设置请求数据 - 修改为正确的参数格式
         data = {
-            'page': '1',
-            'offset': '40',
+            'page': str(page),
+            'offset': str(page_size or self._page_size()),
             'courseId': course_id,
             'category': '0'
         }
 
-        print(f"\n[\x1b[0;36m!\x1b[0m] 获取课程{course_id}的作业列表...")
+        if page == 1:
+            print(f"\n[\x1b[0;36m!\x1b[0m] 获取课程{course_id}的作业列表...")
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return False
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                if self.cache is not None and isinstance(result, dict) and 'list' in result:
+                    self.cache.snapshot("/api/course/homeworks/list/", result, course_id, page)  # 供离线模式使用
                 if 'list' in result and result['list']:
                     return result
                 else:
-                    print("[\x1b[0;33m!\x1b[0m] 获取到的作业列表为空")
+                    if page == 1:
+                        print("[\x1b[0;33m!\x1b[0m] 获取到的作业列表为空")
                     return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -295,13 +517,38 @@ class OJRequester:
             print(f"[\x1b[0;31mx\x1b[0m] 请求失败，HTTP状态码: {response.status_code}")
             return False
 
+    @staticmethod
+    def _page_size():
+        from config import PAGE_SIZE
+        return PAGE_SIZE
+
+    def iter_courses(self, first_page=None):
+        """逐条产出全部课程，按页获取并在后台预取下一页
+
+        Args:
+            first_page: 已获取的第一页响应（如验证登录时的课程列表），提供时不再重复请求
+        """
+        page_size = self._page_size()
+        return iter_pages(lambda page: self.get_my_courses(page, page_size), page_size, first_page)
+
+    def iter_homeworks(self, course_id):
+        """逐条产出课程的全部作业，按页获取并在后台预取下一页"""
+        page_size = self._page_size()
+        return iter_pages(lambda page: self.get_homeworks_list(course_id, page, page_size), page_size)
+
     def get_homework_info(self, homework_id, course_id):
         """获取作业信息"""
         if not self.csrf_token:
             print("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送请求")
             return False
 
-        url = f"{self.base_url}/api/homework/general/"
+        endpoint = "/api/homework/general/"
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, course_id, homework_id)
+            if cached is not None:
+                return cached
+
+        url = f"{self.base_url}{endpoint}"
 
         # 设置请求头
         headers = {
@@ -321,11 +568,15 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return False
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                if self.cache is not None:
+                    self.cache.put(endpoint, result, course_id, homework_id)
                 return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -340,7 +591,13 @@ class OJRequester:
             print("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送请求")
             return False
 
-        url = f"{self.base_url}/api/homework/problems/list/"
+        endpoint = "/api/homework/problems/list/"
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, course_id, homework_id)
+            if cached is not None:
+                return cached
+
+        url = f"{self.base_url}{endpoint}"
 
         # 设置请求头
         headers = {
@@ -360,12 +617,16 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return False
 
         if response.status_code == 200:
             try:
                 result = response.json()
                 if 'list' in result and result['list']:
+                    if self.cache is not None:
+                        self.cache.put(endpoint, result, course_id, homework_id)
                     return result
                 else:
                     print("[\x1b[0;33m!\x1b[0m] 获取到的问题列表为空")
@@ -383,7 +644,13 @@ class OJRequester:
             print("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送请求")
             return False
 
-        url = f"{self.base_url}/api/homework/problems/info/"
+        endpoint = "/api/homework/problems/info/"
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, course_id, homework_id, problem_id)
+            if cached is not None:
+                return cached
+
+        url = f"{self.base_url}{endpoint}"
 
         # 设置请求头
         headers = {
@@ -404,11 +671,15 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return False
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                if self.cache is not None:
+                    self.cache.put(endpoint, result, course_id, homework_id, problem_id)
                 return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -444,11 +715,16 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return False
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                if self.code_store is not None and isinstance(result, dict) and result.get('list'):
+                    # 代码保存到本地存储，记录中只保留按文件名索引的哈希引用
+                    self.code_store.externalize(result['list'], course_id, homework_id, problem_id)
                 return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -458,33 +734,36 @@ class OJRequester:
             return False
 
     def submit_homework(self, homework_id, problem_id, course_id, file_paths):
-        """提交Java作业到OJ平台"""
+        """提交Java作业到OJ平台
+
+        Args:
+            file_paths: Java文件路径列表，已读取文件的FileBundle（避免再次读取），
+                或 {文件名: 代码}（如离线时排队的提交）
+        """
         # 检查CSRF令牌是否存在
         if not self.csrf_token:
             print("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送提交请求")
             return False
 
         # 导入必要的库
-        from utils.file_handlers import read_java_file
+        from utils.file_bundle import FileBundle
+
+        # 会话闲置过久时先刷新，避免提交请求本身遇到过期会话
+        if self.keeper is not None:
+            self.keeper.ensure_fresh()
 
-        files_dict = {}
         if not file_paths: # 确保 file_paths 不为空
             print("[\x1b[0;31mx\x1b[0m] 没有提供Java文件路径")
             return None
 
-        print(f"[\x1b[0;36m!\x1b[0m] 读取Java文件中...")
-        for file_path in file_paths:
-            java_content = read_java_file(file_path)
-            if not java_content:
-                print(f"[\x1b[0;31mx\x1b[0m] 无法读取Java文件: {file_path}")
-                return None 
-
-            # 提取带扩展名的文件名
-            file_name = os.path.basename(file_path)
-            files_dict[file_name] = java_content
-        
-        if not files_dict: # 如果所有文件都读取失败
-            print("[\x1b[0;31mx\x1b[0m] 无法读取任何Java文件内容")
+        if isinstance(file_paths, dict):
+            files_dict = file_paths
+        else:
+            bundle = file_paths if isinstance(file_paths, FileBundle) else FileBundle(file_paths)
+            print(f"[\x1b[0;36m!\x1b[0m] 读取Java文件中...")
+            files_dict = bundle.contents()  # 已在重复检查时读取过的文件不会再次读取
+        if not files_dict: # 如果有文件读取失败
+            print("[\x1b[0;31mx\x1b[0m] 无法读取Java文件内容")
             return None
 
         # 准备files JSON结构
@@ -516,13 +795,22 @@ class OJRequester:
 
         # 发送请求
         print(f"[\x1b[0;36m!\x1b[0m] 正在提交Java作业...")
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return None
 
         if response.status_code == 200:
             try:
                 result = response.json()
                 if 'recordId' in result:
                     print(f"[\x1b[0;32m+\x1b[0m] 提交成功！记录ID: {result.get('recordId')}")
+                    # 提交后作业得分会变化，使对应的作业信息缓存失效
+                    if self.cache is not None:
+                        self.cache.invalidate("/api/homework/general/", course_id, homework_id)
+                    # 记录本次提交的内容，之后的重复检查无需重新获取提交记录
+                    if self.code_store is not None:
+                        self.code_store.record_submission(result['recordId'], course_id, homework_id,
+                                                          problem_id, files_dict)
                     return result
                 else:
                     print("[\x1b[0;31mx\x1b[0m] 提交响应缺少recordId")
@@ -571,11 +859,16 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._post(url, headers=headers, data=data)
+        if response is False:
+            return None
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                if (self.code_store is not None and isinstance(result, dict)
+                        and result.get('resultState') not in (None, 'JG')):
+                    self.code_store.update_result(record_id, result['resultState'], result.get('score'))
                 return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -0,0 +1,180 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """基于SQLite的API响应缓存
+
+    以 (端点, courseId, homeworkId, problemId) 为键保存JSON响应，
+    每个端点有独立的过期时间，条目总数超过上限时按最近访问时间淘汰（LRU）。
+    供离线模式使用的列表快照保存在单独的snapshots表中，每页只保留最新一份，不参与淘汰。
+
+    Args:
+        path: SQLite数据库文件路径
+        ttls: {端点: 过期秒数}，未列出的端点不会被缓存
+        max_entries: 最多保留的条目数
+        refresh: 为True时忽略已有缓存，但仍写入新的响应
+    """
+
+    def __init__(self, path, ttls, max_entries=2000, refresh=False):
+        self.path = path
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " endpoint TEXT NOT NULL,"
+            " course_id TEXT NOT NULL,"
+            " homework_id TEXT NOT NULL,"
+            " problem_id TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " PRIMARY KEY (endpoint, course_id, homework_id, problem_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            " endpoint TEXT NOT NULL,"
+            " course_id TEXT NOT NULL,"
+            " page INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " PRIMARY KEY (endpoint, course_id, page))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(endpoint, course_id, homework_id, problem_id):
+        return (endpoint, str(course_id or ''), str(homework_id or ''), str(problem_id or ''))
+
+    def caches(self, endpoint):
+        """判断该端点是否启用缓存"""
+        return endpoint in self.ttls
+
+    def get(self, endpoint, course_id=None, homework_id=None, problem_id=None):
+        """读取未过期的缓存响应，未命中时返回None"""
+        if not self.caches(endpoint):
+            return None
+
+        key = self._key(endpoint, course_id, homework_id, problem_id)
+        now = time.time()
+        with self._lock:
+            row = None
+            if not self.refresh:
+                row = self._conn.execute(
+                    "SELECT payload, created FROM responses"
+                    " WHERE endpoint=? AND course_id=? AND homework_id=? AND problem_id=?", key
+                ).fetchone()
+
+            if row is None or now - row[1] > self.ttls[endpoint]:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed=?"
+                " WHERE endpoint=? AND course_id=? AND homework_id=? AND problem_id=?", (now,) + key
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, endpoint, payload, course_id=None, homework_id=None, problem_id=None):
+        """写入一条响应，并在超出上限时淘汰最久未访问的条目"""
+        if not self.caches(endpoint):
+            return
+        self._write(self._key(endpoint, course_id, homework_id, problem_id), payload)
+
+    def _write(self, key, payload):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (endpoint, course_id, homework_id, problem_id, payload, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", key + (json.dumps(payload), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE rowid IN ("
+                " SELECT rowid FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def get_stale(self, endpoint, course_id=None, homework_id=None, problem_id=None):
+        """离线时读取缓存响应，不论是否过期
+
+        Returns:
+            (响应, 写入时间戳)，没有缓存时返回None
+        """
+        key = self._key(endpoint, course_id, homework_id, problem_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created FROM responses"
+                " WHERE endpoint=? AND course_id=? AND homework_id=? AND problem_id=?", key
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def snapshot(self, endpoint, payload, course_id=None, page=1):
+        """保存列表类响应（课程列表、作业列表）的一页，不经过有效期也不会被淘汰，仅供离线模式读取"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (endpoint, course_id, page, payload, created)"
+                " VALUES (?, ?, ?, ?, ?)", (endpoint, str(course_id or ''), int(page), json.dumps(payload), time.time())
+            )
+            self._conn.commit()
+
+    def snapshots(self, endpoint, course_id=None):
+        """离线时按页码顺序读取保存的列表响应
+
+        Returns:
+            [(响应, 写入时间戳), ...]
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, created FROM snapshots WHERE endpoint=? AND course_id=? ORDER BY page",
+                (endpoint, str(course_id or ''))
+            ).fetchall()
+        return [(json.loads(payload), created) for payload, created in rows]
+
+    def invalidate(self, endpoint, course_id=None, homework_id=None, problem_id=None):
+        """删除一条缓存"""
+        key = self._key(endpoint, course_id, homework_id, problem_id)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM responses"
+                " WHERE endpoint=? AND course_id=? AND homework_id=? AND problem_id=?", key
+            )
+            self._conn.commit()
+
+    def summary(self):
+        """返回命中/未命中统计文本"""
+        return f"缓存命中 {self.hits} 次，未命中 {self.misses} 次"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_response_cache(refresh=False):
+    """根据config中的设置创建响应缓存
+
+    Args:
+        refresh: 为True时强制从服务器重新获取，并用新响应覆盖缓存
+
+    Returns:
+        ResponseCache实例，打开失败时返回None
+    """
+    from config import CACHE_FILE, CACHE_TTLS, CACHE_MAX_ENTRIES
+
+    try:
+        return ResponseCache(CACHE_FILE, CACHE_TTLS, CACHE_MAX_ENTRIES, refresh=refresh)
+    except sqlite3.Error as e:
+        print(f"[\x1b[0;33m!\x1b[0m] 无法打开响应缓存，将直接请求服务器: {e}")
+        return None
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+
+
+class SessionKeeper:
+    """在后台保持会话有效，使提交等关键请求开始时会话总是最近验证过的
+
+    请求层在每次收到成功响应时更新会话的最后验证时间；后台线程定期检查，
+    会话闲置超过refresh_after秒时先访问/api/cors/刷新CSRF令牌并验证会话，
+    服务器拒绝时由请求层重新登录。
+
+    Args:
+        requester: OJRequester实例
+        refresh_after: 会话闲置多少秒后主动刷新
+        check_interval: 后台线程检查的间隔（秒），默认取refresh_after的1/4（最长60秒）
+    """
+
+    def __init__(self, requester, refresh_after, check_interval=None):
+        self.requester = requester
+        self.refresh_after = refresh_after
+        self.check_interval = check_interval or min(60.0, max(1.0, refresh_after / 4))
+        self.events = deque(maxlen=20)  # (时间戳, 原因, 是否成功, 耗时)
+        self._refresh_lock = threading.Lock()
+        self._unreported = None  # 尚未告知用户的后台刷新失败 (时间戳, 原因)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='session-keeper', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def age(self):
+        """距离会话最后一次被服务器确认有效的秒数，从未确认时返回None"""
+        verified = self.requester.last_verified
+        return None if verified is None else time.monotonic() - verified
+
+    def _is_stale(self, max_age):
+        age = self.age()
+        return age is None or age > max_age
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            if self._is_stale(self.refresh_after):
+                self.refresh("后台定期刷新", verbose=False)
+
+    def refresh(self, reason, verbose=True):
+        """刷新会话，多个调用方同时触发时只执行一次
+
+        Args:
+            reason: 记录在刷新事件中的原因
+            verbose: 为False时不输出（后台线程中），失败由report_failures在输入提示返回后告知
+
+        Returns:
+            bool: 会话是否有效
+        """
+        with self._refresh_lock:
+            # 等待锁期间可能已由其他调用方刷新
+            if not self._is_stale(self.check_interval):
+                return True
+            start = time.monotonic()
+            try:
+                success = self.requester.refresh_session(verbose)
+            except Exception:
+                success = False
+            self.events.append((time.time(), reason, success, time.monotonic() - start))
+            if not success and not verbose:
+                self._unreported = (time.time(), reason)
+            return success
+
+    def report_failures(self):
+        """输出上次调用以来后台刷新失败的情况（只输出一次），在输入提示返回后调用"""
+        failure, self._unreported = self._unreported, None
+        if failure is not None:
+            moment = time.strftime('%H:%M:%S', time.localtime(failure[0]))
+            print(f"[\x1b[0;33m!\x1b[0m] {moment} {failure[1]}会话失败，下次请求时将重新登录")
+
+    def ensure_fresh(self, max_age=None):
+        """在关键请求之前调用，会话闲置过久时同步刷新
+
+        Args:
+            max_age: 允许的最大闲置时间（秒），默认与后台刷新阈值相同
+        """
+        if self._is_stale(self.refresh_after if max_age is None else max_age):
+            return self.refresh("提交前刷新")
+        return True
+
+    def describe(self):
+        """返回会话年龄与最近刷新事件的文本，用于诊断输出"""
+        age = self.age()
+        age_text = "未验证" if age is None else f"{age:.0f}s"
+        lines = [f"会话年龄: {age_text}，超过 {self.refresh_after:.0f}s 后自动刷新，"
+                 f"已刷新: {len(self.events)} 次"]
+        for timestamp, reason, success, elapsed in list(self.events)[-10:]:
+            moment = time.strftime('%H:%M:%S', time.localtime(timestamp))
+            lines.append(f"  {moment} {reason}: {'成功' if success else '失败'} ({elapsed * 1000:.0f}ms)")
+        return "\n".join(lines)
@@ -0,0 +1,110 @@
+import threading
+import weakref
+from types import MappingProxyType
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 所有请求共用的浏览器请求头，创建会话时写入一次，之后不再修改
+DEFAULT_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
+    'Accept': '*/*',
+    'Accept-Language': 'zh-CN,zh;q=0.9',
+    'Sec-Ch-Ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"Windows"',
+    'Priority': 'u=1, i'
+})
+
+
+class SessionManager:
+    """创建并管理可在多个线程间共享的requests会话
+
+    会话挂载的HTTPAdapter连接池大小与并发上限一致，且在连接全部占用时阻塞等待，
+    因此并行请求总能复用已有的keep-alive连接，而不会因连接池已满丢弃连接。
+    会话级请求头只在创建时设置，Referer等请求相关的头部应通过每次请求的headers参数传入。
+    连接复用统计累计所有创建过的会话：会话被丢弃（如重新登录后）时将其计数并入累计值并关闭其连接池。
+
+    Args:
+        pool_size: 每个主机的连接池大小，通常等于最大并发请求数
+    """
+
+    def __init__(self, pool_size=16):
+        self.pool_size = max(1, pool_size)
+        self._lock = threading.Lock()
+        self._live = []  # 仍在使用的会话各自的HTTPAdapter列表
+        self._retired = {'requests': 0, 'connections': 0}  # 已丢弃会话的累计计数
+        self._sessions_created = 0
+
+    def new_session(self):
+        """创建一个挂载好连接池的新会话"""
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+
+        adapters = []
+        for prefix in ('https://', 'http://'):
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, pool_block=True)
+            session.mount(prefix, adapter)
+            adapters.append(adapter)
+
+        with self._lock:
+            self._live.append(adapters)
+            self._sessions_created += 1
+        weakref.finalize(session, self._retire, adapters)
+        return session
+
+    @staticmethod
+    def _count(adapters):
+        """返回这些连接池已发送的请求数与新建的连接数"""
+        requests_sent = 0
+        connections = 0
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent += pool.num_requests
+                connections += pool.num_connections
+        return requests_sent, connections
+
+    def _retire(self, adapters):
+        """会话被回收时将其计数并入累计值，并关闭其连接"""
+        requests_sent, connections = self._count(adapters)
+        with self._lock:
+            self._live.remove(adapters)
+            self._retired['requests'] += requests_sent
+            self._retired['connections'] += connections
+        for adapter in adapters:
+            adapter.close()
+
+    def stats(self):
+        """统计所有创建过的会话的连接复用情况
+
+        Returns:
+            dict: requests为已发送的请求数，connections为新建的连接数，
+                  reused为复用已有连接的请求数，sessions为创建过的会话数
+        """
+        with self._lock:
+            requests_sent = self._retired['requests']
+            connections = self._retired['connections']
+            live = list(self._live)
+        for adapters in live:
+            counts = self._count(adapters)
+            requests_sent += counts[0]
+            connections += counts[1]
+
+        return {
+            'requests': requests_sent,
+            'connections': connections,
+            'reused': max(0, requests_sent - connections),
+            'sessions': self._sessions_created
+        }
+
+    def describe(self):
+        """返回连接复用统计文本，用于诊断输出"""
+        stats = self.stats()
+        rate = stats['reused'] / stats['requests'] * 100 if stats['requests'] else 0
+        return (f"连接池大小: {self.pool_size}，请求: {stats['requests']}，新建连接: {stats['connections']}，"
+                f"复用率: {rate:.0f}%，会话重建: {stats['sessions'] - 1} 次")
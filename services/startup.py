@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .auth_service import cas_relogin
+
+
+def load_course_hint():
+    """读取上次自动选择的课程ID，用于启动时预取作业列表"""
+    from config import STARTUP_STATE_FILE
+
+    if not os.path.exists(STARTUP_STATE_FILE):
+        return None
+    try:
+        with open(STARTUP_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('course_id')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def save_course_hint(course_id):
+    """记录本次选择的课程ID"""
+    from config import STARTUP_STATE_FILE
+
+    try:
+        with open(STARTUP_STATE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'course_id': course_id}, f)
+    except OSError:
+        pass
+
+
+def _validate_and_speculate(requester, course_hint):
+    """同时验证登录状态（获取课程列表）与预取上次课程的作业列表
+
+    这两组请求被拒绝时不在请求中自动重新登录：cookies无效时都只返回失败，
+    由pipelined_startup统一执行一次CAS登录。其他线程的请求不受影响。
+
+    Returns:
+        (bool, list): 登录状态是否有效，以及预取到的作业列表（没有预取或失败时为None）
+    """
+    def fetch_homeworks():
+        from .data_service import fetch_and_process_homeworks_async
+        return asyncio.run(fetch_and_process_homeworks_async(requester, course_hint, reauth=False))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        validation = executor.submit(requester.check_cookies_status, reauth=False)
+        speculation = executor.submit(fetch_homeworks) if course_hint else None
+        valid = validation.result()
+        try:
+            homeworks = speculation.result() if speculation else None
+        except Exception:
+            homeworks = None
+
+    return valid, homeworks
+
+
+def pipelined_startup(requester, auto_select_course=True):
+    """登录并获取课程列表，同时预取上次自动选择的课程的作业列表
+
+    验证cookies所用的课程列表请求的响应直接作为课程列表返回，不再重复请求；
+    只有当cookies无效（请求未通过认证）时才重新执行CAS登录。
+
+    Args:
+        requester: OJRequester实例
+        auto_select_course: 是否会自动选择课程，只有此时才进行预取
+
+    Returns:
+        (courses, speculative): 课程列表响应，以及 (课程ID, 作业列表) 或None；
+        登录失败时返回None
+    """
+    course_hint = load_course_hint() if auto_select_course else None
+
+    if requester.load_cookies():
+        valid, homeworks = _validate_and_speculate(requester, course_hint)
+        if valid:
+            print("[\x1b[0;32m+\x1b[0m] 使用本地cookies登录成功")
+            return requester.courses, ((course_hint, homeworks) if homeworks else None)
+        requester.clear_session()
+
+    # cookies无效或未找到，重新登录后再同时获取课程列表与预取作业列表
+    if not cas_relogin(requester):
+        return None
+
+    valid, homeworks = _validate_and_speculate(requester, course_hint)
+    if not valid:
+        print("[\x1b[0;31mx\x1b[0m] 登录后仍无法获取课程列表")
+        return None
+    return requester.courses, ((course_hint, homeworks) if homeworks else None)
@@ -0,0 +1,350 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+from .credential_store import file_lock
+from .session_manager import SessionManager
+
+TEST_FILE_NAME = "MainTest.java"
+MANIFEST_NAME = "manifest.json"
+
+
+def unit_test_url(course_code, homework_id, problem_id, problem_name, base_url=None):
+    """构造单元测试文件的URL，格式: {base_url}/{课程}/{作业}/{problem_id}_{problem_name}/MainTest.java"""
+    if base_url is None:
+        from config import UNIT_TEST_BASE_URL
+        base_url = UNIT_TEST_BASE_URL
+    return f"{base_url}/{course_code}/{homework_id}/{problem_id}_{quote(problem_name)}/{TEST_FILE_NAME}"
+
+
+def manifest_url(course_code, homework_id, base_url=None):
+    """构造作业单元测试清单的URL: {base_url}/{课程}/{作业}/manifest.json"""
+    if base_url is None:
+        from config import UNIT_TEST_BASE_URL
+        base_url = UNIT_TEST_BASE_URL
+    return f"{base_url}/{course_code}/{homework_id}/{MANIFEST_NAME}"
+
+
+class UnitTestManifest:
+    """一份作业的单元测试清单
+
+    服务器上的清单文件格式为 {"version": 1, "tests": {"{problem_id}_{problem_name}": "<sha256>", ...}}，
+    也接受只列出条目名称的列表。条目按题目ID匹配，题目改名不影响查询。
+    """
+
+    def __init__(self, tests):
+        self.tests = {}  # 题目ID -> 文件内容的SHA-256（清单未提供时为None）
+        for key, sha256 in tests.items():
+            self.tests[str(key).split('_', 1)[0]] = sha256
+
+    @classmethod
+    def parse(cls, content):
+        """解析清单内容，格式不正确时返回None"""
+        try:
+            data = json.loads(content)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        tests = data.get('tests') if isinstance(data, dict) else data
+        if isinstance(tests, list):
+            tests = dict.fromkeys(tests)
+        return cls(tests) if isinstance(tests, dict) else None
+
+    def has_test(self, problem_id):
+        return str(problem_id) in self.tests
+
+    def sha256(self, problem_id):
+        return self.tests.get(str(problem_id))
+
+
+def parse_oss_error(text):
+    """OSS对不存在的文件可能返回200与XML错误内容，是错误时返回说明文本，否则返回None"""
+    if not (text.strip().startswith('<?xml') and '<Error>' in text):
+        return None
+    message = re.search(r'<Message>(.*?)</Message>', text)
+    key = re.search(r'<Key>(.*?)</Key>', text)
+    parts = [message.group(1)] if message else []
+    if key:
+        parts.append(f"请求的文件: {key.group(1)}")
+    return "; ".join(parts) or "服务器返回错误"
+
+
+class UnitTestCache:
+    """以SHA-256为键保存单元测试文件内容，并记录每个URL的验证信息
+
+    index.json中每个URL对应 {sha256, etag, last_modified, checked_at}，
+    sha256为None表示该题目没有单元测试。内容相同的文件只保存一份。
+    进程内应通过open_unit_test_cache()共享一个实例；保存时在文件锁内合并磁盘上的索引，
+    其他进程（或其他实例）写入的条目不会被覆盖。
+
+    Args:
+        root: 缓存目录
+        max_age: 距上次检查不超过该时间（秒）的条目直接使用，不发送请求
+    """
+
+    def __init__(self, root, max_age):
+        self.root = root
+        self.max_age = max_age
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.index_path = os.path.join(root, 'index.json')
+        self._lock = threading.Lock()
+        self._index = self._load()
+        self._changed = set()  # 自上次保存以来更新过的URL
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def entry(self, url):
+        with self._lock:
+            entry = self._index.get(url)
+            return dict(entry) if entry else None
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() - entry.get('checked_at', 0) < self.max_age
+
+    def blob(self, sha256):
+        try:
+            with open(os.path.join(self.blob_dir, sha256), 'rb') as f:
+                return f.read()
+        except (OSError, TypeError):
+            return None
+
+    def _update(self, url, **fields):
+        with self._lock:
+            entry = self._index.setdefault(url, {})
+            entry.update(fields, checked_at=time.time())
+            self._changed.add(url)
+
+    def store(self, url, content, etag=None, last_modified=None):
+        """保存下载到的文件内容，返回其SHA-256"""
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = os.path.join(self.blob_dir, sha256)
+        if not os.path.exists(path):
+            os.makedirs(self.blob_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        self._update(url, sha256=sha256, etag=etag, last_modified=last_modified)
+        return sha256
+
+    def mark_missing(self, url):
+        self._update(url, sha256=None, etag=None, last_modified=None)
+
+    def touch(self, url):
+        """服务器确认文件未变化（304）"""
+        self._update(url)
+
+    def save(self):
+        """保存索引：在文件锁内重新读取磁盘上的索引，并入本实例更新过的条目后原子替换"""
+        with self._lock:
+            if not self._changed:
+                return
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                with file_lock(f"{self.index_path}.lock"):
+                    merged = self._load()
+                    for url in self._changed:
+                        other = merged.get(url)
+                        if other is None or other.get('checked_at', 0) <= self._index[url].get('checked_at', 0):
+                            merged[url] = self._index[url]
+                    tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(merged, f)
+                    os.replace(tmp_path, self.index_path)
+                self._index = merged
+                self._changed.clear()
+            except OSError as e:
+                print(f"[\x1b[0;33m!\x1b[0m] 保存单元测试缓存索引失败: {e}")
+
+
+class UnitTestDownloader:
+    """通过条件请求（ETag / If-Modified-Since）与本地缓存下载单元测试文件
+
+    Args:
+        cache: UnitTestCache实例
+        max_workers: 批量下载时的并发数
+        timeout: 单个请求的超时时间（秒）
+        base_url: 单元测试服务器地址，默认使用config.UNIT_TEST_BASE_URL（测试时可替换为本地服务器）
+    """
+
+    def __init__(self, cache, max_workers=8, timeout=10, base_url=None):
+        self.cache = cache
+        self.base_url = base_url
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.session = SessionManager(pool_size=self.max_workers).new_session()
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+        self._manifests = {}  # (课程, 作业) -> UnitTestManifest或None
+        self._manifest_lock = threading.Lock()
+
+    def fetch(self, url, force=False):
+        """获取单个单元测试文件
+
+        Args:
+            url: 文件URL
+            force: 为True时即使缓存仍在有效期内也向服务器确认
+
+        Returns:
+            (status, value): status为downloaded（已下载新内容）、unchanged（与缓存一致）、
+            missing（没有单元测试）或error；前两种value为文件内容，其余为说明文本
+        """
+        entry = self.cache.entry(url)
+        cached = self.cache.blob(entry.get('sha256')) if entry and entry.get('sha256') else None
+        if not force and self.cache.is_fresh(entry):
+            if entry.get('sha256') is None:
+                return 'missing', "该题目暂无单元测试文件"
+            if cached is not None:
+                return 'unchanged', cached
+
+        headers = {}
+        if cached is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            with self._lock:
+                self.requests_sent += 1
+            response = self.session.get(url, headers=headers, verify=False, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            return 'error', f"下载异常: {e}"
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(url)
+            return 'unchanged', cached
+        if response.status_code == 404:
+            self.cache.mark_missing(url)
+            return 'missing', "该题目暂无单元测试文件"
+        oss_error = parse_oss_error(response.text) if response.status_code == 200 else None
+        if oss_error:
+            # OSS以200返回XML错误内容，同样表示文件不存在，保留服务器给出的原因
+            self.cache.mark_missing(url)
+            return 'missing', f"该题目暂无单元测试文件（服务器返回错误: {oss_error}）"
+        if response.status_code != 200:
+            return 'error', f"HTTP状态码: {response.status_code}"
+
+        content = response.content
+        sha256 = self.cache.store(url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        if cached is not None and entry.get('sha256') == sha256:
+            return 'unchanged', content
+        return 'downloaded', content
+
+    def load_manifest(self, course_code, homework_id):
+        """获取作业的单元测试清单（同样经过缓存与条件请求），服务器没有清单时返回None"""
+        key = (course_code, str(homework_id))
+        with self._manifest_lock:  # 并发下载时只请求一次清单
+            if key not in self._manifests:
+                status, value = self.fetch(manifest_url(course_code, homework_id, self.base_url))
+                parsed = UnitTestManifest.parse(value) if status in ('downloaded', 'unchanged') else None
+                self._manifests[key] = parsed
+            return self._manifests[key]
+
+    def cached_manifest(self, course_code, homework_id):
+        """只从本地缓存读取清单（不论是否过期），不发送请求；没有缓存时返回None"""
+        entry = self.cache.entry(manifest_url(course_code, homework_id, self.base_url))
+        content = self.cache.blob(entry.get('sha256')) if entry and entry.get('sha256') else None
+        return UnitTestManifest.parse(content) if content is not None else None
+
+    def fetch_problem(self, course_code, homework_id, problem_id, problem_name):
+        """获取一道题目的单元测试，有清单时据此跳过不存在的测试与未变化的文件
+
+        Returns:
+            与fetch相同的(status, value)
+        """
+        url = unit_test_url(course_code, homework_id, problem_id, problem_name, self.base_url)
+        manifest = self.load_manifest(course_code, homework_id)
+        if manifest is None:
+            return self.fetch(url)
+
+        if not manifest.has_test(problem_id):
+            return 'missing', "该题目暂无单元测试文件"
+        expected = manifest.sha256(problem_id)
+        entry = self.cache.entry(url)
+        if expected and entry and entry.get('sha256') == expected:
+            cached = self.cache.blob(expected)
+            if cached is not None:
+                return 'unchanged', cached
+        # 清单中的哈希与缓存不一致（或清单未提供哈希），向服务器确认
+        return self.fetch(url, force=bool(expected))
+
+    def download_homework(self, course_code, homework_id, problems, dest_root):
+        """并发下载一份作业中所有题目的单元测试，每道题目保存在单独的目录中
+
+        Args:
+            course_code: 课程代码
+            homework_id: 作业ID
+            problems: 题目列表（需要problemId与problemName）
+            dest_root: 保存目录，每道题目保存到 dest_root/{problemId}_{problemName}/MainTest.java
+
+        Returns:
+            list: 与problems顺序一致的 [(problem, status, 文件路径或说明), ...]
+        """
+        def download_one(problem):
+            problem_id = problem.get('problemId', '')
+            problem_name = problem.get('problemName', '')
+            status, value = self.fetch_problem(course_code, homework_id, problem_id, problem_name)
+            if status in ('missing', 'error'):
+                return problem, status, value
+
+            safe_name = re.sub(r'[\\/:*?"<>|]', '-', problem_name)
+            path = os.path.join(dest_root, f"{problem_id}_{safe_name}", TEST_FILE_NAME)
+            write_if_changed(path, value)
+            return problem, status, path
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(problems)))) as executor:
+                return list(executor.map(download_one, problems))
+        finally:
+            self.cache.save()
+
+
+def write_if_changed(path, content):
+    """内容与已有文件不同时才写入，避免无谓地修改文件时间"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return True
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def open_unit_test_cache():
+    """返回根据config中的设置创建的UnitTestCache（进程内共享一个实例）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from config import UNIT_TEST_CACHE_DIR, UNIT_TEST_MAX_AGE
+            _cache = UnitTestCache(UNIT_TEST_CACHE_DIR, UNIT_TEST_MAX_AGE)
+        return _cache
+
+
+def open_unit_test_downloader(base_url=None):
+    """根据config中的设置创建单元测试下载器，所有下载器共享同一个UnitTestCache
+
+    Args:
+        base_url: 单元测试服务器地址，默认使用config.UNIT_TEST_BASE_URL（基准测试中指向本地模拟服务器）
+    """
+    from config import MAX_CONCURRENT_REQUESTS
+    return UnitTestDownloader(open_unit_test_cache(), max_workers=MAX_CONCURRENT_REQUESTS, base_url=base_url)
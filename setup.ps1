@@ -389,12 +389,18 @@ if ($null -eq $profileContent -or -not $profileContent.Contains("function oja"))
 
 # ojAssistant function
 function oja {
-    python "$mainPath"
+    python "$mainPath" @args
 }
 "@
     Add-Content -Path $PROFILE -Value $ojaFunction
     Write-Host "PowerShell profile updated with oja function" -ForegroundColor Green
 }
+elseif (-not $profileContent.Contains("`"$mainPath`" @args")) {
+    # Older oja functions did not forward command-line arguments (oja submit/status/...)
+    $profileContent = $profileContent.Replace("python `"$mainPath`"", "python `"$mainPath`" @args")
+    Set-Content -Path $PROFILE -Value $profileContent -Encoding UTF8
+    Write-Host "oja function updated to forward command-line arguments" -ForegroundColor Green
+}
 else {
     Write-Host "oja function already exists in PowerShell profile" -ForegroundColor Green
 }
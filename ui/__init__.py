@@ -1,11 +1,39 @@
-"""UI模块，提供格式化显示与交互功能"""
+"""UI模块，提供格式化显示与交互功能
 
-from .display import display_courses, display_homeworks, display_problems_list, display_problems_info
-from .interaction import select_course, select_homework, interact_with_problems
-from .submission import handle_submission
+子模块在首次访问对应名称时才导入。
+"""
+
+from importlib import import_module
+
+# 公开名称 -> 所在子模块
+_EXPORTS = {
+    'display_courses': '.display',
+    'display_homeworks': '.display',
+    'display_problems_list': '.display',
+    'display_problems_info': '.display',
+    'display_diagnostics': '.display',
+    'display_unit_test_results': '.display',
+    'display_sync_summary': '.display',
+    'select_course': '.interaction',
+    'select_homework': '.interaction',
+    'interact_with_problems': '.interaction',
+    'handle_submission': '.submission',
+    'handle_batch_submission': '.submission',
+    'add_command_parsers': '.commands',
+    'run_command': '.commands',
+}
 
 # 定义当使用 from ui import * 时导入的内容
 __all__ = [
     'display_courses', 'display_homeworks', 'display_problems_info',
-    'select_course', 'select_homework', 'display_problems_list'
-]
\ No newline at end of file
+    'select_course', 'select_homework', 'display_problems_list',
+    'display_diagnostics'
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value  # 之后的访问不再经过__getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
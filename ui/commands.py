@@ -0,0 +1,350 @@
+"""非交互式命令行子命令，直接根据课程/作业/题目ID执行操作，只发送该操作需要的请求"""
+
+import os
+import time
+
+
+def add_command_parsers(subparsers):
+    """注册 submit / watch / status / fetch / test-download / sync / daemon 子命令"""
+    def add_target_arguments(parser, homework_required=True, problem_required=False):
+        parser.add_argument('-c', '--course', help='课程ID，如 CS109-25S，默认使用第一门课程')
+        parser.add_argument('-w', '--homework', type=int, required=homework_required, help='作业ID')
+        parser.add_argument('-p', '--problem', type=int, required=problem_required,
+                            help='题目ID；配合--index时为题目在作业中的序号(从1开始)')
+        parser.add_argument('--index', action='store_true', help='将-p解释为题目序号而不是题目ID')
+
+    submit_parser = subparsers.add_parser('submit', help='提交Java文件到指定题目')
+    add_target_arguments(submit_parser, problem_required=True)
+    submit_parser.add_argument('files', nargs='+', help='Java文件路径，相对路径基于WORK_DIRECTORY')
+    submit_parser.add_argument('--force', action='store_true', help='跳过与该题所有历史提交相同的检查')
+    submit_parser.add_argument('--no-wait', action='store_true', help='提交后不等待批改结果')
+
+    watch_parser = subparsers.add_parser('watch', help='监视Java文件，每次保存后自动提交到指定题目并显示结果')
+    add_target_arguments(watch_parser, problem_required=True)
+    watch_parser.add_argument('files', nargs='+', help='Java文件路径，相对路径基于WORK_DIRECTORY')
+
+    status_parser = subparsers.add_parser('status', help='查看作业或题目的提交状态')
+    add_target_arguments(status_parser)
+
+    fetch_parser = subparsers.add_parser('fetch', help='获取作业列表、题目列表或题目详情')
+    add_target_arguments(fetch_parser, homework_required=False)
+    fetch_parser.add_argument('--save', action='store_true', help='将题目内容保存为Markdown文件')
+
+    download_parser = subparsers.add_parser('test-download',
+                                            help='下载题目的单元测试文件，未指定-p时下载作业中所有题目的单元测试')
+    add_target_arguments(download_parser)
+
+    sync_parser = subparsers.add_parser('sync', help='将整门课程的作业、题目、提交记录与单元测试镜像到本地，之后只更新有变化的内容')
+    sync_parser.add_argument('-c', '--course', help='课程ID，如 CS109-25S，默认使用第一门课程')
+    sync_parser.add_argument('-o', '--output', help='镜像目录，默认为config.SYNC_DIRECTORY')
+    sync_parser.add_argument('--full', action='store_true', help='忽略上次同步的状态，重新获取并写入所有内容')
+    sync_parser.add_argument('--no-tests', action='store_true', help='不下载单元测试')
+
+    daemon_parser = subparsers.add_parser('daemon', help='管理保持登录状态与缓存的本地守护进程')
+    daemon_parser.add_argument('action', choices=['start', 'stop', 'status', 'serve'],
+                               help='start后台启动，stop停止，status查看状态，serve在前台运行')
+
+
+def run_command(args, requester):
+    """执行子命令并输出耗时
+
+    Args:
+        args: argparse解析结果
+        requester: 已登录的OJ请求实例
+
+    Returns:
+        bool: 命令是否成功
+    """
+    handlers = {
+        'submit': command_submit,
+        'watch': command_watch,
+        'status': command_status,
+        'fetch': command_fetch,
+        'test-download': command_test_download,
+        'sync': command_sync,
+    }
+
+    start = time.perf_counter()
+    requests_before = requester.concurrency.stats['requests']
+
+    course_id = args.course or _default_course(requester)
+    if not course_id:
+        print("[\x1b[0;31mx\x1b[0m] 无法确定课程ID，请使用 -c 指定")
+        success = False
+    else:
+        success = handlers[args.command](args, requester, course_id)
+
+    elapsed = (time.perf_counter() - start) * 1000
+    api_requests = requester.concurrency.stats['requests'] - requests_before
+    print(f"\n[\x1b[0;36m!\x1b[0m] {args.command} 耗时: {elapsed:.0f} ms，API请求: {api_requests} 次")
+    return success
+
+
+def _default_course(requester):
+    """未指定课程时使用课程列表中的第一门课程，优先复用登录验证时获取的列表"""
+    if not requester.courses:
+        requester.courses = requester.get_my_courses()  # 守护进程中后续命令可直接复用
+    courses = requester.courses
+    if courses and courses.get('list'):
+        return courses['list'][0]['course_id']
+    return None
+
+
+def _find_problem(requester, args, course_id, with_details=False):
+    """根据-p参数在作业题目列表中定位题目
+
+    Args:
+        with_details: 是否同时获取题目详情（时间限制等）
+
+    Returns:
+        题目对象，找不到时返回None
+    """
+    problems_list = requester.get_homework_problems(args.homework, course_id)
+    if not problems_list or not problems_list.get('list'):
+        print("[\x1b[0;31mx\x1b[0m] 获取问题列表失败或列表为空")
+        return None
+
+    problems = problems_list['list']
+    if args.index:
+        if not 1 <= args.problem <= len(problems):
+            print(f"[\x1b[0;31mx\x1b[0m] 题目序号超出范围(1-{len(problems)})")
+            return None
+        problem = problems[args.problem - 1]
+    else:
+        problem = next((p for p in problems if str(p.get('problemId')) == str(args.problem)), None)
+        if problem is None:
+            print(f"[\x1b[0;31mx\x1b[0m] 作业 {args.homework} 中没有题目ID {args.problem}")
+            return None
+
+    if with_details:
+        problem['details'] = requester.get_problem_info(problem['problemId'], args.homework, course_id) or {}
+    return problem
+
+
+def _load_records(requester, problem, homework_id, course_id):
+    """获取单个题目的提交记录并写入problem"""
+    records = requester.get_problem_submission_records(problem['problemId'], homework_id, course_id)
+    problem['submission_records'] = records['list'] if records and records.get('list') else []
+    return problem['submission_records']
+
+
+def _resolve_files(paths, cwd=None):
+    """将命令行中的文件参数解析为绝对路径
+
+    可省略.java扩展名，也接受工作目录子目录中的文件名、包名限定的类名与通配符
+
+    Args:
+        paths: 命令行中的文件参数
+        cwd: 相对路径的基准目录，默认为当前目录（守护进程执行时为客户端的工作目录）
+    """
+    from config import WORK_DIRECTORY
+    from utils.workspace import WorkspaceIndex, open_workspace_index
+
+    index = open_workspace_index() or WorkspaceIndex(WORK_DIRECTORY)
+    resolved = []
+    for path in paths:
+        candidates = [path] if path.lower().endswith('.java') else [path, path + '.java']
+        local = [os.path.abspath(os.path.join(cwd or os.getcwd(), c)) for c in candidates]
+        local = [c for c in local if os.path.isfile(c) and c.lower().endswith('.java')]
+        matches = index.resolve(path) or local  # 也接受相对当前目录的路径
+        if len(matches) > 1 and not any(c in path for c in '*?['):
+            print(f"[\x1b[0;31mx\x1b[0m] {path} 匹配多个文件，请指定更完整的路径: {', '.join(matches)}")
+            return None
+        if not matches:
+            print(f"[\x1b[0;31mx\x1b[0m] 找不到Java文件: {path}")
+            return None
+        resolved.extend(matches)
+    return list(dict.fromkeys(resolved))
+
+
+def _print_records(records, limit):
+    from utils.formatters import records_status_color
+
+    if not records:
+        print("[\x1b[0;33m!\x1b[0m] 没有找到提交记录")
+        return
+    print(" {:<6} | {:<5} | {:<19} | {:<8}".format("Status", "Score", "Submit Time", "Record ID"))
+    print("-" * 60)
+    for record in records[:limit]:
+        status, status_color = records_status_color(record.get('resultState', 'Unknown'))
+        line = " {:<6} | {:<5} | {:<19} | {:<8}".format(
+            status, record.get('score', 0), record.get('submissionTime', 'Unknown'), record.get('recordId', 'Unknown'))
+        if status_color:
+            line = line.replace(status, f"{status_color}{status}\x1b[0m", 1)
+        print(line)
+
+
+def command_submit(args, requester, course_id):
+    """oja submit: 题目列表(可缓存) + 题目详情(可缓存) + 提交记录(用于重复检查) + 提交 + 轮询结果"""
+    from ui.submission import (build_submission_bundle, find_identical_submission, format_record_verdict,
+                               wait_and_show_grading_result)
+
+    file_paths = _resolve_files(args.files, getattr(args, 'cwd', None))
+    if not file_paths:
+        return False
+
+    problem = _find_problem(requester, args, course_id, with_details=not args.no_wait)
+    if not problem:
+        return False
+
+    bundle = build_submission_bundle(file_paths)
+    if bundle is None:
+        return False
+
+    if not args.force:
+        files_hashes = bundle.hashes()
+        # 有代码存储时先查询本地索引，命中则无需获取提交记录
+        duplicate_record = None
+        if requester.code_store is not None:
+            duplicate_record = find_identical_submission(requester, problem, course_id, args.homework, files_hashes)
+        if duplicate_record is None:
+            _load_records(requester, problem, args.homework, course_id)
+            duplicate_record = find_identical_submission(requester, problem, course_id, args.homework, files_hashes)
+        if duplicate_record:
+            print(f"[\x1b[0;31mx\x1b[0m] 文件内容与以前的提交({duplicate_record.get('recordId', 'Unknown')}，"
+                  f"{format_record_verdict(duplicate_record)})完全相同，提交已取消（使用--force强制提交）")
+            return False
+
+    print(f"[\x1b[0;36m!\x1b[0m] 提交到 {problem.get('problemName', problem['problemId'])}: "
+          f"{', '.join(os.path.basename(f) for f in file_paths)}")
+    result = requester.submit_homework(args.homework, problem['problemId'], course_id, bundle)
+    if not result or 'recordId' not in result:
+        return False
+    if args.no_wait:
+        return True
+
+    grading = wait_and_show_grading_result(requester, result['recordId'], course_id, args.homework, problem)
+    return bool(grading.get('all_correct'))
+
+
+def command_watch(args, requester, course_id):
+    """oja watch: 题目列表(可缓存) + 题目详情(可缓存) + 提交记录(用于重复检查)，之后每次保存时提交 + 轮询结果"""
+    from ui.submission import watch_and_submit
+
+    file_paths = _resolve_files(args.files, getattr(args, 'cwd', None))
+    if not file_paths:
+        return False
+
+    problem = _find_problem(requester, args, course_id, with_details=True)
+    if not problem:
+        return False
+    if requester.code_store is None:
+        _load_records(requester, problem, args.homework, course_id)
+
+    result = watch_and_submit(requester, problem, course_id, args.homework, file_paths)
+    return bool(result and result.get('all_correct'))
+
+
+def command_status(args, requester, course_id):
+    """oja status: 指定-p时只请求该题的提交记录，否则请求作业信息与各题记录"""
+    from config import MAX_RECORDS_TO_SHOW
+
+    if args.problem is not None:
+        problem = _find_problem(requester, args, course_id)
+        if not problem:
+            return False
+        print(f"[\x1b[0;32m+\x1b[0m] {problem.get('problemName', problem['problemId'])} 的最近提交记录:")
+        _print_records(_load_records(requester, problem, args.homework, course_id), MAX_RECORDS_TO_SHOW)
+        return True
+
+    import asyncio
+    from services.data_service import fetch_and_process_problems_async
+    from ui.display import display_problems_list
+
+    homework_info = requester.get_homework_info(args.homework, course_id)
+    if homework_info and 'currentScore' in homework_info:
+        print(f"[\x1b[0;32m+\x1b[0m] 作业 {args.homework} 得分: "
+              f"{homework_info.get('currentScore', 0)}/{int(homework_info.get('totalScore', 0))}")
+
+    enriched_problems = asyncio.run(fetch_and_process_problems_async(requester, args.homework, course_id))
+    return display_problems_list(enriched_problems)
+
+
+def command_fetch(args, requester, course_id):
+    """oja fetch: 无-w时列出作业，有-w无-p时列出题目，有-p时输出/保存题目详情"""
+    import asyncio
+
+    if args.homework is None:
+        from services.data_service import fetch_and_process_homeworks_async
+        from ui.display import display_homeworks
+
+        enriched_homeworks = asyncio.run(fetch_and_process_homeworks_async(requester, course_id))
+        if not enriched_homeworks:
+            return False
+        return display_homeworks(sorted(enriched_homeworks, key=lambda x: x['homeworkId']))
+
+    if args.problem is None:
+        from services.data_service import fetch_and_process_problems_async
+        from ui.display import display_problems_list
+
+        enriched_problems = asyncio.run(fetch_and_process_problems_async(requester, args.homework, course_id))
+        return display_problems_list(enriched_problems)
+
+    problem = _find_problem(requester, args, course_id, with_details=True)
+    if not problem or not problem.get('details'):
+        print("[\x1b[0;31mx\x1b[0m] 题目详情不可用")
+        return False
+
+    if args.save:
+        from utils.file_handlers import save_problem_to_file
+
+        _load_records(requester, problem, args.homework, course_id)
+        file_path = save_problem_to_file(problem, course_id, args.homework)
+        if file_path:
+            print(f"[\x1b[0;32m+\x1b[0m] 题目内容已保存到: {file_path}")
+        return bool(file_path)
+
+    details = problem['details']
+    print(f"\n{'-' * 40}")
+    print(f"题目名称: {problem.get('problemName', problem['problemId'])}")
+    for lang, limit in details.get('timeLimit', {}).items():
+        print(f"时间限制: {lang}: {limit} ms")
+    for lang, limit in details.get('memoryLimit', {}).items():
+        print(f"内存限制: {lang}: {limit} MB")
+    if details.get('publicTags'):
+        print("公开标签:", ", ".join(details['publicTags']))
+    print(f"{'-' * 40}")
+    print(details.get('content', '题目内容不可用'))
+    return True
+
+
+def command_test_download(args, requester, course_id):
+    """oja test-download: 只请求题目列表（用于题目名称，可缓存）后下载单元测试，未指定-p时下载全部题目"""
+    from services.data_service import download_unit_test_file
+
+    if args.problem is None:
+        from services.data_service import download_homework_unit_tests
+        from ui.display import display_unit_test_results
+
+        problems_list = requester.get_homework_problems(args.homework, course_id)
+        if not problems_list or not problems_list.get('list'):
+            print("[\x1b[0;31mx\x1b[0m] 获取问题列表失败或列表为空")
+            return False
+        results, requests_sent = download_homework_unit_tests(course_id, args.homework, problems_list['list'])
+        return display_unit_test_results(results, requests_sent)
+
+    problem = _find_problem(requester, args, course_id)
+    if not problem:
+        return False
+
+    success, result = download_unit_test_file(course_id, problem['problemId'], args.homework,
+                                              problem.get('problemName', ''))
+    if success:
+        print(f"[\x1b[0;32m+\x1b[0m] 单元测试文件已下载到: {result}")
+    else:
+        print(f"[\x1b[0;31mx\x1b[0m] {result}")
+    return success
+
+
+def command_sync(args, requester, course_id):
+    """oja sync: 作业列表 + 未截止或有变化的作业的题目详情与提交记录 + 单元测试（条件请求），只写入有变化的内容"""
+    from config import SYNC_DIRECTORY
+    from services.course_sync import CourseSync
+    from services.unit_tests import open_unit_test_downloader
+    from ui.display import display_sync_summary
+
+    downloader = None if args.no_tests else open_unit_test_downloader()
+    summary = CourseSync(requester, course_id, args.output or SYNC_DIRECTORY, downloader, full=args.full).run()
+    if summary is None:
+        return False
+    return display_sync_summary(summary)
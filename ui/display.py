@@ -1,21 +1,38 @@
-from utils import records_status_color, save_problem_to_file
+from utils import records_status_color, save_problem_to_file, format_age
 from datetime import datetime
 import re
 
 
-def display_courses(requester):
-    """获取并显示课程列表"""
-    print(f"\n[\x1b[0;36m!\x1b[0m] 获取课程列表...")
-    courses = requester.get_my_courses()
+def _age_suffix(item):
+    """离线模式下的条目带有cached_at，在行尾标记数据获取于多久之前"""
+    if 'cached_at' not in item:
+        return ""
+    if not item['cached_at']:
+        return " \x1b[0;90m(本地数据)\x1b[0m"
+    return f" \x1b[0;90m({format_age(item['cached_at'])})\x1b[0m"
 
-    if courses and 'list' in courses and len(courses['list']) > 0:
-        print("[\x1b[0;32m+\x1b[0m] 您的课程列表:")
-        for i, course in enumerate(courses['list']):
-            print(f"  {i + 1}. [{course['course_id']}] {course['course_name']} - {course['description']}")
-        return courses
-    else:
+
+def display_courses(requester, courses=None):
+    """获取并显示全部课程，每获取到一页即输出，已有第一页响应时不再重复请求
+
+    Returns:
+        {'list': [...]} 形式的全部课程，无法获取或为空时返回None
+    """
+    if courses is None:
+        print(f"\n[\x1b[0;36m!\x1b[0m] 获取课程列表...")
+
+    all_courses = []
+    for course in requester.iter_courses(first_page=courses):
+        if not all_courses:
+            print("[\x1b[0;32m+\x1b[0m] 您的课程列表:")
+        all_courses.append(course)
+        print(f"  {len(all_courses)}. [{course['course_id']}] {course['course_name']} - {course['description']}"
+              f"{_age_suffix(course)}")
+
+    if not all_courses:
         print("[\x1b[0;31mx\x1b[0m] 无法获取课程列表或列表为空")
         return None
+    return {'list': all_courses}
 
 def display_homeworks(enriched_homeworks):
     """格式化显示作业列表
@@ -109,7 +126,7 @@ def display_homeworks(enriched_homeworks):
         if status_color:
             row = row.replace(status, colored_status, 1)
 
-        print(row)
+        print(row + _age_suffix(hw))
 
     return True
 
@@ -129,11 +146,17 @@ def display_problems_list(enriched_problems):
     # 显示问题列表
     print("\r[\x1b[0;32m+\x1b[0m] 当前作业中的题目列表:")
 
+    # 有单元测试清单时增加一列显示是否有单元测试
+    show_tests = any('unit_test' in problem for problem in enriched_problems)
+
     # 定义表头 - 更新表头以包含状态列
-    print(" {:<2} | {:<30} | {:<13} | {:<10} | {:<15}".format(
+    header = " {:<2} | {:<30} | {:<13} | {:<10} | {:<15}".format(
         "No.", "Problem Name", "Status", "Difficulty", "Time Limit"
-    ))
-    print("-" * 85)  # 增加分隔线长度
+    )
+    if show_tests:
+        header += " | Test"
+    print(header)
+    print("-" * (92 if show_tests else 85))  # 增加分隔线长度
 
     for i, problem in enumerate(enriched_problems):
         problem_name = re.sub(r'[^\w\s]', '', problem.get('problemName', 'Unknown'))
@@ -192,7 +215,9 @@ def display_problems_list(enriched_problems):
         parts[3] = " " + colored_diff + " " * (11 - len(difficulty_text))  # 难度列
 
         colored_line = "|".join(parts)
-        print(colored_line)
+        if show_tests:
+            colored_line += " | " + ("\x1b[0;32mYes\x1b[0m" if problem.get('unit_test') else "-")
+        print(colored_line + _age_suffix(problem))
 
     return True
 
@@ -420,4 +445,87 @@ def display_grading_result(result):
             print(f"\n测试用例 {idx + 1} ({test_result['title']}) 完整消息:")
             print(f"  {message_orig}")
 
-    print("-" * (len(header) + 2))  # Adjust separator length
\ No newline at end of file
+    print("-" * (len(header) + 2))  # Adjust separator length
+
+def display_diagnostics(requester):
+    """显示请求层的诊断信息，包括并发控制状态、连接复用与缓存统计
+
+    Args:
+        requester: OJ请求实例
+
+    Returns:
+        无返回值
+    """
+    print(f"\n{'-' * 60}")
+    print("[\x1b[0;36m!\x1b[0m] 诊断信息:")
+    print(requester.concurrency.describe())
+    print(requester.sessions.describe())
+    print("会话失效后重新登录: {reauths} 次，重放请求: {replays} 次".format(**requester.auth_stats))
+    if requester.keeper is not None:
+        print(requester.keeper.describe())
+    if requester.cache is not None:
+        print(requester.cache.summary())
+    if requester.code_store is not None:
+        print(requester.code_store.summary())
+    print(f"{'-' * 60}")
+
+
+def display_unit_test_results(results, requests_sent):
+    """显示批量下载单元测试的结果，并列出没有单元测试的题目
+
+    Args:
+        results: download_homework_unit_tests返回的 [(problem, status, 文件路径或说明), ...]
+        requests_sent: 实际发送的请求数
+
+    Returns:
+        bool: 是否至少有一道题目获取到了单元测试
+    """
+    labels = {
+        'downloaded': "\x1b[0;32m已下载\x1b[0m",
+        'unchanged': "\x1b[0;36m未变化\x1b[0m",
+        'missing': "\x1b[0;33m无测试\x1b[0m",
+        'error': "\x1b[0;31m失败\x1b[0m",
+    }
+    for problem, status, value in results:
+        name = problem.get('problemName', problem.get('problemId', 'Unknown'))
+        print(f"  {labels[status]}  {name}: {value}")
+
+    counts = {status: sum(1 for _, s, _ in results if s == status) for status in labels}
+    print(f"[\x1b[0;36m!\x1b[0m] 共 {len(results)} 道题目：新下载 {counts['downloaded']}，未变化 {counts['unchanged']}，"
+          f"无测试 {counts['missing']}，失败 {counts['error']}（发送请求 {requests_sent} 次）")
+
+    missing = [str(problem.get('problemName', problem.get('problemId'))) for problem, status, _ in results
+               if status == 'missing']
+    if missing:
+        print(f"[\x1b[0;33m!\x1b[0m] 以下题目暂无单元测试: {', '.join(missing)}")
+    return counts['downloaded'] + counts['unchanged'] > 0
+
+
+def display_sync_summary(summary):
+    """显示课程同步的结果：各类变化的数量与有变化的作业/题目
+
+    Args:
+        summary: CourseSync.run的返回值
+
+    Returns:
+        bool: 同步是否完整完成（没有中断且没有失败的作业）
+    """
+    labels = {'new': "\x1b[0;32m新增\x1b[0m", 'changed': "\x1b[0;36m更新\x1b[0m"}
+    for homework_id, problem_id, change in summary['changes']:
+        target = f"作业 {homework_id}" if problem_id is None else f"作业 {homework_id} / 题目 {problem_id}"
+        print(f"  {labels[change]}  {target}")
+
+    homeworks, problems, tests = summary['homeworks'], summary['problems'], summary['unit_tests']
+    print(f"[\x1b[0;36m!\x1b[0m] 作业：新增 {homeworks['new']}，更新 {homeworks['changed']}，"
+          f"未变化 {homeworks['unchanged']}，已截止跳过 {homeworks['skipped']}，"
+          f"上次已同步 {homeworks['resumed']}，失败 {homeworks['failed']}")
+    print(f"[\x1b[0;36m!\x1b[0m] 题目：新增 {problems['new']}，更新 {problems['changed']}，未变化 {problems['unchanged']}")
+    if sum(tests.values()):
+        print(f"[\x1b[0;36m!\x1b[0m] 单元测试：新下载 {tests['downloaded']}，未变化 {tests['unchanged']}，"
+              f"无测试 {tests['missing']}，失败 {tests['error']}")
+
+    if summary['interrupted']:
+        print(f"[\x1b[0;33m!\x1b[0m] 同步已中断，再次运行 oja sync 将从中断处继续")
+    else:
+        print(f"[\x1b[0;32m+\x1b[0m] 课程已同步到: {summary['directory']}")
+    return not summary['interrupted'] and homeworks['failed'] == 0
@@ -75,7 +75,7 @@ def select_homework(enriched_homeworks, auto_select_first):
             return None
 
 
-def interact_with_problems(enriched_problems, selected_course, selected_homework, requester):
+def interact_with_problems(enriched_problems, selected_course, selected_homework, requester, prefetcher=None):
     """处理用户与问题的交互，包括查看详情和提交作业
 
     Args:
@@ -83,6 +83,7 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
         selected_course: 选中的课程对象或课程ID
         selected_homework: 选中的作业对象或作业ID
         requester: OJ请求实例
+        prefetcher: 可选的Prefetcher，在等待输入时预取工作目录索引与所选题目的单元测试
 
     Returns:
         bool: True表示成功处理，False表示应该返回上一级
@@ -98,6 +99,18 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
     while True:
         display_problems_list(enriched_problems)
 
+        # 选择题目后默认的操作是提交，等待输入时先更新工作目录索引
+        if prefetcher is not None:
+            from utils.workspace import open_workspace_index
+            prefetcher.cancel(('workspace',))  # 上次的预取结果已过时，重新开始
+            prefetcher.speculate(('workspace',), open_workspace_index)
+
+        # 题目列表只使用本地缓存的单元测试清单，显示后再在后台获取最新的清单（离线时不请求）
+        if prefetcher is not None and not requester.offline:
+            from services.data_service import refresh_unit_test_availability
+            prefetcher.speculate(('manifest', course_id, homework_id), refresh_unit_test_availability,
+                                 enriched_problems, course_id, homework_id)
+
         # 用户选择问题并查看详情
         selected_problem = display_problems_info(enriched_problems, selected_course, selected_homework)
 
@@ -106,14 +119,36 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
             return False  # 明确返回False，表示应返回上一级
 
         # 当用户选择了题目后，给出选项
+        unit_test_key = ('unit_test', course_id, homework_id, selected_problem.get('problemId'))
         while True:
+            # 等待选择操作时预取该题目的单元测试（选项3），离线时不请求
+            if prefetcher is not None and not requester.offline:
+                from services.data_service import prefetch_unit_test_file
+                prefetcher.speculate(unit_test_key, prefetch_unit_test_file, course_id,
+                                     selected_problem.get('problemId', ''), homework_id,
+                                     selected_problem.get('problemName', ''))
+
             print("\n请选择操作: (直接回车默认选项为提交作业）")
             print("1. 保存题目到本地")
             print("2. 提交作业")
             print("3. 下载单元测试文件")
+            print("4. 批量提交多道题目")
+            print("5. 下载本作业所有题目的单元测试")
+            print("6. 监视文件并在保存后自动提交")
             print("0. 返回题目列表")
 
             choice = input("请输入选项编号: ").strip() or '2'
+            if requester.keeper is not None:
+                requester.keeper.report_failures()  # 等待输入期间后台刷新会话失败时在此告知
+            if requester.offline and choice in ('3', '5', '6'):
+                print("[\x1b[0;31mx\x1b[0m] 该操作需要连接OJ或单元测试服务器，离线模式下不可用")
+                continue
+
+            if prefetcher is not None:
+                if choice == '3':
+                    prefetcher.claim(unit_test_key)  # 仍在下载时等待其完成，之后直接使用本地缓存
+                else:
+                    prefetcher.cancel(unit_test_key)
 
             if choice == '0':
                 # 返回题目列表
@@ -138,12 +173,11 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
 
                 # 只有当提交没有取消时才刷新题目状态
                 if result:
-                    # 重新获取问题列表和记录，以显示最新状态
+                    # 只重新获取该题目的提交记录，并合并已获取的批改结果
                     print(f"[\x1b[0;36m!\x1b[0m] 正在刷新题目状态...")
-                    from services import fetch_and_process_problems
-                    updated_problems = fetch_and_process_problems(requester, selected_homework, selected_course)
-                    if updated_problems:
-                        enriched_problems = updated_problems
+                    from services import refresh_problem_records
+                    grading_result = result.get('result') if isinstance(result, dict) else None
+                    if refresh_problem_records(requester, selected_problem, homework_id, course_id, grading_result):
                         print(f"[\x1b[0;32m+\x1b[0m] 题目状态已更新")
 
                     # 检查提交结果
@@ -177,5 +211,37 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
 
                 continue
 
+            elif choice == '4':
+                # 批量提交多道题目
+                from ui.submission import handle_batch_submission
+                handle_batch_submission(requester, enriched_problems, course_id, homework_id)
+                break
+
+            elif choice == '5':
+                # 批量下载单元测试，每道题目保存到单独的目录
+                print(f"[\x1b[0;36m!\x1b[0m] 正在下载本作业所有题目的单元测试...")
+                from services import download_homework_unit_tests
+                from ui.display import display_unit_test_results
+                results, requests_sent = download_homework_unit_tests(course_id, homework_id, enriched_problems)
+                display_unit_test_results(results, requests_sent)
+                continue
+
+            elif choice == '6':
+                # 选择一次文件，之后每次保存都自动提交
+                from config import WORK_DIRECTORY
+                from ui.submission import get_java_file_paths, watch_and_submit
+                file_paths = get_java_file_paths(WORK_DIRECTORY)
+                if not file_paths:
+                    continue
+                result = watch_and_submit(requester, selected_problem, course_id, homework_id, file_paths)
+                if result:
+                    print(f"[\x1b[0;36m!\x1b[0m] 正在刷新题目状态...")
+                    from services import refresh_problem_records
+                    if refresh_problem_records(requester, selected_problem, homework_id, course_id, result.get('result')):
+                        print(f"[\x1b[0;32m+\x1b[0m] 题目状态已更新")
+                    if result.get('all_correct'):
+                        break
+                continue
+
             else:
                 print("[\x1b[0;31mx\x1b[0m] 无效的选项，请重新选择")
\ No newline at end of file
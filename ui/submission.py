@@ -1,6 +1,5 @@
 import os
 import sys
-import time
 import hashlib
 
 from config import WORK_DIRECTORY
@@ -39,13 +38,18 @@ def get_java_file_paths(work_dir):
     """
     获取用户指定的Java文件路径列表.
     - 用户可以输入逗号分隔的文件名/路径 (相对于工作目录或绝对路径). 用户可以省略 .java 扩展名.
-    - 用户可以输入单个目录路径 (将使用该目录下的所有 .java 文件).
+      也可以输入子目录中的文件名、包名限定的类名 (如 com.example.Main) 或通配符 (如 *.java).
+    - 用户可以输入单个目录路径 (将使用该目录及其子目录下的所有 .java 文件).
     - 用户可以直接按 Enter:
         - 如果工作目录下有 Main.java, 则使用 Main.java.
         - 否则, 如果工作目录下有其他 .java 文件, 则使用所有这些 .java 文件.
-        - 否则, 提示无文件并重新提示.
+        - 否则, 使用工作目录的子目录 (如 src/) 中的所有 .java 文件.
+        - 都没有时, 提示无文件并重新提示.
     - 输入 'q' 退出.
     """
+    from utils.workspace import WorkspaceIndex, open_workspace_index
+    from config import WORKSPACE_IGNORE
+
     while True:
         paths_input_str = input(
             f"输入Java文件名/路径 (多个用','分隔), 或一个目录, 或按Enter使用工作目录下的文件 (q退出):\n"
@@ -57,51 +61,53 @@ def get_java_file_paths(work_dir):
             return None
 
         selected_files = []
+        # 按目录修改时间增量更新的索引，未变化的目录不会重新扫描
+        index = open_workspace_index(work_dir)
 
         if not paths_input_str:  # 用户按下 Enter
             print(f"[\x1b[0;36m!\x1b[0m] 检查工作目录 '{work_dir}'...")
-            main_java_path = os.path.join(work_dir, "Main.java")
-            
+
             # 确保 work_dir 存在且是目录
-            java_files_in_work_dir = []
-            if os.path.isdir(work_dir):
-                java_files_in_work_dir = [
-                    os.path.join(work_dir, f) for f in os.listdir(work_dir)
-                    if f.lower().endswith(".java") and os.path.isfile(os.path.join(work_dir, f))
-                ]
-            else:
+            if index is None:
                 print(f"[\x1b[0;31mx\x1b[0m] 工作目录 '{work_dir}' 不存在或不是一个目录。")
                 continue
 
-
-            if os.path.exists(main_java_path) and os.path.isfile(main_java_path):
-                print(f"[\x1b[0;32m+\x1b[0m] 找到并选择默认文件: {main_java_path}")
-                selected_files.append(os.path.abspath(main_java_path))
-            elif java_files_in_work_dir:
-                print(f"[\x1b[0;32m+\x1b[0m] 未找到 Main.java，选择工作目录中所有 .java 文件:")
+            java_files_in_work_dir = index.files_in('')
+            main_java_paths = [f for f in java_files_in_work_dir if os.path.basename(f) == "Main.java"]
+
+            if main_java_paths:
+                print(f"[\x1b[0;32m+\x1b[0m] 找到并选择默认文件: {main_java_paths[0]}")
+                selected_files.append(main_java_paths[0])
+            elif java_files_in_work_dir or index.files:
+                if java_files_in_work_dir:
+                    print(f"[\x1b[0;32m+\x1b[0m] 未找到 Main.java，选择工作目录中所有 .java 文件:")
+                else:
+                    java_files_in_work_dir = index.files
+                    print(f"[\x1b[0;32m+\x1b[0m] 工作目录中没有 .java 文件，选择其子目录中所有 .java 文件:")
                 for f_path in java_files_in_work_dir:
-                    abs_f_path = os.path.abspath(f_path)
-                    print(f"  - {abs_f_path}")
-                    selected_files.append(abs_f_path)
+                    print(f"  - {f_path}")
+                    selected_files.append(f_path)
             else:
                 print(f"[\x1b[0;33m!\x1b[0m] 工作目录 '{work_dir}' 中未找到 Main.java 或其他 .java 文件。请重新输入。")
                 continue 
         
-        elif os.path.isdir(paths_input_str): # 输入是目录
-            print(f"[\x1b[0;36m!\x1b[0m] 扫描目录 '{paths_input_str}' 中的 .java 文件...")
-            dir_path = os.path.abspath(paths_input_str) # 使用绝对路径
-            found_in_dir = False
-            for item in os.listdir(dir_path):
-                if item.lower().endswith(".java"):
-                    full_path = os.path.join(dir_path, item)
-                    if os.path.isfile(full_path):
-                        selected_files.append(full_path)
-                        found_in_dir = True
-            if not found_in_dir:
+        elif os.path.isdir(paths_input_str) or (index and os.path.isdir(os.path.join(index.root, paths_input_str))): # 输入是目录
+            dir_path = paths_input_str if os.path.isdir(paths_input_str) else os.path.join(index.root, paths_input_str)
+            dir_path = os.path.abspath(dir_path) # 使用绝对路径
+            print(f"[\x1b[0;36m!\x1b[0m] 扫描目录 '{dir_path}' 中的 .java 文件...")
+            if index is not None and index.contains(dir_path):
+                selected_files = index.files_under(dir_path)
+            else:
+                dir_index = WorkspaceIndex(dir_path, WORKSPACE_IGNORE)
+                dir_index.refresh()
+                selected_files = dir_index.files
+            if not selected_files:
                 print(f"[\x1b[0;33m!\x1b[0m] 在目录 '{dir_path}' 中未找到 .java 文件。请重新输入。")
                 continue 
         
         else: # 输入是逗号分隔的文件列表
+            if index is None:
+                index = WorkspaceIndex(work_dir)  # 工作目录不存在时仍可以输入绝对路径
             potential_paths_str = [p.strip() for p in paths_input_str.split(',')]
             temp_selected_files = []
             all_input_items_resolved = True # 标志以跟踪列表中的所有 p_str 是否都已解析
@@ -110,29 +116,19 @@ def get_java_file_paths(work_dir):
                 if not p_str_input_item: # 跳过空字符串（例如，如果用户输入 "file1,,file2"）
                     continue
 
-                resolved_for_item = False
-                
-                # 要尝试的文件名候选列表
-                filename_candidates_to_try = [p_str_input_item]
-                if not p_str_input_item.lower().endswith(".java"):
-                    filename_candidates_to_try.append(p_str_input_item + ".java")
-
-                for filename_candidate in filename_candidates_to_try:
-                    path_to_check = filename_candidate
-                    if not os.path.isabs(filename_candidate):
-                        path_to_check = os.path.join(work_dir, filename_candidate)
-                    
-                    abs_path_to_check = os.path.abspath(path_to_check)
-
-                    if os.path.isfile(abs_path_to_check) and abs_path_to_check.lower().endswith(".java"):
-                        temp_selected_files.append(abs_path_to_check)
-                        resolved_for_item = True
-                        break # 找到了此 p_str_input_item 的有效文件
-                
-                if not resolved_for_item:
+                matches = index.resolve(p_str_input_item)
+                is_pattern = any(c in p_str_input_item for c in '*?[')
+                if len(matches) > 1 and not is_pattern:
+                    print(f"[\x1b[0;31mx\x1b[0m] 输入项 '{p_str_input_item}' 匹配多个文件，请输入更完整的路径或类名:")
+                    for f_path in matches:
+                        print(f"  - {f_path}")
+                    all_input_items_resolved = False
+                    break
+                if not matches:
                     print(f"[\x1b[0;31mx\x1b[0m] 输入项 '{p_str_input_item}' 无法解析为有效的 .java 文件。")
                     all_input_items_resolved = False
                     break # 如果一项无效，则停止处理此列表
+                temp_selected_files.extend(matches)
             
             if not all_input_items_resolved:
                  print("[\x1b[0;31mx\x1b[0m] 输入的列表中包含无法解析的文件。请重新输入。")
@@ -153,6 +149,74 @@ def get_java_file_paths(work_dir):
             # 循环将继续
 
 
+def build_submission_bundle(file_paths):
+    """读取要提交的文件并计算哈希
+
+    每个文件只读取一次，读取时同时计算哈希；自上次计算以来未修改的文件直接使用哈希缓存。
+    返回的FileBundle可直接传给submit_homework，提交时不再重新读取已读取过的文件。
+
+    Args:
+        file_paths: Java文件路径列表
+
+    Returns:
+        FileBundle，有多个文件同名或任一文件无法读取时返回None
+    """
+    from utils.file_bundle import FileBundle, open_file_hash_cache
+
+    bundle = FileBundle(file_paths, open_file_hash_cache())
+    duplicates = bundle.duplicate_names()
+    if duplicates:
+        for name, paths in duplicates.items():
+            print(f"[\x1b[0;31mx\x1b[0m] 多个文件同名 {name}，提交时只能保留一个: {', '.join(paths)}")
+        print(f"[\x1b[0;31mx\x1b[0m] 请只选择其中一个文件，提交取消")
+        return None
+    if bundle.hashes() is None:
+        print(f"[\x1b[0;31mx\x1b[0m] 无法读取要提交的文件，提交取消")
+        return None
+    return bundle
+
+
+def find_identical_submission(requester, problem, course_id, homework_id, files_hashes):
+    """检查文件内容是否与该题目的任意一次历史提交完全相同
+
+    仅当文件名集合和每个文件的哈希都相同时才认为是重复提交。有代码存储时直接查询其中的索引
+    （包括以前获取到的所有提交记录与本机的每次提交），否则比较problem中已获取的提交记录。
+
+    Args:
+        requester: OJ请求实例
+        problem: 问题对象，包含problemId与submission_records
+        course_id: 课程ID
+        homework_id: 作业ID
+        files_hashes: {带扩展名的文件名: 哈希值}，即FileBundle.hashes()的返回值
+
+    Returns:
+        相同的历史提交记录（含recordId、resultState、score、submissionTime），没有则返回None
+    """
+    if not files_hashes:
+        return None
+
+    code_store = getattr(requester, 'code_store', None)
+    if code_store is not None:
+        return code_store.find_submission(course_id, homework_id, problem['problemId'], files_hashes)
+
+    for record in problem.get('submission_records') or []:
+        if not record.get('code'):
+            continue
+        # 假设 API 返回的 code 字典的键也是带扩展名的文件名
+        record_files_hashes = {filename_key_from_api: get_file_hash(content=code_content)
+                               for filename_key_from_api, code_content in record['code'].items()}
+        if record_files_hashes == files_hashes:
+            return record
+    return None
+
+
+def format_record_verdict(record):
+    """提交记录的结果与得分，例如 "WA 50分"，结果未知（本机提交后尚未批改完成）时注明"""
+    state = record.get('resultState') or '结果未知'
+    score = record.get('score')
+    return f"{state} {score:g}分" if isinstance(score, (int, float)) else state
+
+
 def handle_submission(requester, problem, course_id, homework_id):
     """处理Java文件的选择和提交。支持多个Java文件。"""
     # 导入配置
@@ -179,58 +243,20 @@ def handle_submission(requester, problem, course_id, homework_id):
         return False
 
     # 读取当前文件内容并计算哈希值
-    from utils.file_handlers import read_java_file
-    current_files_content_hashes = {}
-    for file_path in selected_file_paths:
-        content = read_java_file(file_path)
-        if not content:
-            print(f"[\x1b[0;31mx\x1b[0m] 无法读取文件内容: {file_path}，提交取消")
-            return False
-        
-        file_hash = get_file_hash(content=content)
-        if not file_hash:
-            print(f"[\x1b[0;31mx\x1b[0m] 无法计算文件哈希值: {file_path}，提交取消")
-            return False
-        
-        filename_key = os.path.basename(file_path)  # 使用带扩展名的文件名作为键
-        current_files_content_hashes[filename_key] = file_hash
-
-    # 查找上一次提交记录中的代码哈希
-    last_submission_files_hashes = {}
-    last_submission_time = None
-    last_record_id = None
-
-    if 'submission_records' in problem and problem['submission_records'] and len(problem['submission_records']) > 0:
-        latest_record = problem['submission_records'][0]
-        if 'code' in latest_record and latest_record['code']: 
-            # 假设 API 返回的 code 字典的键也是带扩展名的文件名
-            for filename_key_from_api, code_content in latest_record['code'].items():
-                last_code_hash = get_file_hash(content=code_content)
-                if last_code_hash:
-                    last_submission_files_hashes[filename_key_from_api] = last_code_hash
-            
-            if last_submission_files_hashes:
-                last_submission_time = latest_record.get('submissionTime', 'Unknown')
-                last_record_id = latest_record.get('recordId', 'Unknown')
-
-    # 比较当前文件哈希和上次提交的文件哈希
-    # 仅当文件名集合和每个文件的哈希都相同时才认为是重复提交
-    if current_files_content_hashes and last_submission_files_hashes:
-        # 检查文件名集合是否相同 (键现在是带扩展名的)
-        if sorted(current_files_content_hashes.keys()) == sorted(last_submission_files_hashes.keys()):
-            all_hashes_match = True
-            for filename_key, current_hash in current_files_content_hashes.items():  # filename_key 是带扩展名的
-                if last_submission_files_hashes.get(filename_key) != current_hash:  # 使用相同的键格式进行比较
-                    all_hashes_match = False
-                    break
-            
-            if all_hashes_match:
-                print(f"\n[\x1b[0;31m!\x1b[0m] 检测到提交的文件内容与上一次提交完全相同。")
-                print(f"上次提交时间: {last_submission_time}")
-                print(f"上次提交ID: {last_record_id}")
-                print(f"当前提交文件: {', '.join(os.path.basename(f) for f in selected_file_paths)}")
-                print(f"[\x1b[0;31mx\x1b[0m] 提交已取消。请在修改后保存文件。")
-                return False
+    bundle = build_submission_bundle(selected_file_paths)
+    if bundle is None:
+        return False
+
+    # 与历史提交的文件内容比较
+    duplicate_record = find_identical_submission(requester, problem, course_id, homework_id, bundle.hashes())
+    if duplicate_record:
+        print(f"\n[\x1b[0;31m!\x1b[0m] 检测到提交的文件内容与以前的一次提交完全相同。")
+        print(f"该次提交时间: {duplicate_record.get('submissionTime', 'Unknown')}")
+        print(f"该次提交ID: {duplicate_record.get('recordId', 'Unknown')}")
+        print(f"该次提交结果: {format_record_verdict(duplicate_record)}")
+        print(f"当前提交文件: {', '.join(os.path.basename(f) for f in selected_file_paths)}")
+        print(f"[\x1b[0;31mx\x1b[0m] 提交已取消。请在修改后保存文件。")
+        return False
 
     # 确认提交
     print(f"\n准备提交:")
@@ -246,7 +272,7 @@ def handle_submission(requester, problem, course_id, homework_id):
         homework_id,
         problem['problemId'],
         course_id,
-        selected_file_paths # 传递文件路径列表
+        bundle # 传递已读取的文件，避免再次读取
     )
 
     # 如果提交成功并获取到record_id，则等待并显示批改结果
@@ -257,6 +283,65 @@ def handle_submission(requester, problem, course_id, homework_id):
     return False
 
 
+def watch_and_submit(requester, problem, course_id, homework_id, file_paths):
+    """监视文件，每次保存后自动提交并显示批改结果，直到全部通过或按Ctrl+C退出
+
+    同一道题目同一时间只有一次提交：等待批改结果期间的多次保存会合并，
+    在结果显示后作为一次变化处理。内容与以前的提交相同时不会提交。
+
+    Args:
+        requester: OJ请求实例
+        problem: 问题对象
+        course_id: 课程ID
+        homework_id: 作业ID
+        file_paths: 要监视并提交的Java文件路径列表
+
+    Returns:
+        最后一次提交的批改结果（同wait_and_show_grading_result），没有提交时返回None
+    """
+    from config import WATCH_DEBOUNCE, WATCH_POLL_INTERVAL
+    from services.file_watcher import FileWatcher
+
+    problem_name = problem['title'] if 'title' in problem else problem['problemName']
+    last_result = None
+    last_submitted_hashes = None  # 本次监视中最后一次提交的内容（提交记录中还没有这次提交时使用）
+
+    with FileWatcher(file_paths, WATCH_DEBOUNCE, WATCH_POLL_INTERVAL) as watcher:
+        print(f"\n[\x1b[0;36m!\x1b[0m] 正在监视 {', '.join(os.path.basename(f) for f in file_paths)}"
+              f"（{watcher.backend}），保存后自动提交到 {problem_name}，按Ctrl+C停止")
+        try:
+            while True:
+                changed = watcher.wait_for_change()
+                print(f"\n[\x1b[0;36m!\x1b[0m] 检测到文件变化: {', '.join(os.path.basename(f) for f in sorted(changed))}")
+
+                bundle = build_submission_bundle(file_paths)
+                if bundle is None:
+                    continue
+                files_hashes = bundle.hashes()
+                if files_hashes == last_submitted_hashes:
+                    print(f"[\x1b[0;33m!\x1b[0m] 文件内容与刚才的提交相同，继续监视")
+                    continue
+                duplicate_record = find_identical_submission(requester, problem, course_id, homework_id, files_hashes)
+                if duplicate_record:
+                    print(f"[\x1b[0;33m!\x1b[0m] 文件内容与以前的提交({duplicate_record.get('recordId', 'Unknown')}，"
+                          f"{format_record_verdict(duplicate_record)})完全相同，继续监视")
+                    continue
+
+                result = requester.submit_homework(homework_id, problem['problemId'], course_id, bundle)
+                if not result or 'recordId' not in result:
+                    continue
+                last_submitted_hashes = files_hashes
+                last_result = wait_and_show_grading_result(requester, result['recordId'], course_id, homework_id,
+                                                           problem)
+                if last_result.get('all_correct'):
+                    print(f"[\x1b[0;32m+\x1b[0m] 恭喜！该题目已全部通过，停止监视")
+                    break
+                print(f"\n[\x1b[0;36m!\x1b[0m] 继续监视，保存文件后将再次提交（Ctrl+C停止）")
+        except KeyboardInterrupt:
+            print(f"\n[\x1b[0;33m!\x1b[0m] 已停止监视")
+    return last_result
+
+
 def wait_and_show_grading_result(requester, record_id, course_id, homework_id, problem):
     """等待并显示批改结果，使用表格形式
 
@@ -271,59 +356,184 @@ def wait_and_show_grading_result(requester, record_id, course_id, homework_id, p
         包含提交结果的字典，其中all_correct表示是否全部通过
     """
     from ui.display import display_grading_result
+    from services.grading_poller import poll_grading_result, open_judge_latency_model
+    from config import GRADING_DEADLINE
 
     print(f"\n[\x1b[0;36m!\x1b[0m] 等待系统批改中...")
 
-    # 尝试获取时间限制信息
-    time_limit = None
-    if 'details' in problem and 'timeLimit' in problem['details'] and 'Java' in problem['details']['timeLimit']:
-        time_limit = int(problem['details']['timeLimit']['Java'])
+    # 根据该题目/作业以往的批改耗时安排轮询时间，总等待时间不超过GRADING_DEADLINE
+    def show_attempt(attempt, total):
+        print(f"\r[\x1b[0;36m!\x1b[0m] 等待批改结果 ({attempt}/{total})...", end='')
+
+    result = poll_grading_result(requester, record_id, course_id, homework_id, problem,
+                                 open_judge_latency_model(), GRADING_DEADLINE, on_attempt=show_attempt)
+
+    if result is False:
+        print("[\x1b[0;31mx\x1b[0m] 获取批改结果失败")
+        return {'all_correct': False}
+
+    if result is None:
+        # 超过截止时间仍未完成批改
+        print("[\x1b[0;31mx\x1b[0m] 批改超时，请稍后在OJ平台上查看结果")
+        return {'all_correct': False}
+
+    # 添加记录ID到结果中，以便显示
+    result['recordId'] = record_id
+
+    # 使用display.py中的函数显示批改结果
+    display_grading_result(result)
 
-    # 如果无法获取具体时间限制，使用默认值
-    if not time_limit:
-        time_limit = 2000  # 默认1000毫秒
+    # 检查所有测试用例是否都通过
+    all_correct = True
+    for test_result in result['resultList']:
+        if test_result['state'] != 'AC':
+            all_correct = False
+            break
 
-    # 根据时间限制计算等待时间，给系统足够的时间批改
-    # 初始等待时间设为时间限制（毫秒转秒）
-    wait_time = (time_limit) / 1000
+    # 返回结果以及是否全部通过的标志
+    return {
+        'result': result,
+        'all_correct': all_correct and result['resultState'] == 'AC'
+    }
 
-    # 最多尝试10次
-    for attempt in range(1, 11):
-        print(f"\r[\x1b[0;36m!\x1b[0m] 等待批改结果 ({attempt}/10)...", end='')
-        time.sleep(wait_time)
 
-        # 获取批改结果
-        result = requester.get_submission_result(record_id, course_id, homework_id)
+def handle_batch_submission(requester, enriched_problems, course_id, homework_id):
+    """批量提交多道题目，并用一个调度器同时等待所有批改结果
 
-        if not result:
-            print("[\x1b[0;31mx\x1b[0m] 获取批改结果失败")
-            return {'all_correct': False}
+    Args:
+        requester: OJ请求实例
+        enriched_problems: 包含详细信息的问题列表
+        course_id: 课程ID
+        homework_id: 作业ID
 
-        # 检查是否还在批改中
-        if result['resultState'] == 'JG':
-            # 增加下一次等待时间
-            wait_time = min(wait_time * 1.5, 5)  # 最长等待10秒
+    Returns:
+        {题目ID: 批改结果}，没有提交任何题目时返回空字典
+    """
+    from config import WORK_DIRECTORY
+    from services.batch_service import submit_batch, poll_batch_results
+    from services.data_service import refresh_problem_records
+    from utils.formatters import records_status_color
+
+    user_input = input(f"\n输入要批量提交的题目编号(1-{len(enriched_problems)}，多个用','分隔): ").strip()
+    if not user_input:
+        print("[\x1b[0;33m!\x1b[0m] 未选择题目，批量提交取消")
+        return {}
+
+    selected_problems = []
+    for item in user_input.split(','):
+        item = item.strip()
+        if not item:
             continue
+        try:
+            index = int(item) - 1
+        except ValueError:
+            print(f"[\x1b[0;31mx\x1b[0m] 无效的题目编号: {item}")
+            return {}
+        if not 0 <= index < len(enriched_problems):
+            print(f"[\x1b[0;31mx\x1b[0m] 题目编号超出范围: {item}")
+            return {}
+        if enriched_problems[index] not in selected_problems:
+            selected_problems.append(enriched_problems[index])
+
+    # 为每道题目选择要提交的文件
+    assignments = []
+    for problem in selected_problems:
+        print(f"\n{'-' * 40}")
+        print(f"题目: {problem['problemName']}")
+        print(f"{'-' * 40}")
+        file_paths = get_java_file_paths(WORK_DIRECTORY)
+        if not file_paths:
+            print(f"[\x1b[0;33m!\x1b[0m] 跳过题目: {problem['problemName']}")
+            continue
+
+        bundle = build_submission_bundle(file_paths)
+        if bundle is None:
+            continue
+        duplicate_record = find_identical_submission(requester, problem, course_id, homework_id, bundle.hashes())
+        if duplicate_record:
+            print(f"[\x1b[0;31m!\x1b[0m] 文件内容与以前的提交({duplicate_record.get('recordId', 'Unknown')}，"
+                  f"{format_record_verdict(duplicate_record)})完全相同，跳过该题目")
+            continue
+
+        assignments.append((problem, bundle))
+
+    if not assignments:
+        print("[\x1b[0;33m!\x1b[0m] 没有需要提交的题目")
+        return {}
+
+    print(f"\n准备批量提交:")
+    for problem, bundle in assignments:
+        print(f"- {problem['problemName']}: {', '.join(bundle.names)}")
+    confirm = input("确认提交? (y/n，默认y): ").strip().lower() or 'y'
+    if confirm != 'y':
+        print("[\x1b[0;33m!\x1b[0m] 已取消提交")
+        return {}
+
+    submissions = submit_batch(requester, course_id, homework_id, assignments)
+    outstanding = sum(1 for _, record_id, _ in submissions if record_id is not None)
+    print(f"\n[\x1b[0;36m!\x1b[0m] 等待 {outstanding} 条提交的批改结果...")
+
+    results = {}
+
+    def show_result(problem, record_id, result):
+        if result is False:
+            print(f"[\x1b[0;31mx\x1b[0m] {problem['problemName']} ({record_id}): 获取批改结果失败")
+            return
+        if result is None:
+            print(f"[\x1b[0;31mx\x1b[0m] {problem['problemName']} ({record_id}): 批改超时，请稍后在OJ平台上查看结果")
+            return
 
-        # 添加记录ID到结果中，以便显示
         result['recordId'] = record_id
+        results[problem['problemId']] = result
+        status, status_color = records_status_color(result['resultState'])
+        colored_status = f"{status_color}{status}\x1b[0m" if status_color else status
+        print(f"[\x1b[0;32m+\x1b[0m] {problem['problemName']} ({record_id}): {colored_status}  得分: {result.get('score', 0)}")
+
+    poll_batch_results(requester, course_id, homework_id, submissions, show_result)
+
+    # 更新已提交题目的提交记录
+    for problem, record_id, _ in submissions:
+        if record_id is not None:
+            refresh_problem_records(requester, problem, homework_id, course_id, results.get(problem['problemId']))
+
+    return results
+
 
-        # 使用display.py中的函数显示批改结果
-        display_grading_result(result)
-
-        # 检查所有测试用例是否都通过
-        all_correct = True
-        for test_result in result['resultList']:
-            if test_result['state'] != 'AC':
-                all_correct = False
-                break
-
-        # 返回结果以及是否全部通过的标志
-        return {
-            'result': result,
-            'all_correct': all_correct and result['resultState'] == 'AC'
-        }
-
-    # 如果尝试次数用完仍未完成批改
-    print("[\x1b[0;31mx\x1b[0m] 批改超时，请稍后在OJ平台上查看结果")
-    return {'all_correct': False}
\ No newline at end of file
+def submit_queued_submissions(requester, queue):
+    """恢复连接后提交离线时排队的作业，交互终端中先询问是否提交
+
+    Args:
+        requester: 已登录的OJRequester
+        queue: SubmissionQueue
+
+    Returns:
+        本次成功提交的数量
+    """
+    items = queue.items()
+    if not items:
+        return 0
+
+    print(f"\n[\x1b[0;36m!\x1b[0m] 有 {len(items)} 份离线时排队的提交:")
+    for item in items:
+        print(f"  - 课程{item['course_id']} 作业{item['homework_id']} 题目{item['problem_id']}: "
+              f"{', '.join(item['files'])}（{item['queued_at']}）")
+    if not sys.stdin.isatty():
+        print("[\x1b[0;33m!\x1b[0m] 非交互终端，暂不提交；在终端中启动oja时会询问是否提交")
+        return 0
+    confirm = input("现在提交? (y/n，默认y): ").strip().lower() or 'y'
+    if confirm != 'y':
+        print("[\x1b[0;33m!\x1b[0m] 已保留在队列中，下次启动时再询问")
+        return 0
+
+    submitted = []
+    for item in items:
+        result = requester.submit_homework(item['homework_id'], item['problem_id'], item['course_id'], item['files'])
+        if result and 'recordId' in result:
+            submitted.append(item['id'])
+    queue.remove(submitted)
+
+    if len(submitted) < len(items):
+        print(f"[\x1b[0;33m!\x1b[0m] {len(items) - len(submitted)} 份提交失败，已保留在队列中")
+    if submitted:
+        print(f"[\x1b[0;32m+\x1b[0m] 已提交 {len(submitted)} 份，批改结果可在题目列表中查看")
+    return len(submitted)
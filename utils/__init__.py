@@ -1,9 +1,28 @@
-# 导入并重新导出各个模块的公共函数
-from .formatters import records_status_color
-from .file_handlers import save_problem_to_file, read_java_file
+# 按需导入并重新导出各个模块的公共函数
+from importlib import import_module
+
+# 公开名称 -> 所在子模块
+_EXPORTS = {
+    'records_status_color': '.formatters',
+    'format_age': '.formatters',
+    'save_problem_to_file': '.file_handlers',
+    'read_java_file': '.file_handlers',
+    'FileBundle': '.file_bundle',
+    'open_file_hash_cache': '.file_bundle',
+    'WorkspaceIndex': '.workspace',
+    'open_workspace_index': '.workspace',
+}
 
 # 定义当使用 from utils import * 时导入的内容
 __all__ = [
     'records_status_color',
     'save_problem_to_file'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value  # 之后的访问不再经过__getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class FileHashCache:
+    """跨运行保存 (路径, 大小, 修改时间) -> 文件内容的SHA-256
+
+    文件大小与修改时间都未变化时直接使用保存的哈希，无需读取文件。
+
+    Args:
+        path: 缓存文件路径
+        max_entries: 最多保留的条目数，超出后丢弃最早加入的条目
+    """
+
+    def __init__(self, path, max_entries=2000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, file_path, st):
+        """文件自上次计算以来未变化时返回保存的哈希，否则返回None"""
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(file_path))
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def put(self, file_path, st, sha256):
+        with self._lock:
+            key = os.path.abspath(file_path)
+            self._entries.pop(key, None)
+            self._entries[key] = [st.st_size, st.st_mtime_ns, sha256]
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"[\x1b[0;33m!\x1b[0m] 保存文件哈希缓存失败: {e}")
+
+
+class FileBundle:
+    """一次提交的文件集合，每个文件最多读取一次，读取时同时计算哈希
+
+    哈希与内容按read_java_file的方式解码（UTF-8，统一换行符为\\n），与提交到OJ的内容一致。
+    文件未变化且哈希缓存中有记录时，hashes()不读取文件，内容在contents()中才读取。
+
+    Args:
+        file_paths: 文件路径列表
+        hash_cache: 可选的FileHashCache
+    """
+
+    def __init__(self, file_paths, hash_cache=None):
+        self.paths = list(file_paths)
+        self.names = [os.path.basename(path) for path in self.paths]  # 带扩展名的文件名，即提交时的键
+        self.hash_cache = hash_cache
+        self._contents = {}
+        self._hashes = {}
+
+    def duplicate_names(self):
+        """返回 {文件名: [路径, ...]}，只包含多个不同文件共用的文件名（提交时以文件名为键，只会保留其中一个）"""
+        paths_by_name = {}
+        for path, name in zip(self.paths, self.names):
+            paths = paths_by_name.setdefault(name, [])
+            if os.path.abspath(path) not in map(os.path.abspath, paths):
+                paths.append(path)
+        return {name: paths for name, paths in paths_by_name.items() if len(paths) > 1}
+
+    def _read(self, path, name):
+        """读取一个文件并计算哈希，失败时打印原因并返回False"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+                st = os.fstat(f.fileno())
+            content = data.decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"[\x1b[0;31mx\x1b[0m] 读取文件错误: {e}")
+            return False
+        if not content:
+            print(f"[\x1b[0;31mx\x1b[0m] 文件内容为空: {path}")
+            return False
+
+        if b'\r' in data:
+            # 与文本模式读取一致，统一换行符后再计算哈希
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+            data = content.encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+
+        self._contents[name] = content
+        self._hashes[name] = sha256
+        if self.hash_cache is not None:
+            self.hash_cache.put(path, st, sha256)
+        return True
+
+    def hashes(self):
+        """返回 {文件名: SHA-256}，任一文件无法读取时返回None"""
+        try:
+            for path, name in zip(self.paths, self.names):
+                if name in self._hashes:
+                    continue
+                if self.hash_cache is not None:
+                    try:
+                        cached = self.hash_cache.get(path, os.stat(path))
+                    except OSError:
+                        cached = None
+                    if cached:
+                        self._hashes[name] = cached
+                        continue
+                if not self._read(path, name):
+                    return None
+            return dict(self._hashes)
+        finally:
+            if self.hash_cache is not None:
+                self.hash_cache.save()
+
+    def contents(self):
+        """返回 {文件名: 文件内容}，只读取之前未读取过的文件，任一文件无法读取时返回None"""
+        try:
+            for path, name in zip(self.paths, self.names):
+                if name not in self._contents and not self._read(path, name):
+                    return None
+            return dict(self._contents)
+        finally:
+            if self.hash_cache is not None:
+                self.hash_cache.save()
+
+
+_hash_cache = None
+_hash_cache_lock = threading.Lock()
+
+
+def open_file_hash_cache():
+    """返回根据config中的设置创建的FileHashCache（进程内共享一个实例）"""
+    global _hash_cache
+    with _hash_cache_lock:
+        if _hash_cache is None:
+            from config import FILE_HASH_CACHE
+            _hash_cache = FileHashCache(FILE_HASH_CACHE)
+        return _hash_cache
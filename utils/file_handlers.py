@@ -4,10 +4,29 @@ def save_problem_to_file(problem, course_id, homework_id):
     """将题目内容保存为文件"""
     problem_id = problem.get('problemId', 'unknown')
     problem_name = problem.get('problemName', 'unknown').replace('/', '-').replace('\\', '-')  # 替换无效文件名字符
-    details = problem.get('details', {})
 
     # 创建文件名 - 直接在当前目录下保存
     file_name = f"{course_id}_{homework_id}_{problem_id}_{problem_name}.md"
+    content = render_problem_markdown(problem, course_id, homework_id)
+
+    # 保存文件 - 直接在当前目录
+    try:
+        # 不创建子目录，直接在当前目录保存
+        file_path = WORK_DIRECTORY + '\\' + file_name
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        return file_path
+    except Exception as e:
+        print(f"[\x1b[0;31mx\x1b[0m] 保存题目文件时出错: {e}")
+        return None
+
+
+def render_problem_markdown(problem, course_id, homework_id):
+    """生成题目的Markdown内容（题目信息、描述与最近的提交记录）"""
+    problem_id = problem.get('problemId', 'unknown')
+    problem_name = problem.get('problemName', 'unknown').replace('/', '-').replace('\\', '-')  # 替换无效文件名字符
+    details = problem.get('details', {})
 
     # 创建一个markdown格式的内容
     content = f"# {problem_name}\n\n"
@@ -104,17 +123,7 @@ def save_problem_to_file(problem, course_id, homework_id):
             if i < records_to_show - 1:
                 content += "---\n\n"
 
-    # 保存文件 - 直接在当前目录
-    try:
-        # 不创建子目录，直接在当前目录保存
-        file_path = WORK_DIRECTORY + '\\' + file_name
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-
-        return file_path
-    except Exception as e:
-        print(f"[\x1b[0;31mx\x1b[0m] 保存题目文件时出错: {e}")
-        return None
+    return content
 
 def read_java_file(file_path):
     """读取Java文件内容。"""
@@ -1,3 +1,6 @@
+import time
+
+
 def records_status_color(result_state):
     if result_state == 'AC':
         status = "AC"
@@ -20,4 +23,16 @@ def records_status_color(result_state):
     else:
         status = result_state
         status_color = ''
-    return status, status_color
\ No newline at end of file
+    return status, status_color
+
+
+def format_age(timestamp):
+    """将时间戳格式化为距今多久，如 "5分钟前"、"3小时前"、"2天前"，用于标记离线数据"""
+    seconds = max(0, time.time() - timestamp)
+    if seconds < 60:
+        return "刚刚"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}分钟前"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}小时前"
+    return f"{int(seconds // 86400)}天前"
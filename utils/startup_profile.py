@@ -0,0 +1,108 @@
+"""启动耗时分析：记录每个模块的导入耗时，并在第一次出现输入提示时输出报告"""
+
+import atexit
+import builtins
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+
+class StartupProfiler:
+    """通过包装builtins.__import__与importlib.import_module记录首次导入每个模块的耗时
+
+    inclusive为包括其依赖在内的总耗时，self为扣除依赖后模块自身的耗时。
+    报告在第一次调用input()之前输出（即冷启动到第一个提示的时间）；
+    如果程序没有出现提示（如非交互子命令），则在退出时输出。
+
+    Args:
+        process_start: 作为起点的time.perf_counter()值，默认取安装时间
+        top: 报告中列出的模块数量
+    """
+
+    def __init__(self, process_start=None, top=15):
+        self.start = process_start if process_start is not None else time.perf_counter()
+        self.top = top
+        self.timings = {}  # 模块名 -> [inclusive, self, 完成时刻]
+        self._local = threading.local()  # 后台预加载与主线程同时导入，嵌套栈按线程分开
+        self._original_import = None
+        self._original_import_module = None
+        self._original_input = None
+        self._reported = False
+
+    def install(self):
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+        self._original_input = builtins.input
+        builtins.__import__ = self._import
+        importlib.import_module = self._import_module
+        builtins.input = self._input
+        atexit.register(self.report)
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            importlib.import_module = self._original_import_module
+            builtins.input = self._original_input
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # 相对导入无法在此可靠地解析完整名称，按调用者包补全
+        full_name = name
+        if level and globals:
+            package = globals.get('__package__') or ''
+            base = package.rsplit('.', level - 1)[0] if level > 1 else package
+            full_name = f"{base}.{name}" if name else base
+        return self._timed(full_name, self._original_import, name, globals, locals, fromlist, level)
+
+    def _import_module(self, name, package=None):
+        # 按需导入（如后台预加载）绕过builtins.__import__，需要单独统计
+        try:
+            full_name = importlib.util.resolve_name(name, package)
+        except (ImportError, ValueError):
+            full_name = name
+        return self._timed(full_name, self._original_import_module, name, package)
+
+    def _timed(self, full_name, importer, *args):
+        """执行一次导入，只统计尚未加载的模块"""
+        if full_name in sys.modules:
+            return importer(*args)
+
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        began = time.perf_counter()
+        try:
+            return importer(*args)
+        finally:
+            inclusive = time.perf_counter() - began
+            children = stack.pop()
+            if stack:
+                stack[-1] += inclusive
+            if full_name not in self.timings:
+                self.timings[full_name] = [inclusive, inclusive - children, time.perf_counter() - self.start]
+
+    def _input(self, *args, **kwargs):
+        self.report(reason="第一个输入提示")
+        builtins.input = self._original_input
+        return self._original_input(*args, **kwargs)
+
+    def report(self, reason="程序退出"):
+        """输出导入耗时报告，只输出一次"""
+        if self._reported:
+            return
+        self._reported = True
+        elapsed = time.perf_counter() - self.start
+        self.uninstall()
+
+        total_import = sum(timing[1] for timing in self.timings.values())
+        print(f"\n{'-' * 60}")
+        print(f"[\x1b[0;36m!\x1b[0m] 启动分析: 到{reason}共 {elapsed * 1000:.0f} ms，"
+              f"其中模块导入 {total_import * 1000:.0f} ms（{len(self.timings)} 个模块）")
+        print(" {:<36} | {:>9} | {:>9} | {:>8}".format("Module", "Incl(ms)", "Self(ms)", "At(ms)"))
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (inclusive, own, finished) in ranked[:self.top]:
+            print(" {:<36} | {:>9.1f} | {:>9.1f} | {:>8.0f}".format(
+                name[:36], inclusive * 1000, own * 1000, finished * 1000))
+        print(f"{'-' * 60}")
@@ -0,0 +1,203 @@
+import fnmatch
+import json
+import os
+import threading
+
+
+class WorkspaceIndex:
+    """工作目录中Java源文件的索引
+
+    用os.scandir递归扫描，并记录每个目录的修改时间；再次刷新时只stat各目录，
+    修改时间未变化的目录直接使用上次的结果（目录中增删文件都会改变其修改时间）。
+    文件名、相对路径及其后缀、包名限定的类名都预先放入字典，解析输入时直接查找。
+
+    Args:
+        root: 工作目录
+        ignore: 忽略的目录/文件名通配符，也可以匹配相对路径（如 src/generated/*）
+        state_path: 保存索引的文件，下次运行时据此只重新扫描有变化的目录，为None时不保存
+    """
+
+    def __init__(self, root, ignore=(), state_path=None):
+        self.root = os.path.abspath(root)
+        self.ignore = list(ignore)
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._dirs = self._load()  # 相对目录（'/'分隔，根目录为''） -> [修改时间, [Java文件名], [子目录名]]
+        self._files = []  # [(相对路径, 绝对路径), ...]
+        self._lookup = {}  # 小写的查找键 -> [绝对路径, ...]
+        self._built = False
+
+    def _load(self):
+        if not self.state_path:
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('root') != self.root or data.get('ignore') != self.ignore:
+            return {}
+        return data.get('dirs') or {}
+
+    def _save(self):
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'root': self.root, 'ignore': self.ignore, 'dirs': self._dirs}, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"[\x1b[0;33m!\x1b[0m] 保存工作目录索引失败: {e}")
+
+    def _abs(self, rel):
+        return os.path.join(self.root, *rel.split('/')) if rel else self.root
+
+    def _ignored(self, name, rel):
+        return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel, pattern) for pattern in self.ignore)
+
+    def _scan(self, rel, mtime):
+        files, subdirs = [], []
+        try:
+            with os.scandir(self._abs(rel)) as entries:
+                for entry in entries:
+                    child_rel = f"{rel}/{entry.name}" if rel else entry.name
+                    if self._ignored(entry.name, child_rel):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.name.lower().endswith('.java') and entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return [mtime, sorted(files), sorted(subdirs)]
+
+    def refresh(self):
+        """按目录修改时间增量更新索引
+
+        Returns:
+            本次重新扫描的目录数
+        """
+        with self._lock:
+            dirs = {}
+            rescanned = 0
+            stack = ['']
+            while stack:
+                rel = stack.pop()
+                try:
+                    mtime = os.stat(self._abs(rel)).st_mtime_ns
+                except OSError:
+                    continue
+                entry = self._dirs.get(rel)
+                if entry is None or entry[0] != mtime:
+                    entry = self._scan(rel, mtime)
+                    rescanned += 1
+                    if entry is None:
+                        continue
+                dirs[rel] = entry
+                stack.extend(f"{rel}/{name}" if rel else name for name in reversed(entry[2]))
+
+            changed = rescanned > 0 or dirs.keys() != self._dirs.keys()
+            self._dirs = dirs
+            if changed or not self._built:
+                self._rebuild()
+            if changed:
+                self._save()
+            return rescanned
+
+    def _rebuild(self):
+        files = []
+        lookup = {}
+        for rel_dir in sorted(self._dirs):
+            dir_parts = rel_dir.split('/') if rel_dir else []
+            for name in self._dirs[rel_dir][1]:
+                rel = '/'.join(dir_parts + [name])
+                path = self._abs(rel)
+                files.append((rel, path))
+
+                # 相对路径的各个后缀（src/com/x/Foo.java、com/x/Foo.java、Foo.java）
+                # 与包名限定的类名的各个后缀（src.com.x.Foo、com.x.Foo、Foo）
+                parts = dir_parts + [name[:-len('.java')]]
+                keys = set()
+                for i in range(len(parts)):
+                    keys.add('/'.join(parts[i:]).lower() + '.java')
+                    keys.add('.'.join(parts[i:]).lower())
+                for key in keys:
+                    lookup.setdefault(key, []).append(path)
+        self._files = files
+        self._lookup = lookup
+        self._built = True
+
+    @property
+    def files(self):
+        """所有Java文件的绝对路径"""
+        return [path for _, path in self._files]
+
+    def files_in(self, rel_dir=''):
+        """某个目录（相对工作目录）中直接包含的Java文件"""
+        entry = self._dirs.get(rel_dir)
+        return [self._abs(f"{rel_dir}/{name}" if rel_dir else name) for name in entry[1]] if entry else []
+
+    def files_under(self, directory):
+        """某个目录（绝对路径）及其子目录中的Java文件"""
+        prefix = os.path.join(os.path.abspath(directory), '')
+        return [path for _, path in self._files if path.startswith(prefix)]
+
+    def contains(self, path):
+        path = os.path.abspath(path)
+        return path == self.root or path.startswith(os.path.join(self.root, ''))
+
+    def resolve(self, item):
+        """将一项用户输入解析为Java文件列表
+
+        支持绝对路径或相对工作目录的路径（可省略.java扩展名）、文件名、相对路径的后缀
+        （com/x/Foo.java）、包名限定的类名（com.x.Foo）与通配符（*Test.java、src/*.java）。
+
+        Returns:
+            匹配的文件路径列表，文件名或类名有多个匹配时全部返回，没有匹配时返回空列表
+        """
+        if any(c in item for c in '*?['):
+            pattern = item.replace('\\', '/').lower()
+            return [path for rel, path in self._files
+                    if fnmatch.fnmatchcase(rel.lower(), pattern)
+                    or fnmatch.fnmatchcase(rel.rsplit('/', 1)[-1].lower(), pattern)]
+
+        candidates = [item] if item.lower().endswith('.java') else [item, item + '.java']
+        for candidate in candidates:
+            path = candidate if os.path.isabs(candidate) else os.path.join(self.root, candidate)
+            if os.path.isfile(path) and path.lower().endswith('.java'):
+                return [os.path.abspath(path)]
+
+        key = item.replace('\\', '/').lower()
+        while key.startswith('./'):
+            key = key[2:]
+        if key.endswith('.java'):
+            return list(self._lookup.get(key, []))
+        return list(self._lookup.get(key + '.java') or self._lookup.get(key, []))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def open_workspace_index(root=None):
+    """返回刷新后的工作目录索引（每个目录在进程内共享一个实例），目录不存在时返回None
+
+    Args:
+        root: 要索引的目录，默认为config.WORK_DIRECTORY；只有WORK_DIRECTORY的索引会保存到文件
+    """
+    from config import WORK_DIRECTORY, WORKSPACE_IGNORE, WORKSPACE_INDEX_FILE
+
+    root = os.path.abspath(root or WORK_DIRECTORY)
+    if not os.path.isdir(root):
+        return None
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            state_path = WORKSPACE_INDEX_FILE if root == os.path.abspath(WORK_DIRECTORY) else None
+            index = _indexes[root] = WorkspaceIndex(root, WORKSPACE_IGNORE, state_path)
+    index.refresh()
+    return index